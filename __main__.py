@@ -0,0 +1,235 @@
+"""
+Count worked time in timesheet files outside of Sublime Text, e.g.:
+
+    python3 -m timesheets timesheet.txt
+    cat *.txt | python3 -m timesheets --period today --period 7
+    python3 -m timesheets --report tickets --since 2018-07-01 team/
+
+Directory which contains this package should be current directory
+or should be listed in PYTHONPATH.
+"""
+import argparse
+import sys
+from datetime import date, datetime, time, timedelta
+
+from timesheets.core import get_period_range, iter_timesheet_info
+from timesheets.core import prettify_minutes, sort_minutes, summarize
+from timesheets.batch import aggregate_files, iter_timesheet_files
+
+try:
+    from typing import Iterable, Iterator, List, Optional, Union
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Iterable, Iterator, List, Optional
+    from timesheets.typing.typing import Union
+
+
+DEFAULT_PERIODS = ['today', 'week', 'month']
+
+
+def parse_period(value: str) -> Union[str, int]:
+    """Convert period argument: name of period or number of days."""
+    period = int(value) if value.isdigit() else value
+
+    try:
+        get_period_range(period, date.today())
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            'expected today, week, month, year or number of days, '
+            'got {!r}'.format(value)
+        )
+
+    return period
+
+
+def parse_date(value: str) -> date:
+    """Convert date argument in format YYYY-MM-DD."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            'expected date in format YYYY-MM-DD, got {!r}'.format(value)
+        )
+
+
+def parse_jobs(value: str) -> int:
+    """Convert number of processes argument, it should be at least 1."""
+    try:
+        jobs = int(value)
+    except ValueError:
+        jobs = 0
+
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(
+            'expected positive number, got {!r}'.format(value)
+        )
+
+    return jobs
+
+
+def get_now(day: Optional[date]) -> datetime:
+    """
+    Return time till which work in progress is counted: current time,
+    or end of given `day` if it isn't today.
+    """
+    now = datetime.now()
+    if day is None or day == now.date():
+        return now
+    return datetime.combine(day + timedelta(days=1), time())
+
+
+def iter_lines(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Iterate lines of given files one by one,
+    "-" stands for standard input.
+    """
+    for path in paths:
+        if path == '-':
+            for line in sys.stdin:
+                yield line
+            continue
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                yield line
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    """Entry-point, return exit code."""
+    parser = argparse.ArgumentParser(
+        prog='python3 -m timesheets',
+        description='Count how much time is worked according to timesheets.'
+    )
+    parser.add_argument(
+        'files',
+        nargs='*',
+        default=['-'],
+        metavar='FILE',
+        help='timesheet files, "-" or nothing to read standard input'
+    )
+    parser.add_argument(
+        '-p', '--period',
+        action='append',
+        type=parse_period,
+        help='today, week, month, year or number of last days, '
+             'could be given several times (default: {})'.format(
+                 ', '.join(DEFAULT_PERIODS)
+             )
+    )
+    parser.add_argument(
+        '-d', '--date',
+        type=parse_date,
+        help='count periods relative to this date, YYYY-MM-DD '
+             '(default: today)'
+    )
+    parser.add_argument(
+        '-r', '--report',
+        choices=['tickets', 'days'],
+        help='instead of periods, count worked time by ticket or by day '
+             'in given files and directories using several processes'
+    )
+    parser.add_argument(
+        '--since',
+        type=parse_date,
+        help='count only lines since this date in report, YYYY-MM-DD'
+    )
+    parser.add_argument(
+        '--until',
+        type=parse_date,
+        help='count only lines until this date (inclusive) in report, '
+             'YYYY-MM-DD'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=parse_jobs,
+        help='number of processes to make report (default: number of CPUs)'
+    )
+    args = parser.parse_args(argv)
+
+    if args.report:
+        if args.files == ['-']:
+            parser.error('files or directories are required for report')
+        return print_report(args)
+
+    try:
+        summary = summarize(
+            iter_timesheet_info(iter_lines(args.files)),
+            args.period or DEFAULT_PERIODS,
+            args.date or date.today()
+        )
+    except (OSError, UnicodeDecodeError) as e:
+        print('{}: {}'.format(parser.prog, e), file=sys.stderr)
+        return 1
+
+    now = get_now(args.date)
+    width = max(len(str(period)) for period in summary.periods)
+
+    for period in summary.periods:
+        print('{:<{}}  {}'.format(
+            period,
+            width,
+            prettify_minutes(summary.get_minutes(period, now))
+        ))
+
+    return 0
+
+
+def print_report(args: argparse.Namespace) -> int:
+    """
+    Print worked time by ticket or by day in files and directories
+    given in command line arguments, and errors of every file.
+    """
+    batch_totals = aggregate_files(
+        iter_timesheet_files(args.files),
+        args.since.toordinal() if args.since else None,
+        args.until.toordinal() + 1 if args.until else None,
+        args.jobs
+    )
+
+    if args.report == 'tickets':
+        rows = sort_minutes(batch_totals.minutes_by_ticket)
+    else:
+        rows = [
+            (date.fromordinal(date_ordinal).isoformat(), minutes)
+            for date_ordinal, minutes in sorted(
+                batch_totals.minutes_by_day.items()
+            )
+        ]
+    rows.append(('total', batch_totals.get_total_minutes()))
+
+    width = max(len(key) for key, _ in rows)
+    for key, minutes in rows:
+        print('{:<{}}  {}'.format(key, width, prettify_minutes(minutes)))
+
+    exit_code = 0
+    for file_totals in batch_totals.files:
+        if file_totals.error:
+            print(
+                '{}: {}'.format(file_totals.path, file_totals.error),
+                file=sys.stderr
+            )
+            exit_code = 1
+
+        for line_number in file_totals.invalid_lines:
+            print(
+                '{}:{}: invalid timesheet line'.format(
+                    file_totals.path,
+                    line_number
+                ),
+                file=sys.stderr
+            )
+
+        for line_number in file_totals.unfinished_lines:
+            print(
+                '{}:{}: time_to is empty, line is not counted'.format(
+                    file_totals.path,
+                    line_number
+                ),
+                file=sys.stderr
+            )
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Counting of worked time by ticket and by day
+in many timesheet files at once, using several processes.
+Used by command line, see `__main__.py`.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from timesheets.core import timesheet_line_parser
+
+try:
+    from typing import Iterable, Iterator, Optional
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Iterable, Iterator, Optional
+
+
+class FileTotals:
+    """
+    Worked time counted in single timesheet file,
+    result of `aggregate_file`.
+    """
+
+    __slots__ = ('path', 'minutes_by_ticket', 'minutes_by_day',
+                 'invalid_lines', 'unfinished_lines', 'error')
+
+    def __init__(self, path: str):
+        self.path = path
+
+        # Worked minutes by ticket, and by date ordinal
+        self.minutes_by_ticket = {}
+        self.minutes_by_day = {}
+
+        # Numbers of lines (starting from 1) that aren't valid timesheet
+        # lines, and of lines without time_to, which aren't counted
+        self.invalid_lines = []
+        self.unfinished_lines = []
+
+        # Error message if file couldn't be read
+        self.error = None
+
+
+class BatchTotals:
+    """
+    Worked time counted in several timesheet files,
+    result of `aggregate_files`.
+    """
+
+    def __init__(self):
+        # Worked minutes by ticket, and by date ordinal
+        self.minutes_by_ticket = {}
+        self.minutes_by_day = {}
+
+        # Results of every file, with per-file errors
+        self.files = []
+
+    def merge(self, file_totals: FileTotals):
+        """Add worked time of single file."""
+        self.files.append(file_totals)
+
+        for ticket, minutes in file_totals.minutes_by_ticket.items():
+            self.minutes_by_ticket[ticket] = \
+                self.minutes_by_ticket.get(ticket, 0) + minutes
+
+        for date_ordinal, minutes in file_totals.minutes_by_day.items():
+            self.minutes_by_day[date_ordinal] = \
+                self.minutes_by_day.get(date_ordinal, 0) + minutes
+
+    def get_total_minutes(self) -> int:
+        return sum(self.minutes_by_ticket.values())
+
+
+def aggregate_file(
+    path: str,
+    start_ordinal: Optional[int]=None,
+    end_ordinal: Optional[int]=None
+) -> FileTotals:
+    """
+    Count worked time in file with given `path` by ticket and by day.
+    Only lines with dates in range [`start_ordinal`, `end_ordinal`)
+    are counted, if range is given.
+    Errors are reported in result instead of raising.
+    """
+    file_totals = FileTotals(path)
+
+    minutes_by_ticket = file_totals.minutes_by_ticket
+    minutes_by_day = file_totals.minutes_by_day
+    parse = timesheet_line_parser.parse
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.rstrip('\r\n')
+
+                timesheet_info = parse(line)
+
+                if not timesheet_info:
+                    stripped_line = line.strip()
+                    if stripped_line and not stripped_line.startswith('#'):
+                        file_totals.invalid_lines.append(line_number)
+                    continue
+
+                date_ordinal = timesheet_info.date_ordinal
+                if start_ordinal is not None and date_ordinal < start_ordinal:
+                    continue
+                if end_ordinal is not None and date_ordinal >= end_ordinal:
+                    continue
+
+                if timesheet_info.to_minutes is None:
+                    file_totals.unfinished_lines.append(line_number)
+                    continue
+
+                line_minutes = timesheet_info.worked_minutes()
+                ticket = timesheet_info.ticket
+
+                minutes_by_ticket[ticket] = \
+                    minutes_by_ticket.get(ticket, 0) + line_minutes
+                minutes_by_day[date_ordinal] = \
+                    minutes_by_day.get(date_ordinal, 0) + line_minutes
+    except (OSError, UnicodeDecodeError) as e:
+        file_totals.error = str(e)
+
+    return file_totals
+
+
+def aggregate_files(
+    paths: Iterable[str],
+    start_ordinal: Optional[int]=None,
+    end_ordinal: Optional[int]=None,
+    max_workers: Optional[int]=None
+) -> BatchTotals:
+    """
+    Count worked time in files with given `paths` by ticket and by day,
+    see `aggregate_file`. Files are processed in parallel by
+    `max_workers` processes (number of CPUs by default),
+    results are merged in order of `paths`.
+    Error in single file doesn't stop processing of other files.
+    Raise ValueError if `max_workers` is less than 1.
+    """
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(
+            'max_workers should be at least 1, got {}'.format(max_workers)
+        )
+
+    paths = list(paths)
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(aggregate_file, path, start_ordinal, end_ordinal):
+                path
+            for path in paths
+        }
+
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                results[path] = FileTotals(path)
+                results[path].error = str(e) or e.__class__.__name__
+
+    batch_totals = BatchTotals()
+    for path in paths:
+        batch_totals.merge(results[path])
+
+    return batch_totals
+
+
+def iter_timesheet_files(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Iterate given file paths, files of given directories
+    are iterated recursively (hidden files are skipped).
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for directory, directory_names, file_names in os.walk(path):
+            directory_names[:] = sorted(
+                name
+                for name in directory_names
+                if not name.startswith('.')
+            )
+
+            for file_name in sorted(file_names):
+                if not file_name.startswith('.'):
+                    yield os.path.join(directory, file_name)
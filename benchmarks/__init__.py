@@ -0,0 +1,29 @@
+"""
+Benchmarks of parsing, scanning and counting of worked time
+on synthetic timesheets of different sizes.
+
+Run outside of Sublime Text (directory which contains this package
+should be current directory or should be listed in PYTHONPATH):
+
+    python3 -m timesheets.benchmarks --output results.json
+    python3 -m timesheets.benchmarks --sizes 1000 1000000 \\
+        --compare results.json
+
+Outside of Sublime Text, benchmarks of views use in-memory stand-in
+of Sublime Text API from `tests/fake_sublime.py`. Its calls could be
+slowed down to see how code around them depends on latency of API:
+
+    python3 -m timesheets.benchmarks --sizes 100000 --latency 0.01
+
+Run all benchmarks against real views inside Sublime Text
+with UnitTesting package, from Sublime console:
+
+    window.run_command('unit_testing', {
+        'package': 'timesheets',
+        'tests_dir': 'benchmarks',
+        'pattern': 'bench_*.py',
+    })
+
+Results are saved into "Timesheets/benchmarks.json"
+in Sublime cache directory.
+"""
@@ -0,0 +1,120 @@
+"""
+Run benchmarks outside of Sublime Text, see `benchmarks/__init__.py`.
+"""
+import argparse
+import sys
+import unittest
+
+from timesheets.benchmarks import base, bench_core
+from timesheets.tests import fake_sublime
+
+try:
+    from typing import List, Optional
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import List, Optional
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    """Entry-point, return exit code."""
+    parser = argparse.ArgumentParser(
+        prog='python3 -m timesheets.benchmarks',
+        description='Measure parsing and counting of worked time '
+                    'on generated timesheets.'
+    )
+    parser.add_argument(
+        '-s', '--sizes',
+        nargs='+',
+        type=int,
+        default=base.SIZES,
+        help='numbers of lines of generated timesheets (default: {})'.format(
+            ' '.join(map(str, base.SIZES))
+        )
+    )
+    parser.add_argument(
+        '-r', '--repeat',
+        type=int,
+        default=base.REPEAT,
+        help='number of runs of every benchmark, best time is taken '
+             '(default: {})'.format(base.REPEAT)
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='save results to this JSON file'
+    )
+    parser.add_argument(
+        '-c', '--compare',
+        help='compare results with results saved before to this JSON file'
+    )
+    parser.add_argument(
+        '-l', '--latency',
+        type=float,
+        default=0.0,
+        help='simulated latency of every call of Sublime Text API '
+             'in milliseconds (default: 0)'
+    )
+    args = parser.parse_args(argv)
+
+    base.SIZES = args.sizes
+    base.REPEAT = args.repeat
+
+    # Views are stand-ins outside of Sublime Text, so benchmarks
+    # of view show cost of code around API calls, and how it grows
+    # with latency of calls
+    fake_sublime.install(args.latency / 1000)
+    from timesheets.benchmarks import bench_view
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite([
+        loader.loadTestsFromModule(bench_core),
+        loader.loadTestsFromModule(bench_view),
+    ])
+    result = unittest.TextTestRunner(stream=sys.stderr).run(suite)
+
+    if args.output:
+        base.save_results(args.output)
+
+    previous_results = base.load_results(args.compare) if args.compare \
+        else {}
+    print_results(previous_results)
+
+    return 0 if result.wasSuccessful() else 1
+
+
+def print_results(previous_results: dict):
+    """
+    Print best time of every benchmark in milliseconds,
+    and how it's changed since previous results if they're given.
+    """
+    rows = []
+    for name in sorted(base.results):
+        for size, timing in sorted(
+            base.results[name].items(),
+            key=lambda item: int(item[0])
+        ):
+            row = [name, size, '{:.2f}'.format(timing['best'] * 1000)]
+
+            previous_timing = previous_results.get(name, {}).get(size)
+            if previous_timing:
+                row.append('{:+.0%}'.format(
+                    timing['best'] / previous_timing['best'] - 1
+                ))
+
+            rows.append(row)
+
+    if not rows:
+        return
+
+    widths = [
+        max(len(row[column]) for row in rows if len(row) > column)
+        for column in range(max(map(len, rows)))
+    ]
+    for row in rows:
+        print('  '.join(
+            value.ljust(width) if column < 2 else value.rjust(width)
+            for column, (value, width) in enumerate(zip(row, widths))
+        ).rstrip())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
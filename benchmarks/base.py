@@ -0,0 +1,112 @@
+"""
+Measurement of benchmarks and storage of results.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from unittest import TestCase
+
+try:
+    from typing import Callable, Dict, Optional
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Callable, Dict, Optional
+
+
+# Numbers of lines of generated timesheets
+SIZES = [1000, 10000, 100000]
+
+# Number of runs of every benchmark, best time is taken
+REPEAT = 3
+
+# Results of benchmarks: by benchmark name and number of lines,
+# best and mean time in seconds
+results = {}
+
+
+class BenchmarkCase(TestCase):
+    """
+    Benchmarks are test cases, so they could be run by UnitTesting
+    inside Sublime Text and by `unittest` outside of it.
+    Every test measures something on timesheets of all `SIZES`.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # Inside Sublime Text there's no runner to save results at the end,
+        # so they're saved after every class
+        try:
+            import sublime
+            cache_path = sublime.cache_path()
+        except (ImportError, AttributeError):
+            return
+
+        # Stand-in of API is used outside of Sublime Text, where
+        # results are saved by runner
+        if sublime.__name__ != 'sublime':
+            return
+
+        if cache_path:
+            save_results(
+                os.path.join(cache_path, 'Timesheets', 'benchmarks.json')
+            )
+
+    def measure(self, name: str, size: int, func: Callable[[], object]):
+        """
+        Run `func` several times and record its time as result
+        of benchmark with given `name` on timesheet of `size` lines.
+        """
+        timings = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        results.setdefault(name, {})[str(size)] = {
+            'best': min(timings),
+            'mean': sum(timings) / len(timings),
+        }
+
+
+def get_commit() -> Optional[str]:
+    """Return current git commit of package, if it's available."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return
+
+
+def save_results(path: str):
+    """Save recorded results with info about environment as JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(
+            {
+                'commit': get_commit(),
+                'python': platform.python_version(),
+                'platform': sys.platform,
+                'time': datetime.now().isoformat(),
+                'results': results,
+            },
+            f,
+            indent=2,
+            sort_keys=True
+        )
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Return results saved by `save_results`."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
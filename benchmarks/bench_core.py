@@ -0,0 +1,101 @@
+"""
+Benchmarks of parsing and counting, which don't need Sublime Text API.
+"""
+from timesheets.benchmarks import base
+from timesheets.benchmarks.base import BenchmarkCase
+from timesheets.benchmarks.generate import get_lines
+from timesheets.core import DateIndex, check_day, group_by_date
+from timesheets.core import iter_timesheet_info, lint_lines, summarize
+from timesheets.core import timesheet_line_parser
+from timesheets.entry_table import EntryTable
+
+
+class BenchmarkCore(BenchmarkCase):
+    def get_entries(self, size: int):
+        return list(iter_timesheet_info(get_lines(size)))
+
+    def test_parse(self):
+        parse = timesheet_line_parser.parse
+
+        for size in base.SIZES:
+            lines = get_lines(size)
+            self.measure(
+                'parser.parse',
+                size,
+                lambda: [parse(line) for line in lines]
+            )
+
+    def test_summarize(self):
+        """Counting of all periods by streaming all lines."""
+        for size in base.SIZES:
+            entries = self.get_entries(size)
+            # Today is date of the last line
+            today = entries[-1].date
+            self.measure(
+                'summary.summarize',
+                size,
+                lambda: summarize(
+                    entries,
+                    ['today', 'week', 'month', 'year'],
+                    today
+                )
+            )
+
+    def test_date_index(self):
+        for size in base.SIZES:
+            entries = self.get_entries(size)
+            # Today is date of the last line
+            today = entries[-1].date
+
+            self.measure(
+                'summary.date_index_build',
+                size,
+                lambda: DateIndex(entries)
+            )
+
+            date_index = DateIndex(entries)
+            self.measure(
+                'summary.date_index_summarize',
+                size,
+                lambda: date_index.summarize(['today', 'week'], today)
+            )
+
+    def test_entry_table(self):
+        for size in base.SIZES:
+            entries = self.get_entries(size)
+
+            self.measure(
+                'entry_table.build',
+                size,
+                lambda: EntryTable.from_entries(entries)
+            )
+
+            table = EntryTable.from_entries(entries)
+            self.measure(
+                'entry_table.group_by_ticket',
+                size,
+                table.group_by_ticket
+            )
+
+    def test_check(self):
+        for size in base.SIZES:
+            lines = get_lines(size)
+            entries = [timesheet_line_parser.parse(line) for line in lines]
+
+            self.measure(
+                'check.lint_lines',
+                size,
+                lambda: lint_lines(lines, entries)
+            )
+            self.measure(
+                'check.check_days',
+                size,
+                lambda: [
+                    check_day(day_lines, 60)
+                    for day_lines in group_by_date(
+                        (row, entry)
+                        for row, entry in enumerate(entries)
+                        if entry
+                    ).values()
+                ]
+            )
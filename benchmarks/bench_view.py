@@ -0,0 +1,123 @@
+"""
+Benchmarks of reading lines from view, counting worked time in view
+and lookups of duplicate command. They need Sublime Text API.
+"""
+from unittest import skipUnless
+
+from timesheets.benchmarks import base
+from timesheets.benchmarks.base import BenchmarkCase
+from timesheets.benchmarks.generate import get_content
+
+try:
+    import sublime
+    from timesheets.helpers import SublimeHelper, TimesheetHelper
+    from timesheets.timesheet_index import TimesheetIndex
+except ImportError:
+    sublime = None
+
+
+@skipUnless(sublime, 'Sublime Text API is not available')
+class BenchmarkView(BenchmarkCase):
+    def setUp(self):
+        self.views = []
+
+    def tearDown(self):
+        for view in self.views:
+            TimesheetIndex.forget(view)
+            view.set_scratch(True)
+            view.window().focus_view(view)
+            view.window().run_command('close_file')
+
+    def create_view(self, size: int) -> 'sublime.View':
+        """Return view with generated timesheet of `size` lines."""
+        view = sublime.active_window().new_file()
+        view.run_command('append', {'characters': get_content(size)})
+        self.views.append(view)
+        return view
+
+    def test_iter_lines_reversed(self):
+        """Full reverse scan, by chunks and by single lines."""
+        for size in base.SIZES:
+            sublime_helper = SublimeHelper(self.create_view(size))
+
+            self.measure(
+                'view.iter_lines_reversed',
+                size,
+                lambda: sum(1 for _ in sublime_helper.iter_lines_reversed())
+            )
+            self.measure(
+                'view.iter_lines_reversed_by_line',
+                size,
+                lambda: sum(
+                    1 for _ in sublime_helper.iter_lines_reversed(bulk=False)
+                )
+            )
+
+    def test_worked_summary(self):
+        """Worked time today and this week, as shown in status bar."""
+        for size in base.SIZES:
+            view = self.create_view(size)
+            timesheet_helper = TimesheetHelper(SublimeHelper(view))
+            self.measure(
+                'view.worked_week_minutes',
+                size,
+                timesheet_helper.worked_week_minutes
+            )
+
+            index = TimesheetIndex.for_view(view)
+            index.update()
+            timesheet_helper = TimesheetHelper(SublimeHelper(view), index)
+            self.measure(
+                'view.worked_summary_indexed',
+                size,
+                timesheet_helper.worked_summary
+            )
+
+    def test_index(self):
+        """Parsing of whole view, and update after small change."""
+        for size in base.SIZES:
+            view = self.create_view(size)
+
+            self.measure(
+                'index.load',
+                size,
+                lambda: TimesheetIndex(view).update()
+            )
+
+            index = TimesheetIndex.for_view(view)
+            index.update()
+
+            def modify_and_update():
+                view.run_command('append', {'characters': '# comment\n'})
+                index.update()
+
+            self.measure('index.update_appended', size, modify_and_update)
+
+            index.get_lines_by_date()
+
+            def append_line_and_group():
+                view.run_command('append', {'characters': get_content(1)})
+                index.get_lines_by_date()
+
+            self.measure(
+                'index.lines_by_date_appended',
+                size,
+                append_line_and_group
+            )
+
+    def test_duplicate_lookups(self):
+        """Lookups done by duplicate command before insertion of line."""
+        for size in base.SIZES:
+            view = self.create_view(size)
+            view.sel().clear()
+            view.sel().add(sublime.Region(view.size() - 1))
+
+            index = TimesheetIndex.for_view(view)
+            index.update()
+            timesheet_helper = TimesheetHelper(SublimeHelper(view), index)
+
+            def lookups():
+                timesheet_helper.get_timesheet_info_under_cursor()
+                index.get_last_lines()
+
+            self.measure('duplicate.lookups', size, lookups)
@@ -0,0 +1,94 @@
+"""
+Synthetic timesheets for benchmarks.
+"""
+import random
+from datetime import date, timedelta
+
+try:
+    from typing import List
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import List
+
+
+# Generated timesheets by number of lines, see `get_lines`
+generated = {}
+
+
+def generate_lines(
+    count: int,
+    seed: int=0,
+    start_date: date=date(2000, 1, 3),
+    tickets_count: int=200
+) -> List[str]:
+    """
+    Return `count` lines of timesheet in chronological order:
+    several timesheet lines per day with comments of different length,
+    empty line between days, comment lines from time to time,
+    some lines in progress (without time_to), including the last line.
+    Same lines are returned for same arguments.
+    """
+    rand = random.Random(seed)
+    words = ['fix', 'review', 'meeting', 'deploy', 'investigate', 'bug',
+             'feature', 'tests', 'docs', 'refactoring', 'call', 'release']
+
+    lines = []
+    day = start_date
+
+    while len(lines) < count:
+        minutes = rand.randrange(8 * 60, 11 * 60, 5)
+
+        for _ in range(rand.randint(3, 10)):
+            if len(lines) >= count:
+                break
+
+            if not rand.randrange(50):
+                lines.append('# {}'.format(' '.join(
+                    rand.choice(words) for _ in range(rand.randint(1, 8))
+                )))
+                continue
+
+            duration = rand.randrange(5, 180, 5)
+            if minutes + duration >= 24 * 60:
+                break
+
+            time_to = '{:02}:{:02}'.format(*divmod(minutes + duration, 60))
+            if not rand.randrange(100):
+                time_to = '     '
+
+            lines.append('{},{:02}:{:02},{},PROJECT-{},"{}"'.format(
+                day.isoformat(),
+                minutes // 60, minutes % 60,
+                time_to,
+                rand.randrange(tickets_count),
+                ' '.join(
+                    rand.choice(words) for _ in range(rand.randint(0, 20))
+                )
+            ))
+
+            minutes += duration + rand.choice([0, 0, 0, 5, 30, 60])
+
+        if len(lines) < count:
+            lines.append('')
+
+        day += timedelta(days=1)
+
+    # Work on the last line is in progress
+    for row in range(len(lines) - 1, -1, -1):
+        if lines[row][:1].isdigit():
+            lines[row] = lines[row][:17] + '     ' + lines[row][22:]
+            break
+
+    return lines
+
+
+def get_lines(count: int) -> List[str]:
+    """Return generated timesheet of `count` lines, generate it once."""
+    if count not in generated:
+        generated[count] = generate_lines(count)
+    return generated[count]
+
+
+def get_content(count: int) -> str:
+    """Return content of generated timesheet of `count` lines."""
+    return '\n'.join(get_lines(count)) + '\n'
@@ -1,2 +1,2 @@
 del release\timesheets.sublime-package
-7z a -r -tzip -mx=0 release\timesheets.sublime-package *.sublime-* *.py *.md -x!tests -x!sublime.py -x!sublime_plugin.py -x!.idea
\ No newline at end of file
+7z a -r -tzip -mx=0 release\timesheets.sublime-package *.sublime-* *.py *.md -x!tests -x!benchmarks -x!sublime.py -x!sublime_plugin.py -x!.idea
\ No newline at end of file
@@ -0,0 +1,759 @@
+"""
+Parsing of timesheet lines and counting of worked time.
+This module doesn't depend on Sublime Text API,
+so it's also used outside of editor, see `__main__.py`.
+"""
+import math
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time
+from itertools import chain
+from operator import attrgetter
+
+try:
+    from typing import Callable, Dict, Optional, Iterable, Iterator, List
+    from typing import Tuple, Union
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Optional, Iterable, Iterator, List
+    from timesheets.typing.typing import Callable, Dict, Tuple, Union
+
+
+class TimesheetEntry:
+    """
+    Single timesheet line.
+
+    Date is stored as ordinal (see `date.toordinal()`),
+    time_from and time_to as minutes since midnight,
+    so entries are compact and cheap to sum up.
+    `datetime` objects are built only on demand.
+    """
+
+    __slots__ = ('date_ordinal', 'from_minutes', 'to_minutes', 'ticket',
+                 'comment')
+
+    def __init__(
+        self,
+        date_ordinal: int,
+        from_minutes: int,
+        to_minutes: Optional[int],
+        ticket: str,
+        comment: str
+    ):
+        self.date_ordinal = date_ordinal
+        self.from_minutes = from_minutes
+        # None if time_to isn't filled yet (work is in progress)
+        self.to_minutes = to_minutes
+        self.ticket = ticket
+        self.comment = comment
+
+    @property
+    def date(self) -> date:
+        return date.fromordinal(self.date_ordinal)
+
+    @property
+    def from_dt(self) -> datetime:
+        return self._minutes_to_dt(self.from_minutes)
+
+    @property
+    def to_dt(self) -> Optional[datetime]:
+        if self.to_minutes is None:
+            return
+        return self._minutes_to_dt(self.to_minutes)
+
+    @property
+    def issue(self) -> Tuple[str, str]:
+        """Return bug tracker and ticket id."""
+        return 'jira', self.ticket
+
+    def worked_minutes(self, now: Optional[datetime]=None) -> float:
+        """
+        Return how much time is worked.
+        If work is in progress (time_to isn't filled),
+        count it till `now` (current time by default).
+        """
+        if self.to_minutes is not None:
+            return self.to_minutes - self.from_minutes
+
+        return ((now or datetime.now()) - self.from_dt).total_seconds() / 60
+
+    def to_line(self) -> str:
+        """Return timesheet line of entry, empty time_to is left blank."""
+        return '{},{},{},{},{}'.format(
+            self.date.isoformat(),
+            prettify_minutes(self.from_minutes),
+            ' ' * len('12:00') if self.to_minutes is None
+            else prettify_minutes(self.to_minutes),
+            self.ticket,
+            self.comment,
+        )
+
+    def _minutes_to_dt(self, minutes: int) -> datetime:
+        hour, minute = divmod(minutes, 60)
+        return datetime.combine(self.date, time(hour, minute))
+
+    def __eq__(self, other):
+        if not isinstance(other, TimesheetEntry):
+            return NotImplemented
+        return (
+            self.date_ordinal == other.date_ordinal and
+            self.from_minutes == other.from_minutes and
+            self.to_minutes == other.to_minutes and
+            self.ticket == other.ticket and
+            self.comment == other.comment
+        )
+
+    def __repr__(self):
+        return 'TimesheetEntry({!r}, {!r}, {!r}, {!r}, {!r})'.format(
+            self.date_ordinal,
+            self.from_minutes,
+            self.to_minutes,
+            self.ticket,
+            self.comment,
+        )
+
+
+class RoundingPolicy:
+    """
+    How time is rounded: both time of lines inserted by commands
+    and billable time of every line. Time is rounded to `granularity`
+    minutes down ("floor"), up ("ceil") or to nearest value ("nearest"),
+    billable time of line is at least `minimum` minutes.
+    """
+
+    __slots__ = ('granularity', 'mode', 'minimum')
+
+    modes = ('floor', 'ceil', 'nearest')
+
+    def __init__(
+        self,
+        granularity: int=10,
+        mode: str='floor',
+        minimum: int=0
+    ):
+        if granularity <= 0 or granularity > 24 * 60:
+            raise ValueError('Invalid granularity {!r}'.format(granularity))
+        if mode not in self.modes:
+            raise ValueError('Unknown rounding mode {!r}'.format(mode))
+        if minimum < 0:
+            raise ValueError('Invalid minimum {!r}'.format(minimum))
+
+        self.granularity = granularity
+        self.mode = mode
+        self.minimum = minimum
+
+    @classmethod
+    def from_settings(cls, settings: Optional[dict]) -> 'RoundingPolicy':
+        """
+        Return policy from value of "rounding" setting, e.g.
+        {"granularity": 15, "mode": "nearest", "minimum": 15}.
+        Raise ValueError if it's invalid.
+        """
+        settings = settings or {}
+        try:
+            return cls(
+                int(settings.get('granularity', 10)),
+                settings.get('mode', 'floor'),
+                int(settings.get('minimum', 0))
+            )
+        except (TypeError, AttributeError) as e:
+            raise ValueError(str(e))
+
+    def round_minutes(self, minutes: float) -> int:
+        """Return given minutes rounded to granularity."""
+        parts = minutes / self.granularity
+        if self.mode == 'floor':
+            parts = math.floor(parts)
+        elif self.mode == 'ceil':
+            parts = math.ceil(parts)
+        else:
+            parts = math.floor(parts + 0.5)
+        return int(parts) * self.granularity
+
+    def round_time(self, dt: datetime) -> datetime:
+        """
+        Return given time rounded to granularity, e.g. with default policy:
+        12:00 -> 12:00
+        12:09 -> 12:00
+        Seconds are dropped before rounding. Time isn't rounded
+        past the end of the day, so it's 23:59 at most.
+        """
+        minutes = min(
+            self.round_minutes(dt.hour * 60 + dt.minute),
+            24 * 60 - 1
+        )
+        return datetime.combine(dt.date(), time(*divmod(minutes, 60)))
+
+    def billable_minutes(self, minutes: float) -> float:
+        """Return billable time of line which took given minutes."""
+        if minutes <= 0:
+            return minutes
+        return max(self.round_minutes(minutes), self.minimum)
+
+
+class WorkedSummary:
+    """
+    How much time is worked in several periods,
+    see `TimesheetHelper.worked_summary`.
+
+    Time of finished lines is summed up once, time of lines in progress
+    (without time_to) is counted on demand, so worked time could be
+    refreshed as time goes without parsing lines again.
+
+    If `rounding` policy is given, billable time is summed up too.
+    """
+
+    def __init__(
+        self,
+        periods: Iterable[Union[str, int]],
+        rounding: Optional[RoundingPolicy]=None
+    ):
+        self.periods = list(periods)
+        self.rounding = rounding
+
+        # Worked minutes of finished lines, by period
+        self.finished_minutes = dict.fromkeys(self.periods, 0)
+
+        # Billable minutes of finished lines, by period
+        self.finished_billable_minutes = dict.fromkeys(self.periods, 0)
+
+        # Lines in progress, with list of periods each line belongs to
+        self.unfinished = []
+
+        # Time when summary is calculated
+        self.now = datetime.now()
+
+    def has_unfinished(self) -> bool:
+        """Return True if some work is in progress."""
+        return bool(self.unfinished)
+
+    def get_minutes(
+        self,
+        period: Union[str, int],
+        now: Optional[datetime]=None
+    ) -> float:
+        """
+        Return worked minutes of given `period`,
+        counting work in progress till `now`
+        (time when summary is calculated by default).
+        """
+        now = now or self.now
+
+        minutes = self.finished_minutes[period]
+        for timesheet_info, periods in self.unfinished:
+            if period in periods:
+                minutes += timesheet_info.worked_minutes(now)
+
+        return minutes
+
+    def get_billable_minutes(
+        self,
+        period: Union[str, int],
+        now: Optional[datetime]=None
+    ) -> float:
+        """
+        Return billable minutes of given `period`, see `get_minutes`.
+        Summary should be calculated with rounding policy.
+        """
+        now = now or self.now
+
+        minutes = self.finished_billable_minutes[period]
+        for timesheet_info, periods in self.unfinished:
+            if period in periods:
+                minutes += self.rounding.billable_minutes(
+                    timesheet_info.worked_minutes(now)
+                )
+
+        return minutes
+
+    def add(
+        self,
+        timesheet_info: TimesheetEntry,
+        periods: List[Union[str, int]]
+    ):
+        """Count given timesheet line in given `periods`."""
+        if timesheet_info.to_minutes is None:
+            self.unfinished.append((timesheet_info, periods))
+            return
+
+        line_minutes = timesheet_info.worked_minutes()
+        for period in periods:
+            self.finished_minutes[period] += line_minutes
+
+        if self.rounding:
+            line_billable_minutes = \
+                self.rounding.billable_minutes(line_minutes)
+            for period in periods:
+                self.finished_billable_minutes[period] += \
+                    line_billable_minutes
+
+    def __getitem__(self, period: Union[str, int]) -> float:
+        return self.get_minutes(period)
+
+
+class TimesheetLineParser:
+    """Parser of single timesheet line by precompiled regexp."""
+
+    # Ticket id, e.g. PROJECT-123
+    ticket_pattern = r'[\w_\-\d]+'
+
+    line_re = re.compile(
+        r'^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2}),'
+        r'(?P<from_hour>\d{2}):(?P<from_min>\d{2}),'
+        r'(?P<to>\d{2}:\d{2}|[\s]*),'
+        r'(?P<jira_issue>' + ticket_pattern + r'),'
+        r'(?P<comment>.*)$'
+    )
+    ticket_re = re.compile(r'^' + ticket_pattern + r'$')
+
+    def parse(self, line: str) -> Optional[TimesheetEntry]:
+        """
+        Parse given `line`.
+        Return `TimesheetEntry` if line is valid timesheet line,
+        or None otherwise.
+        """
+        match = self.line_re.match(line)
+
+        if not match:
+            return
+
+        if match.group('to').strip():
+            to_hour, to_min = match.group('to').split(':')
+        else:
+            to_hour, to_min = None, None
+
+        return self._make_entry(
+            match.group('year'), match.group('month'), match.group('day'),
+            match.group('from_hour'), match.group('from_min'),
+            to_hour, to_min,
+            match.group('jira_issue'), match.group('comment')
+        )
+
+    def get_error(self, line: str) -> str:
+        """Return why given `line` isn't valid timesheet line."""
+        match = self.line_re.match(line)
+        if not match:
+            return 'invalid timesheet line'
+
+        try:
+            date(
+                int(match.group('year')),
+                int(match.group('month')),
+                int(match.group('day'))
+            )
+        except ValueError:
+            return 'date {}-{}-{} does not exist'.format(
+                match.group('year'), match.group('month'), match.group('day')
+            )
+
+        if self._to_minutes(
+            match.group('from_hour'),
+            match.group('from_min')
+        ) is None:
+            return 'time_from {}:{} does not exist'.format(
+                match.group('from_hour'), match.group('from_min')
+            )
+
+        return 'time_to {} does not exist'.format(match.group('to'))
+
+    def _make_entry(
+        self,
+        year: str,
+        month: str,
+        day: str,
+        from_hour: str,
+        from_min: str,
+        to_hour: Optional[str],
+        to_min: Optional[str],
+        ticket: str,
+        comment: str
+    ) -> Optional[TimesheetEntry]:
+        """
+        Build entry from raw fields.
+        Return None if date or time doesn't exist (e.g. "2018-02-30", "24:00").
+        """
+        try:
+            date_ordinal = date(int(year), int(month), int(day)).toordinal()
+        except ValueError:
+            return
+
+        from_minutes = self._to_minutes(from_hour, from_min)
+        if from_minutes is None:
+            return
+
+        if to_hour is not None:
+            to_minutes = self._to_minutes(to_hour, to_min)
+            if to_minutes is None:
+                return
+        else:
+            to_minutes = None
+
+        return TimesheetEntry(
+            date_ordinal, from_minutes, to_minutes, ticket, comment
+        )
+
+    def _to_minutes(self, hour: str, minute: str) -> Optional[int]:
+        """
+        Return minutes since midnight for given time,
+        or None if time is invalid.
+        """
+        hour, minute = int(hour), int(minute)
+        if hour > 23 or minute > 59:
+            return
+        return hour * 60 + minute
+
+
+timesheet_line_parser = TimesheetLineParser()
+
+
+def get_period_range(
+    period: Union[str, int],
+    today: date
+) -> Tuple[int, int]:
+    """
+    Return range of date ordinals of given `period`,
+    end of range is not included. Period could be:
+    "today";
+    "week" - ISO week (from monday to sunday);
+    "month" - calendar month;
+    "year" - calendar year;
+    number of days - that many last days including today.
+    """
+    today_ordinal = today.toordinal()
+
+    if period == 'today':
+        return today_ordinal, today_ordinal + 1
+
+    if period == 'week':
+        week_start_ordinal = today_ordinal - today.weekday()
+        return week_start_ordinal, week_start_ordinal + 7
+
+    if period == 'month':
+        if today.month == 12:
+            next_month = date(today.year + 1, 1, 1)
+        else:
+            next_month = date(today.year, today.month + 1, 1)
+        return \
+            date(today.year, today.month, 1).toordinal(), \
+            next_month.toordinal()
+
+    if period == 'year':
+        return \
+            date(today.year, 1, 1).toordinal(), \
+            date(today.year + 1, 1, 1).toordinal()
+
+    if isinstance(period, int) and period > 0:
+        return today_ordinal - period + 1, today_ordinal + 1
+
+    raise ValueError('Unknown period {!r}'.format(period))
+
+
+def summarize_reversed(
+    timesheets_info: Iterable[TimesheetEntry],
+    periods: Iterable[Union[str, int]],
+    today: date,
+    rounding: Optional[RoundingPolicy]=None
+) -> WorkedSummary:
+    """
+    Count how much time is worked in each of given `periods`
+    based on given timesheet info objects in reverse order
+    (from last line to first), and billable time if `rounding`
+    policy is given.
+    Lines are expected to be in chronological order, so counting time
+    of period stops at first line that doesn't belong to it,
+    and iteration stops when all periods are counted.
+    """
+    summary = WorkedSummary(periods, rounding)
+
+    # Periods that are still being counted, with their date ranges
+    active_periods = [
+        (period, get_period_range(period, today))
+        for period in summary.periods
+    ]
+
+    for timesheet_info in timesheets_info:
+        date_ordinal = timesheet_info.date_ordinal
+
+        active_periods = [
+            (period, (start_ordinal, end_ordinal))
+            for period, (start_ordinal, end_ordinal) in active_periods
+            if start_ordinal <= date_ordinal < end_ordinal
+        ]
+        if not active_periods:
+            break
+
+        summary.add(timesheet_info, [period for period, _ in active_periods])
+
+    return summary
+
+
+def summarize(
+    timesheets_info: Iterable[TimesheetEntry],
+    periods: Iterable[Union[str, int]],
+    today: date,
+    rounding: Optional[RoundingPolicy]=None
+) -> WorkedSummary:
+    """
+    Count how much time is worked in each of given `periods`
+    based on given timesheet info objects in any order,
+    and billable time if `rounding` policy is given.
+    All objects are consumed one by one, they aren't kept in memory.
+    """
+    summary = WorkedSummary(periods, rounding)
+
+    period_ranges = [
+        (period, get_period_range(period, today))
+        for period in summary.periods
+    ]
+
+    for timesheet_info in timesheets_info:
+        date_ordinal = timesheet_info.date_ordinal
+
+        line_periods = [
+            period
+            for period, (start_ordinal, end_ordinal) in period_ranges
+            if start_ordinal <= date_ordinal < end_ordinal
+        ]
+        if line_periods:
+            summary.add(timesheet_info, line_periods)
+
+    return summary
+
+
+class DateIndex:
+    """
+    Timesheet lines sorted by date, to find lines of any range of dates
+    by binary search, regardless of order of lines in timesheet.
+    """
+
+    # Number of changed lines up to which new index is made by patching
+    # this one, more changed lines are sorted again
+    max_patch_size = 64
+
+    def __init__(self, timesheets_info: Iterable[TimesheetEntry]=()):
+        # Sorting is stable and takes linear time
+        # if lines are in chronological order already
+        self.entries = sorted(timesheets_info, key=attrgetter('date_ordinal'))
+        self.date_ordinals = [entry.date_ordinal for entry in self.entries]
+
+    def patched(
+        self,
+        removed: List[TimesheetEntry],
+        added: List[TimesheetEntry]
+    ) -> 'DateIndex':
+        """
+        Return new index without `removed` lines (the same objects
+        as in this index) and with `added` lines. Only changed lines
+        are looked up and inserted by binary search, this index
+        isn't changed, so it could be read from other threads meanwhile.
+        """
+        if len(removed) + len(added) > self.max_patch_size:
+            removed_ids = set(map(id, removed))
+            return DateIndex(chain(
+                (
+                    entry
+                    for entry in self.entries
+                    if id(entry) not in removed_ids
+                ),
+                added
+            ))
+
+        date_index = DateIndex()
+        entries = date_index.entries = list(self.entries)
+        date_ordinals = date_index.date_ordinals = list(self.date_ordinals)
+
+        for entry in removed:
+            position = bisect_left(date_ordinals, entry.date_ordinal)
+            while entries[position] is not entry:
+                position += 1
+            del entries[position]
+            del date_ordinals[position]
+
+        for entry in added:
+            position = bisect_right(date_ordinals, entry.date_ordinal)
+            entries.insert(position, entry)
+            date_ordinals.insert(position, entry.date_ordinal)
+
+        return date_index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_range(
+        self,
+        start_ordinal: int,
+        end_ordinal: int
+    ) -> List[TimesheetEntry]:
+        """
+        Return timesheet lines with dates in range
+        [`start_ordinal`, `end_ordinal`), sorted by date.
+        """
+        start = bisect_left(self.date_ordinals, start_ordinal)
+        end = bisect_left(self.date_ordinals, end_ordinal, start)
+        return self.entries[start:end]
+
+    def summarize(
+        self,
+        periods: Iterable[Union[str, int]],
+        today: date,
+        rounding: Optional[RoundingPolicy]=None
+    ) -> WorkedSummary:
+        """
+        Count how much time is worked in each of given `periods`,
+        and billable time if `rounding` policy is given.
+        Only lines in range of dates of all periods are visited.
+        """
+        periods = list(periods)
+        period_ranges = [
+            get_period_range(period, today)
+            for period in periods
+        ]
+        if not period_ranges:
+            return WorkedSummary(periods, rounding)
+
+        return summarize(
+            self.get_range(
+                min(start_ordinal for start_ordinal, _ in period_ranges),
+                max(end_ordinal for _, end_ordinal in period_ranges)
+            ),
+            periods,
+            today,
+            rounding
+        )
+
+
+def lint_lines(
+    lines: List[str],
+    entries: List[Optional[TimesheetEntry]],
+    is_cancelled: Optional[Callable[[], bool]]=None
+) -> Optional[List[Tuple[int, str]]]:
+    """
+    Return problems of given `lines` (parsed lines are given in `entries`,
+    None for lines that aren't timesheet lines): lines that aren't valid
+    timesheet lines, except empty lines and comments, and lines with date
+    before date of lines above.
+    Problems are returned as line numbers and messages.
+    `is_cancelled` is called from time to time, if it returns True,
+    checking stops and None is returned.
+    """
+    problems = []
+    latest_date_ordinal = None
+
+    for row, entry in enumerate(entries):
+        if is_cancelled and not row % 1024 and is_cancelled():
+            return
+
+        if not entry:
+            line = lines[row].strip()
+            if line and not line.startswith('#'):
+                problems.append(
+                    (row, timesheet_line_parser.get_error(lines[row]))
+                )
+            continue
+
+        if latest_date_ordinal is None or \
+                entry.date_ordinal >= latest_date_ordinal:
+            latest_date_ordinal = entry.date_ordinal
+            continue
+
+        problems.append((
+            row,
+            'date is before {} of line above'.format(
+                date.fromordinal(latest_date_ordinal).isoformat()
+            )
+        ))
+
+    return problems
+
+
+def group_by_date(
+    timesheet_lines: Iterable[Tuple[int, TimesheetEntry]]
+) -> Dict[int, List[Tuple[int, TimesheetEntry]]]:
+    """Return given line numbers and parsed lines by date ordinal."""
+    lines_by_date = {}
+    for row, entry in timesheet_lines:
+        lines_by_date.setdefault(entry.date_ordinal, []).append((row, entry))
+    return lines_by_date
+
+
+def check_day(
+    timesheet_lines: Iterable[Tuple[int, TimesheetEntry]],
+    max_gap_minutes: int=0
+) -> List[Tuple[int, str]]:
+    """
+    Return problems of timesheet lines of single day: time_to before
+    time_from, lines that overlap with other lines, and gaps between
+    lines longer than `max_gap_minutes` (not checked if it's 0).
+    Lines are given with their numbers, problems are returned
+    as line numbers and messages, sorted by time of lines.
+    """
+    problems = []
+
+    # Latest end of lines before current one
+    previous_to_minutes = None
+
+    for row, entry in sorted(
+        timesheet_lines,
+        key=lambda timesheet_line: timesheet_line[1].from_minutes
+    ):
+        from_minutes = entry.from_minutes
+
+        # Lines in progress and negative lines aren't counted as ranges
+        to_minutes = entry.to_minutes
+        if to_minutes is None:
+            to_minutes = from_minutes
+        elif to_minutes < from_minutes:
+            problems.append((row, 'time_to is before time_from'))
+            to_minutes = from_minutes
+
+        if previous_to_minutes is not None:
+            if from_minutes < previous_to_minutes:
+                problems.append((
+                    row,
+                    'overlaps with other line till {}'.format(
+                        prettify_minutes(previous_to_minutes)
+                    )
+                ))
+            elif max_gap_minutes and \
+                    from_minutes - previous_to_minutes > max_gap_minutes:
+                problems.append((
+                    row,
+                    'gap of {} before this line'.format(
+                        prettify_minutes(from_minutes - previous_to_minutes)
+                    )
+                ))
+
+            to_minutes = max(to_minutes, previous_to_minutes)
+
+        previous_to_minutes = to_minutes
+
+    return problems
+
+
+def sort_minutes(minutes_by_key: Dict) -> List[Tuple]:
+    """Return items of given dict sorted by minutes, largest first."""
+    return sorted(
+        minutes_by_key.items(),
+        key=lambda item: (-item[1], item[0])
+    )
+
+
+def iter_timesheet_info(lines: Iterable[str]) -> Iterator[TimesheetEntry]:
+    """
+    Parse given `lines` one by one (e.g. lines of opened file),
+    yield info of valid timesheet lines.
+    """
+    parse = timesheet_line_parser.parse
+    for line in lines:
+        timesheet_info = parse(line.rstrip('\r\n'))
+        if timesheet_info:
+            yield timesheet_info
+
+
+def prettify_minutes(minutes_total: float) -> str:
+    """
+    Return time in format "<hours>:<minutes>" from given `minutes_total`.
+    E.g. 65 minutes -> "01:05".
+    """
+    hours, minutes = divmod(minutes_total, 60)
+    return '{:02}:{:02}'.format(int(hours), int(minutes))
@@ -1,17 +1,20 @@
-from datetime import datetime, time, timedelta
+from datetime import datetime
 from time import time as unixtime
 
 import sublime
 import sublime_plugin
 
-from timesheets.typing.typing import Optional
-from timesheets.helpers import SublimeHelper, TimesheetHelper
+from timesheets.typing.typing import List, Optional, Tuple
+from timesheets.helpers import SublimeHelper, TimesheetEntry
+from timesheets.helpers import TimesheetHelper, load_rounding_policy
+from timesheets.profiling import profiled
+from timesheets.timesheet_index import TimesheetIndex
 
 
 class DuplicateTimesheetLineCommand(sublime_plugin.TextCommand):
     """
-    Duplicate timesheet line under cursor,
-    insert it into appropriate place,
+    Duplicate timesheet lines under cursors,
+    insert them into appropriate place,
     fill time_from and/or time_to fields.
     """
 
@@ -19,96 +22,134 @@ class DuplicateTimesheetLineCommand(sublime_plugin.TextCommand):
         super().__init__(*args, **kwargs)
 
         self.sublime_helper = SublimeHelper(self.view)
-        self.timesheet_helper = TimesheetHelper(self.sublime_helper)
+        self.index = TimesheetIndex.for_view(self.view)
+        self.timesheet_helper = TimesheetHelper(
+            self.sublime_helper,
+            self.index
+        )
 
         self.regions_to_highlight = []
 
+    @profiled
     def run(self, edit: sublime.Edit, copy_issue_and_comment: bool=True):
-        """Entry-point, called when command is executed."""
+        """
+        Entry-point, called when command is executed.
+        Every timesheet line under cursors is duplicated, new lines
+        are inserted together in order of cursors, as single undo step.
+        """
 
-        # Extract timesheet info from line under cursor
-        timesheet_info = self.timesheet_helper.extract_timesheet_info(
-            self.sublime_helper.get_current_line_content()
-        )
+        # Extract timesheet info from lines under cursors
+        lines_under_cursors = self.get_lines_under_cursors()
 
-        # Do nothing if current line is not a timesheet line
-        if not timesheet_info:
+        # Do nothing if there are no timesheet lines under cursors
+        if not lines_under_cursors:
             self.view.window().status_message(
                 'No valid timesheet line under cursor to duplicate'
             )
             return
 
-        # Fill time_to if needed,
-        # remember it to later fill time_from of new timesheet line
-        new_time_to = self.fill_time_to(edit)
-
-        new_time_to = new_time_to or self.floor_time(datetime.now())
+        # Find last lines in single pass, before view is modified
+        last_non_empty_line, last_timesheet_line, last_timesheet_line_info = \
+            self.index.get_last_lines()
 
-        # Get last lines
-        last_non_empty_line = self.get_last_non_empty_line_region()
-        last_timesheet_line = self.get_last_timesheet_line_region()
+        # Current time is rounded once, it fills both time_to
+        # of latest line and time_from of new lines
+        now = self.round_time(datetime.now())
 
-        last_timesheet_line_info = self.timesheet_helper.extract_timesheet_info(
-            self.view.substr(last_timesheet_line)
+        # Find if time_to needs to be filled,
+        # remember it to later fill time_from of new timesheet lines
+        new_time_to, time_to_region = self.get_time_to_fill(
+            last_timesheet_line,
+            last_timesheet_line_info,
+            now
         )
 
-        # Determine line after which new timesheet line should be inserted,
+        new_time_to = new_time_to or now
+
+        # Determine line after which new timesheet lines should be inserted,
         # and if extra new line is needed.
         # Extra new line divides timesheet lines of different days,
         # or acts like separator from latest comment
         if self.timesheet_helper.is_today(last_timesheet_line_info):
-            insert_after_line = last_timesheet_line
-            extra_newline = False
+            insert_point = last_timesheet_line.end()
+            extra_newline = ''
         else:
-            insert_after_line = last_non_empty_line
-            extra_newline = True
-
-        # Compose new timesheet line content
-        new_timesheet_line_content = '\n{},{},{},{},{}'.format(
-            new_time_to.strftime('%Y-%m-%d'),
-            new_time_to.strftime('%H:%M'),
-            ' ' * len('12:00'),
-            timesheet_info['issue'][1] if copy_issue_and_comment else '',
-            timesheet_info['comment'] if copy_issue_and_comment else '',
+            insert_point = last_non_empty_line.end()
+            extra_newline = '\n'
+
+        # Compose new timesheet lines content
+        new_lines_content = [
+            TimesheetEntry(
+                new_time_to.date().toordinal(),
+                new_time_to.hour * 60 + new_time_to.minute,
+                None,
+                timesheet_info.ticket if copy_issue_and_comment else '',
+                timesheet_info.comment if copy_issue_and_comment else '',
+            ).to_line()
+            for _, timesheet_info in lines_under_cursors
+        ]
+
+        # Apply edits from the end of view, so offsets of earlier edits
+        # stay valid: new lines are inserted after all timesheet lines,
+        # time_to is filled in the last of them
+        self.view.insert(
+            edit,
+            insert_point,
+            extra_newline + ''.join(
+                '\n' + line_content
+                for line_content in new_lines_content
+            )
         )
 
-        # Insert extra new line if needed
-        if extra_newline:
-            self.view.insert(edit, insert_after_line.end(), '\n')
+        if time_to_region is not None:
+            new_time_to_content = new_time_to.strftime('%H:%M')
+            self.view.replace(edit, time_to_region, new_time_to_content)
+
+            # Add modified piece of line to highlight
             self.regions_to_highlight.append(sublime.Region(
-                insert_after_line.end() + len('\n'),
-                insert_after_line.end() + len('\n') + len('\n')
+                time_to_region.begin(),
+                time_to_region.begin() + len(new_time_to_content)
             ))
-            insert_after_line = self.view.line(insert_after_line.end() + 1)
 
-        # Insert new line
-        self.view.insert(
-            edit,
-            insert_after_line.end(),
-            new_timesheet_line_content
-        )
-
-        added_line_region = sublime.Region(
-            insert_after_line.end() + len('\n'),
-            insert_after_line.end() + len('\n') + len(
-                new_timesheet_line_content
-            ),
-        )
+            insert_point += len(new_time_to_content) - time_to_region.size()
 
-        self.regions_to_highlight.append(added_line_region)
+        if extra_newline:
+            self.regions_to_highlight.append(sublime.Region(
+                insert_point + len('\n'),
+                insert_point + len('\n') + len('\n')
+            ))
+            insert_point += len('\n')
 
-        # Move cursor to new inserted timesheet line,
-        # keep column position same as original cursor
-        row, column = self.view.rowcol(self.view.sel()[0].begin())
+        # Move cursors to new inserted timesheet lines,
+        # keep column positions same as original cursors
         self.view.sel().clear()
-        self.view.sel().add(insert_after_line.end() + len('\n') + column)
+
+        line_begin = insert_point + len('\n')
+        for (column, _), line_content in zip(
+            lines_under_cursors,
+            new_lines_content
+        ):
+            added_line_region = sublime.Region(
+                line_begin,
+                line_begin + len(line_content) + len('\n')
+            )
+            self.regions_to_highlight.append(added_line_region)
+            self.view.sel().add(line_begin + column)
+
+            line_begin = added_line_region.end()
 
         self.view.show(added_line_region)
 
         self.highlight_regions()
 
-        self.view.window().status_message('Added new timesheet line')
+        if len(new_lines_content) == 1:
+            self.view.window().status_message('Added new timesheet line')
+        else:
+            self.view.window().status_message(
+                'Added {} new timesheet lines'.format(len(new_lines_content))
+            )
 
+    @profiled
     def is_visible(self, *args, **kwargs):
         """
         Called when context menu is appeared.
@@ -118,56 +159,76 @@ class DuplicateTimesheetLineCommand(sublime_plugin.TextCommand):
         """
         return self.timesheet_helper.is_valid_timesheet_under_cursor()
 
-    def fill_time_to(self, edit: sublime.Edit) -> Optional[datetime]:
+    def get_lines_under_cursors(self) -> List[Tuple[int, TimesheetEntry]]:
+        """
+        Return column of cursor and parsed line of every timesheet line
+        under cursors, in order of cursors. Line with few cursors
+        is returned once, lines that aren't timesheet lines are skipped.
+        """
+        # Single cursor is the most common case, its line is cached
+        if len(self.view.sel()) == 1:
+            timesheet_info = \
+                self.timesheet_helper.get_timesheet_info_under_cursor()
+            if not timesheet_info:
+                return []
+
+            cursor = self.view.sel()[0].begin()
+            return [(cursor - self.view.line(cursor).begin(), timesheet_info)]
+
+        lines_under_cursors = []
+        line_begins = set()
+        for region in self.view.sel():
+            line_region = self.view.line(region.begin())
+            if line_region.begin() in line_begins:
+                continue
+            line_begins.add(line_region.begin())
+
+            timesheet_info = self.timesheet_helper.extract_timesheet_info(
+                self.view.substr(line_region)
+            )
+            if timesheet_info:
+                lines_under_cursors.append(
+                    (region.begin() - line_region.begin(), timesheet_info)
+                )
+
+        return lines_under_cursors
+
+    def get_time_to_fill(
+        self,
+        last_timesheet_line_region: Optional[sublime.Region],
+        last_timesheet_line_info: Optional[TimesheetEntry],
+        now: datetime
+    ) -> Tuple[Optional[datetime], Optional[sublime.Region]]:
         """
         If latest timesheet line is today and has empty time_to field,
-        fill it with current time. Otherwise return time_to value.
-        If there is no timesheet line, return None.
+        return `now` (rounded current time) to fill it with,
+        and region of the field.
+        If time_to is filled, return its value and None.
+        If there is no timesheet line today, return None and None.
         """
 
-        last_timesheet_line_region = self.get_last_timesheet_line_region()
-        last_timesheet_line_info = self.timesheet_helper.extract_timesheet_info(
-            self.view.substr(last_timesheet_line_region)
-        )
-
         # If latest timesheet line isn't today, do nothing
         if not self.timesheet_helper.is_today(last_timesheet_line_info):
-            return
+            return None, None
 
         # If time_to already filled, return it
-        if last_timesheet_line_info['to_dt']:
-            return last_timesheet_line_info['to_dt']
+        if last_timesheet_line_info.to_dt:
+            return last_timesheet_line_info.to_dt, None
 
         # Find start position of time_to field (it's fixed)
         time_to_start = len('2000-01-01,12:00,')
 
         # Find end position of time_to field
         # which could be any number of space chars
-        pos = last_timesheet_line_region.begin() + time_to_start
-        while pos < last_timesheet_line_region.end():
-            if self.view.substr(pos) == ',':
-                break
-            pos += 1
-
-        new_time_to = self.floor_time(datetime.now())
+        line_content = self.view.substr(last_timesheet_line_region)
+        time_to_end = line_content.find(',', time_to_start)
+        if time_to_end == -1:
+            time_to_end = len(line_content)
 
-        # Replace empty time_to with current time
-        self.view.replace(
-            edit,
-            sublime.Region(
-                last_timesheet_line_region.begin() + time_to_start,
-                pos
-            ),
-            new_time_to.strftime('%H:%M')
-        )
-
-        # Add modified piece of line to highlight
-        self.regions_to_highlight.append(sublime.Region(
+        return now, sublime.Region(
             last_timesheet_line_region.begin() + time_to_start,
-            last_timesheet_line_region.begin() + time_to_start + len('12:00'),
-        ))
-
-        return new_time_to
+            last_timesheet_line_region.begin() + time_to_end
+        )
 
     def highlight_regions(self):
         """
@@ -195,36 +256,18 @@ class DuplicateTimesheetLineCommand(sublime_plugin.TextCommand):
         """
         Return line region of latest non-empty string (including comments).
         """
-        for line_region in self.sublime_helper.iter_lines_regions_reversed():
-            line_content = self.view.substr(line_region)
-
-            if line_content.strip():
-                return line_region
+        return self.index.last_non_empty_line_region()
 
     def get_last_timesheet_line_region(self) -> Optional[sublime.Region]:
         """Return line region of latest timesheet line (excluding comments)."""
-        for line_region in self.sublime_helper.iter_lines_regions_reversed():
-            line_content = self.view.substr(line_region)
-
-            if self.timesheet_helper.extract_timesheet_info(line_content):
-                return line_region
+        return self.index.get_last_lines()[1]
 
-    def floor_time(self, dt: datetime) -> datetime:
+    def round_time(self, dt: datetime) -> datetime:
         """
-        Return earliest time to given `dt` with rounding to 10 minutes.
-        E.g.:
+        Return given `dt` rounded by rounding policy from settings,
+        by default down to 10 minutes. E.g.:
         12:00 -> 12:00
         12:01 -> 12:00
         12:09 -> 12:00
         """
-        return datetime.combine(dt.date(), time(dt.hour, dt.minute // 10 * 10))
-
-    def ceil_time(self, dt: datetime) -> datetime:
-        """
-        Return closest time in future to given `dt` with rounding to 10 minutes.
-        E.g.:
-        12:00 -> 12:10
-        12:01 -> 12:10
-        12:09 -> 12:10
-        """
-        return self.floor_time(dt) + timedelta(minutes=10)
+        return load_rounding_policy().round_time(dt)
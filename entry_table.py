@@ -0,0 +1,327 @@
+"""
+Timesheet lines stored by columns, to count worked time
+over years of lines quickly.
+Uses NumPy if it's available, otherwise counts in pure Python.
+This module doesn't depend on Sublime Text API.
+"""
+from array import array
+from datetime import datetime
+
+from timesheets.core import RoundingPolicy, TimesheetEntry
+
+try:
+    from typing import Dict, Iterable, Optional, Tuple
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    # NumPy isn't available in Sublime Text by default
+    numpy = None
+
+
+# Value of time_to column when time_to isn't filled
+NO_TIME = -1
+
+MINUTES_IN_DAY = 24 * 60
+
+
+class EntryTable:
+    """
+    Timesheet lines stored in parallel columns: date ordinals,
+    time_from and time_to (minutes since midnight) and ticket ids.
+    Tickets are stored once in `tickets` table, ticket id is index there.
+
+    Worked time could be counted in range of dates, that way worked time
+    today, this week, etc. is a range of table, see `get_period_range`.
+    Work in progress (time_to isn't filled) is counted till `now`
+    (current time by default).
+    """
+
+    def __init__(self):
+        self.date_ordinals = array('i')
+        self.from_minutes = array('i')
+        self.to_minutes = array('i')
+        self.ticket_ids = array('i')
+
+        self.tickets = []
+        self.ticket_ids_by_ticket = {}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[TimesheetEntry]) -> 'EntryTable':
+        """Return table of given timesheet lines."""
+        table = cls()
+        table.extend(entries)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.date_ordinals)
+
+    def append(self, entry: TimesheetEntry):
+        """Add timesheet line to the end of table."""
+        ticket_id = self.ticket_ids_by_ticket.get(entry.ticket)
+        if ticket_id is None:
+            ticket_id = self.ticket_ids_by_ticket[entry.ticket] = \
+                len(self.tickets)
+            self.tickets.append(entry.ticket)
+
+        self.date_ordinals.append(entry.date_ordinal)
+        self.from_minutes.append(entry.from_minutes)
+        self.to_minutes.append(
+            NO_TIME if entry.to_minutes is None else entry.to_minutes
+        )
+        self.ticket_ids.append(ticket_id)
+
+    def extend(self, entries: Iterable[TimesheetEntry]):
+        """Add timesheet lines to the end of table."""
+        for entry in entries:
+            self.append(entry)
+
+    def sum_minutes(
+        self,
+        start_ordinal: Optional[int]=None,
+        end_ordinal: Optional[int]=None,
+        now: Optional[datetime]=None
+    ) -> float:
+        """
+        Return worked minutes of lines with dates in range
+        [`start_ordinal`, `end_ordinal`), of all lines by default.
+        """
+        if numpy:
+            _, minutes, _ = self._select_numpy(start_ordinal, end_ordinal, now)
+            return float(minutes.sum())
+
+        return sum(
+            minutes
+            for _, minutes, _ in
+            self._iter_rows(start_ordinal, end_ordinal, now)
+        )
+
+    def group_by_day(
+        self,
+        start_ordinal: Optional[int]=None,
+        end_ordinal: Optional[int]=None,
+        now: Optional[datetime]=None
+    ) -> Dict[int, float]:
+        """Return worked minutes by date ordinal, see `sum_minutes`."""
+        if numpy:
+            date_ordinals, minutes, _ = \
+                self._select_numpy(start_ordinal, end_ordinal, now)
+            return self._group_numpy(date_ordinals, minutes)
+
+        minutes_by_day = {}
+        for date_ordinal, minutes, _ in \
+                self._iter_rows(start_ordinal, end_ordinal, now):
+            minutes_by_day[date_ordinal] = \
+                minutes_by_day.get(date_ordinal, 0) + minutes
+
+        return minutes_by_day
+
+    def group_by_week(
+        self,
+        start_ordinal: Optional[int]=None,
+        end_ordinal: Optional[int]=None,
+        now: Optional[datetime]=None
+    ) -> Dict[int, float]:
+        """
+        Return worked minutes by ordinal of first day of ISO week (monday),
+        see `sum_minutes`.
+        """
+        if numpy:
+            date_ordinals, minutes, _ = \
+                self._select_numpy(start_ordinal, end_ordinal, now)
+            # Ordinal 1 (0001-01-01) is monday
+            return self._group_numpy(
+                date_ordinals - (date_ordinals - 1) % 7,
+                minutes
+            )
+
+        minutes_by_week = {}
+        for date_ordinal, minutes, _ in \
+                self._iter_rows(start_ordinal, end_ordinal, now):
+            week_ordinal = date_ordinal - (date_ordinal - 1) % 7
+            minutes_by_week[week_ordinal] = \
+                minutes_by_week.get(week_ordinal, 0) + minutes
+
+        return minutes_by_week
+
+    def group_by_ticket(
+        self,
+        start_ordinal: Optional[int]=None,
+        end_ordinal: Optional[int]=None,
+        now: Optional[datetime]=None
+    ) -> Dict[str, float]:
+        """Return worked minutes by ticket, see `sum_minutes`."""
+        if numpy:
+            _, minutes, ticket_ids = \
+                self._select_numpy(start_ordinal, end_ordinal, now)
+            return {
+                self.tickets[ticket_id]: ticket_minutes
+                for ticket_id, ticket_minutes in
+                self._group_numpy(ticket_ids, minutes).items()
+            }
+
+        minutes_by_ticket_id = {}
+        for _, minutes, ticket_id in \
+                self._iter_rows(start_ordinal, end_ordinal, now):
+            minutes_by_ticket_id[ticket_id] = \
+                minutes_by_ticket_id.get(ticket_id, 0) + minutes
+
+        return {
+            self.tickets[ticket_id]: minutes
+            for ticket_id, minutes in minutes_by_ticket_id.items()
+        }
+
+    def group_by_ticket_billable(
+        self,
+        rounding: RoundingPolicy,
+        start_ordinal: Optional[int]=None,
+        end_ordinal: Optional[int]=None,
+        now: Optional[datetime]=None
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        Return worked and billable minutes by ticket, billable time
+        of every line is rounded by `rounding` policy, see `sum_minutes`.
+        """
+        if numpy:
+            _, minutes, ticket_ids = \
+                self._select_numpy(start_ordinal, end_ordinal, now)
+            minutes_by_ticket_id = self._group_numpy(ticket_ids, minutes)
+            billable_minutes_by_ticket_id = self._group_numpy(
+                ticket_ids,
+                self._billable_numpy(minutes, rounding)
+            )
+            return {
+                self.tickets[ticket_id]: (
+                    ticket_minutes,
+                    billable_minutes_by_ticket_id[ticket_id]
+                )
+                for ticket_id, ticket_minutes in minutes_by_ticket_id.items()
+            }
+
+        billable_minutes = rounding.billable_minutes
+
+        minutes_by_ticket_id = {}
+        for _, minutes, ticket_id in \
+                self._iter_rows(start_ordinal, end_ordinal, now):
+            ticket_minutes, ticket_billable_minutes = \
+                minutes_by_ticket_id.get(ticket_id, (0, 0))
+            minutes_by_ticket_id[ticket_id] = (
+                ticket_minutes + minutes,
+                ticket_billable_minutes + billable_minutes(minutes)
+            )
+
+        return {
+            self.tickets[ticket_id]: minutes
+            for ticket_id, minutes in minutes_by_ticket_id.items()
+        }
+
+    def _get_now_minutes(self, now: Optional[datetime]) -> float:
+        """Return given time as minutes since ordinal 0."""
+        now = now or datetime.now()
+        return \
+            now.toordinal() * MINUTES_IN_DAY + \
+            now.hour * 60 + now.minute + \
+            (now.second + now.microsecond / 1000000) / 60
+
+    def _iter_rows(
+        self,
+        start_ordinal: Optional[int],
+        end_ordinal: Optional[int],
+        now: Optional[datetime]
+    ):
+        """
+        Iterate date ordinal, worked minutes and ticket id of lines
+        with dates in given range.
+        """
+        now_minutes = None
+
+        for date_ordinal, from_minutes, to_minutes, ticket_id in zip(
+            self.date_ordinals,
+            self.from_minutes,
+            self.to_minutes,
+            self.ticket_ids
+        ):
+            if start_ordinal is not None and date_ordinal < start_ordinal:
+                continue
+            if end_ordinal is not None and date_ordinal >= end_ordinal:
+                continue
+
+            if to_minutes != NO_TIME:
+                minutes = to_minutes - from_minutes
+            else:
+                if now_minutes is None:
+                    now_minutes = self._get_now_minutes(now)
+                minutes = now_minutes - \
+                    date_ordinal * MINUTES_IN_DAY - from_minutes
+
+            yield date_ordinal, minutes, ticket_id
+
+    def _select_numpy(
+        self,
+        start_ordinal: Optional[int],
+        end_ordinal: Optional[int],
+        now: Optional[datetime]
+    ):
+        """
+        Return NumPy arrays of date ordinals, worked minutes
+        and ticket ids of lines with dates in given range.
+        """
+        date_ordinals = numpy.frombuffer(self.date_ordinals, dtype=numpy.intc)
+        from_minutes = numpy.frombuffer(self.from_minutes, dtype=numpy.intc)
+        to_minutes = numpy.frombuffer(self.to_minutes, dtype=numpy.intc)
+        ticket_ids = numpy.frombuffer(self.ticket_ids, dtype=numpy.intc)
+
+        mask = numpy.ones(len(date_ordinals), dtype=bool)
+        if start_ordinal is not None:
+            mask &= date_ordinals >= start_ordinal
+        if end_ordinal is not None:
+            mask &= date_ordinals < end_ordinal
+
+        date_ordinals = date_ordinals[mask]
+        from_minutes = from_minutes[mask]
+        to_minutes = to_minutes[mask]
+        ticket_ids = ticket_ids[mask]
+
+        minutes = (to_minutes - from_minutes).astype(numpy.float64)
+
+        unfinished = to_minutes == NO_TIME
+        if unfinished.any():
+            minutes[unfinished] = \
+                self._get_now_minutes(now) - \
+                date_ordinals[unfinished].astype(numpy.int64) * \
+                MINUTES_IN_DAY - \
+                from_minutes[unfinished]
+
+        return date_ordinals, minutes, ticket_ids
+
+    def _billable_numpy(self, minutes, rounding: RoundingPolicy):
+        """
+        Return billable minutes of lines by their worked `minutes`
+        (NumPy array), see `RoundingPolicy.billable_minutes`.
+        """
+        parts = minutes / rounding.granularity
+        if rounding.mode == 'floor':
+            parts = numpy.floor(parts)
+        elif rounding.mode == 'ceil':
+            parts = numpy.ceil(parts)
+        else:
+            parts = numpy.floor(parts + 0.5)
+
+        return numpy.where(
+            minutes > 0,
+            numpy.maximum(parts * rounding.granularity, rounding.minimum),
+            minutes
+        )
+
+    def _group_numpy(self, keys, minutes) -> dict:
+        """Return sums of `minutes` by `keys` (NumPy arrays)."""
+        unique_keys, key_indexes = numpy.unique(keys, return_inverse=True)
+        sums = numpy.bincount(
+            key_indexes.ravel(),
+            weights=minutes,
+            minlength=len(unique_keys)
+        )
+        return dict(zip(unique_keys.tolist(), sums.tolist()))
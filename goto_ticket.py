@@ -3,8 +3,11 @@ import webbrowser
 import sublime
 import sublime_plugin
 
-from timesheets.typing.typing import Optional
+from timesheets.typing.typing import Dict, Optional
 from timesheets.helpers import SublimeHelper, TimesheetHelper
+from timesheets.helpers import TimesheetEntry
+from timesheets.profiling import profiled
+from timesheets.ticket_urls import TicketUrls
 
 
 class GotoTicketCommand(sublime_plugin.TextCommand):
@@ -14,12 +17,11 @@ class GotoTicketCommand(sublime_plugin.TextCommand):
         self.sublime_helper = SublimeHelper(self.view)
         self.timesheet_helper = TimesheetHelper(self.sublime_helper)
 
+    @profiled
     def run(self, edit):
         """Entry-point, called when command is executed"""
-        line_content = self.sublime_helper.get_current_line_content()
-        timesheet_info = self.timesheet_helper.extract_timesheet_info(
-            line_content
-        )
+        timesheet_info = \
+            self.timesheet_helper.get_timesheet_info_under_cursor()
 
         if timesheet_info:
             ticket_url = self.generate_ticket_url(timesheet_info)
@@ -34,6 +36,7 @@ class GotoTicketCommand(sublime_plugin.TextCommand):
                 "Can't find ticket in current line"
             )
 
+    @profiled
     def is_visible(self, *args) -> bool:
         """
         Called when context menu is appeared.
@@ -43,7 +46,10 @@ class GotoTicketCommand(sublime_plugin.TextCommand):
         """
         return self.timesheet_helper.is_valid_timesheet_under_cursor()
 
-    def generate_ticket_url(self, timesheet_info: dict) -> Optional[str]:
+    def generate_ticket_url(
+        self,
+        timesheet_info: TimesheetEntry
+    ) -> Optional[str]:
         """
         Generate and return ticket URL to given `ticket_info`.
         If required setting isn't set, or doesn't have template,
@@ -51,35 +57,58 @@ class GotoTicketCommand(sublime_plugin.TextCommand):
         """
         error_prefix = 'Timesheets plugin'
 
-        bug_tracker, ticket_id = timesheet_info['issue']
+        bug_tracker, ticket_id = timesheet_info.issue
 
-        settings = sublime.load_settings('timesheets.sublime-settings')
-
-        option_name = '{}_ticket_url'.format(bug_tracker)
-        ticket_url_template = settings.get(option_name)
-
-        if not ticket_url_template:
+        try:
+            return get_ticket_urls(bug_tracker).get_url(ticket_id)
+        except ValueError as e:
             sublime.error_message(
                 '{}: in order to open ticket in browser '
                 'please specify valid "{}" option'.format(
                     error_prefix,
-                    option_name
+                    e.args[0]
                 )
             )
-            return
 
-        ticket_url = ticket_url_template.format(ticket_id)
 
-        # If formatted template and raw template are the same,
-        # looks like template missing placeholder ("{}")
-        if ticket_url == ticket_url_template:
-            sublime.error_message(
-                '{}: in order to open ticket in browser '
-                'please specify valid "{}" option'.format(
-                    error_prefix,
-                    option_name
-                )
-            )
-            return
+# Ticket URL templates by bug tracker, built from settings on first use
+# and dropped when settings are changed
+ticket_urls_by_tracker = {}  # type: Dict[str, TicketUrls]
+
+
+def get_ticket_urls(bug_tracker: str) -> TicketUrls:
+    """Return ticket URL templates of given bug tracker."""
+    ticket_urls = ticket_urls_by_tracker.get(bug_tracker)
+    if ticket_urls:
+        return ticket_urls
+
+    settings = sublime.load_settings('timesheets.sublime-settings')
+
+    templates_by_pattern = settings.get('ticket_urls') or {}
+    if not isinstance(templates_by_pattern, dict):
+        print('Timesheets: "ticket_urls" setting should be object, '
+              'it is ignored')
+        templates_by_pattern = {}
+
+    option = '{}_ticket_url'.format(bug_tracker)
+    ticket_urls = ticket_urls_by_tracker[bug_tracker] = TicketUrls(
+        templates_by_pattern,
+        settings.get(option),
+        option
+    )
+    return ticket_urls
+
+
+def forget_ticket_urls():
+    ticket_urls_by_tracker.clear()
+
+
+def plugin_loaded():
+    """Drop ticket URL templates when settings are changed."""
+    settings = sublime.load_settings('timesheets.sublime-settings')
+    settings.add_on_change('timesheets_ticket_urls', forget_ticket_urls)
+
 
-        return ticket_url
+def plugin_unloaded():
+    settings = sublime.load_settings('timesheets.sublime-settings')
+    settings.clear_on_change('timesheets_ticket_urls')
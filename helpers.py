@@ -1,14 +1,42 @@
-import re
-from datetime import datetime
+from datetime import date
 
 import sublime
 
 from timesheets.typing.typing import Optional, Generator, Iterable, List
+from timesheets.typing.typing import Tuple, Union
+from timesheets.core import TimesheetEntry, TimesheetLineParser
+from timesheets.core import WorkedSummary, timesheet_line_parser
+from timesheets.core import RoundingPolicy, prettify_minutes
+from timesheets.core import summarize_reversed
+from timesheets.entry_table import EntryTable
+from timesheets.profiling import count_lines
+
+
+def load_rounding_policy() -> RoundingPolicy:
+    """
+    Return rounding policy from settings,
+    default policy if setting is invalid.
+    """
+    settings = sublime.load_settings('timesheets.sublime-settings')
+    try:
+        return RoundingPolicy.from_settings(settings.get('rounding'))
+    except ValueError as e:
+        print('Timesheets: invalid "rounding" setting: {}'.format(e))
+        return RoundingPolicy()
+
+
+def is_billable_time_shown() -> bool:
+    """Return True if billable time is shown next to worked time."""
+    settings = sublime.load_settings('timesheets.sublime-settings')
+    return bool(settings.get('show_billable_time', False))
 
 
 class SublimeHelper:
     """Utility class with convenient methods to work with given `view`."""
 
+    # Number of characters read from view at once in bulk mode
+    chunk_size = 64 * 1024
+
     def __init__(self, view: sublime.View):
         self.view = view
 
@@ -21,45 +49,182 @@ class SublimeHelper:
         line = self.view.line(current_selection)
         return self.view.substr(line)
 
-    def iter_lines(self) -> Generator[str, None, None]:
+    def get_content(self) -> str:
+        """Return whole content of view using single API call."""
+        return self.view.substr(sublime.Region(0, self.view.size()))
+
+    def iter_lines(self, bulk: bool=True) -> Generator[str, None, None]:
         """
         Iterate content of view line by line.
         Trailing newline character not included.
+
+        In bulk mode content is read by big chunks and split into lines,
+        otherwise every line is requested from view separately
+        (two API calls per line).
         """
+        if bulk:
+            for _, line_content in self.iter_lines_with_offsets():
+                yield line_content
+            return
+
         pos = 0
         while pos < self.view.size():
             line_region = self.view.line(pos)
             line_content = self.view.substr(line_region)
+            count_lines(1)
 
             yield line_content
 
             pos = line_region.end() + 1
 
-    def iter_lines_regions_reversed(self) -> Iterable[sublime.Region]:
+    def iter_lines_with_offsets(
+        self
+    ) -> Generator[Tuple[int, str], None, None]:
+        """
+        Iterate content of view line by line, yield line begin offset
+        and line content.
+        Content is read from view by chunks of `chunk_size` characters.
+        Trailing newline character not included.
+        """
+        size = self.view.size()
+
+        pos = 0
+        # Beginning of line which continues in next chunk, and its offset
+        line_head = ''
+        line_begin = 0
+
+        while pos < size:
+            chunk_end = min(pos + self.chunk_size, size)
+            lines = (
+                line_head + self.view.substr(sublime.Region(pos, chunk_end))
+            ).split('\n')
+            line_head = lines.pop()
+            count_lines(len(lines))
+
+            for line_content in lines:
+                yield line_begin, line_content
+                line_begin += len(line_content) + 1
+
+            pos = chunk_end
+
+        # Content after last newline character, if any
+        if line_begin < size:
+            yield line_begin, line_head
+
+    def iter_lines_regions_reversed(
+        self,
+        bulk: bool=True
+    ) -> Iterable[sublime.Region]:
         """
         Iterate regions of view line by line in reverse order
         (from last line to first).
         Trailing newline character not included.
         """
+        if bulk:
+            for line_region, _ in self.iter_lines_with_regions_reversed():
+                yield line_region
+            return
+
         pos = self.view.size()
         while pos >= 0:
             line_region = self.view.line(pos)
+            count_lines(1)
 
             yield line_region
 
             pos = line_region.begin() - 1
 
-    def iter_lines_reversed(self) -> Generator[str, None, None]:
+    def iter_lines_reversed(
+        self,
+        bulk: bool=True
+    ) -> Generator[str, None, None]:
         """
         Iterate content of view line by line in reverse order
         (from last line to first).
         Trailing newline character not included.
         """
-        for line_region in self.iter_lines_regions_reversed():
+        if bulk:
+            for _, line_content in self.iter_lines_with_regions_reversed():
+                yield line_content
+            return
+
+        for line_region in self.iter_lines_regions_reversed(bulk=False):
             line_content = self.view.substr(line_region)
 
             yield line_content
 
+    def iter_lines_with_regions_reversed(
+        self
+    ) -> Generator[Tuple[sublime.Region, str], None, None]:
+        """
+        Iterate lines of view in reverse order (from last line to first),
+        yield line region and line content.
+        Content is read from the end of view by chunks of `chunk_size`
+        characters, and only as far as lines are consumed.
+        Trailing newline character not included.
+        """
+        pos = self.view.size()
+        # End of line which begins in previous chunk, and its end offset
+        line_tail = ''
+        line_end = pos
+
+        while pos > 0:
+            chunk_begin = max(pos - self.chunk_size, 0)
+            lines = (
+                self.view.substr(sublime.Region(chunk_begin, pos)) + line_tail
+            ).split('\n')
+            line_tail = lines[0]
+            count_lines(len(lines) - 1)
+
+            for index in range(len(lines) - 1, 0, -1):
+                line_content = lines[index]
+                line_begin = line_end - len(line_content)
+
+                yield sublime.Region(line_begin, line_end), line_content
+
+                line_end = line_begin - 1
+
+            pos = chunk_begin
+
+        # First line of view
+        count_lines(1)
+        yield sublime.Region(0, line_end), line_tail
+
+
+class ViewCache:
+    """
+    Results of processing of view content,
+    shared between commands and listeners of the same view.
+    """
+
+    # Caches of views, by view id
+    instances = {}
+
+    def __init__(self):
+        # Whether view is timesheet,
+        # and view syntax and size when it was detected
+        self.is_timesheet = None
+        self.is_timesheet_syntax = None
+        self.is_timesheet_size = None
+
+        # Parsed line under cursor,
+        # and view change count and cursor position when it was parsed
+        self.cursor_timesheet_info = None
+        self.cursor_key = None
+
+    @classmethod
+    def for_view(cls, view: sublime.View) -> 'ViewCache':
+        """Return cache of given `view`, create it if needed."""
+        cache = cls.instances.get(view.id())
+        if cache is None:
+            cache = cls.instances[view.id()] = cls()
+        return cache
+
+    @classmethod
+    def forget(cls, view: sublime.View):
+        """Drop cache of given `view`, e.g. when view is closed."""
+        cls.instances.pop(view.id(), None)
+
 
 class TimesheetHelper:
     """
@@ -67,62 +232,52 @@ class TimesheetHelper:
     from view that's attached to given `sublime_helper`.
     """
 
-    def __init__(self, sublime_helper: SublimeHelper):
+    # How much size of view should be changed since last detection
+    # of whether view is timesheet, to detect it again
+    redetect_size_change = 256
+
+    def __init__(
+        self,
+        sublime_helper: SublimeHelper,
+        index: 'TimesheetIndex'=None
+    ):
         self.sublime_helper = sublime_helper
 
-    def extract_timesheet_info(self, line: str) -> Optional[dict]:
+        # Index of parsed lines of view. If it isn't given or isn't loaded,
+        # view content is scanned
+        self.index = index
+
+    def extract_timesheet_info(self, line: str) -> Optional[TimesheetEntry]:
         """
         Try to extract timesheet info from given `line`.
-        Return it as dict if content contains timesheet,
+        Return it as `TimesheetEntry` if content contains timesheet,
         or None otherwise.
         """
-        match = re.search(
-            r'^(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2}),'
-            r'(?P<from_hour>\d{2}):(?P<from_min>\d{2}),'
-            r'(?P<to>\d{2}:\d{2}|[\s]*),'
-            r'(?P<jira_issue>[\w_\-\d]+),'
-            r'(?P<comment>.*)$',
-            line
-        )
+        return timesheet_line_parser.parse(line)
 
-        if not match:
-            return
+    def detect_is_timesheet(self) -> bool:
+        """
+        Return True if current file is timesheet, False otherwise.
+        Detection result is cached for view, it's detected again
+        only if syntax of view is changed or size of view is changed
+        significantly since last detection (e.g. content is pasted).
+        """
+        view = self.sublime_helper.view
+        cache = ViewCache.for_view(view)
 
-        try:
-            from_dt = datetime(
-                int(match.group('year')),
-                int(match.group('month')),
-                int(match.group('day')),
-                int(match.group('from_hour')),
-                int(match.group('from_min')),
-            )
-        except ValueError:
-            return
+        syntax = view.settings().get('syntax')
+        size = view.size()
+
+        if (
+            cache.is_timesheet is None or
+            cache.is_timesheet_syntax != syntax or
+            abs(cache.is_timesheet_size - size) >= self.redetect_size_change
+        ):
+            cache.is_timesheet = self.is_timesheet()
+            cache.is_timesheet_syntax = syntax
+            cache.is_timesheet_size = size
 
-        if match.group('to').strip():
-            to_hour, to_min = match.group('to').split(':')
-
-            try:
-                to_dt = datetime(
-                    int(match.group('year')),
-                    int(match.group('month')),
-                    int(match.group('day')),
-                    int(to_hour),
-                    int(to_min),
-                )
-            except ValueError:
-                return
-        else:
-            to_dt = None
-
-        issue = ('jira', match.group('jira_issue'))
-
-        return {
-            'from_dt': from_dt,
-            'to_dt': to_dt,
-            'issue': issue,
-            'comment': match.group('comment'),
-        }
+        return cache.is_timesheet
 
     def is_timesheet(self) -> bool:
         """
@@ -143,7 +298,7 @@ class TimesheetHelper:
             if self.is_comment(line):
                 continue
 
-            if self.extract_timesheet_info(line):
+            if timesheet_line_parser.parse(line):
                 valid_timesheet_lines += 1
             else:
                 invalid_timesheet_lines += 1
@@ -158,82 +313,95 @@ class TimesheetHelper:
 
         return valid_to_invalid_lines_ratio >= 0.9
 
-    def is_today(self, timesheet_info: dict) -> bool:
+    def is_today(self, timesheet_info: Optional[TimesheetEntry]) -> bool:
         """Return true if given `timesheet_info` relates to today."""
         return \
-            timesheet_info and \
-            timesheet_info['from_dt'].date() == datetime.now().date()
-
-    def worked_today_minutes(self) -> float:
-        """Iterate lines backward and count how much time is worked today."""
-        today_timesheet_info = []
+            bool(timesheet_info) and \
+            timesheet_info.date_ordinal == date.today().toordinal()
 
+    def iter_timesheet_info_reversed(
+        self
+    ) -> Generator[TimesheetEntry, None, None]:
+        """
+        Iterate info of timesheet lines in reverse order
+        (from last line to first), only needed lines are read
+        from the end of view.
+        """
         for line in self.sublime_helper.iter_lines_reversed():
             timesheet_info = self.extract_timesheet_info(line)
-            if not timesheet_info:
-                continue
-
-            if timesheet_info['from_dt'].date() == datetime.today().date():
-                today_timesheet_info.append(timesheet_info)
-            else:
-                break
+            if timesheet_info:
+                yield timesheet_info
 
-        return self.timesheets_info_to_minutes(today_timesheet_info)
+    def worked_today_minutes(self) -> float:
+        """Return how much time is worked today."""
+        return self.worked_summary(['today'])['today']
 
     def worked_week_minutes(self) -> float:
+        """Return how much time is worked this week."""
+        return self.worked_summary(['week'])['week']
+
+    def worked_summary(
+        self,
+        periods: Iterable[Union[str, int]]=('today', 'week'),
+        rounding: Optional[RoundingPolicy]=None
+    ) -> WorkedSummary:
         """
-        Iterate lines backward and count how much time is worked this week.
+        Count how much time is worked in each of given `periods`,
+        see `core.get_period_range` for possible values,
+        and billable time if `rounding` policy is given.
+        If index of view is loaded, lines of periods are found by date,
+        so lines could be in any order. Otherwise lines are read
+        from the end of view until first line out of all periods,
+        so lines are expected to be in chronological order.
         """
-        week_timesheet_info = []
-
-        today_year, today_week, _ = datetime.today().isocalendar()
-
-        for line in self.sublime_helper.iter_lines_reversed():
-            timesheet_info = self.extract_timesheet_info(line)
-            if not timesheet_info:
-                continue
-
-            line_year, line_week, _ = timesheet_info['from_dt'].isocalendar()
-
-            if line_year == today_year and line_week == today_week:
-                week_timesheet_info.append(timesheet_info)
-            else:
-                break
+        if self.index and self.index.is_loaded():
+            return self.index.get_date_index().summarize(
+                periods,
+                date.today(),
+                rounding
+            )
 
-        return self.timesheets_info_to_minutes(week_timesheet_info)
+        return summarize_reversed(
+            self.iter_timesheet_info_reversed(),
+            periods,
+            date.today(),
+            rounding
+        )
 
-    def timesheets_info_to_minutes(self, timesheets_info:  List[dict]) -> float:
+    def timesheets_info_to_minutes(
+        self,
+        timesheets_info: List[TimesheetEntry]
+    ) -> float:
         """
         Return how much time is worked based on given list
         of timesheet info objects.
         """
-        worked_minutes = 0
-        for timesheet_info in timesheets_info:
-            to_dt = timesheet_info['to_dt'] or datetime.now()
-            timesheet_line_worked_minutes = (
-                to_dt - timesheet_info['from_dt']
-            ).total_seconds() / 60
-            worked_minutes += timesheet_line_worked_minutes
-
-        return worked_minutes
+        return EntryTable.from_entries(timesheets_info).sum_minutes()
 
     def is_comment(self, line: str) -> bool:
         """Return True if given `line` is comment."""
         return line.lstrip().startswith('#')
 
-    def is_valid_timesheet_under_cursor(self) -> bool:
-        """Return True if line under cursor is valid timesheet line."""
-        return bool(
-            self.extract_timesheet_info(
+    def get_timesheet_info_under_cursor(self) -> Optional[TimesheetEntry]:
+        """
+        Return info of timesheet line under cursor,
+        or None if it's not valid timesheet line.
+        If there are few cursors, use only first cursor.
+        Result is cached until view is modified or cursor is moved.
+        """
+        view = self.sublime_helper.view
+        cache = ViewCache.for_view(view)
+
+        cursor_key = view.change_count(), view.sel()[0].begin()
+
+        if cache.cursor_key != cursor_key:
+            cache.cursor_timesheet_info = self.extract_timesheet_info(
                 self.sublime_helper.get_current_line_content()
             )
-        )
+            cache.cursor_key = cursor_key
 
+        return cache.cursor_timesheet_info
 
-def prettify_minutes(minutes_total: float) -> str:
-    """
-    Return time in format "<hours>:<minutes>" from given `minutes_total`.
-    E.g. 65 minutes -> "01:05".
-    """
-    hours, minutes = divmod(minutes_total, 60)
-    return '{:02}:{:02}'.format(int(hours), int(minutes))
+    def is_valid_timesheet_under_cursor(self) -> bool:
+        """Return True if line under cursor is valid timesheet line."""
+        return bool(self.get_timesheet_info_under_cursor())
@@ -0,0 +1,255 @@
+"""
+Parsed timesheet lines saved on disk between sessions,
+so big timesheet files aren't parsed again every time they're opened.
+Only lines appended to file since cache was saved need to be parsed.
+This module doesn't depend on Sublime Text API.
+
+Cache file of timesheet file contains numbers of timesheet lines,
+dates, times and ids of tickets packed into arrays of integers,
+and tables of tickets (every ticket is stored once) and comments.
+"""
+import hashlib
+import os
+import struct
+from array import array
+
+from timesheets.core import TimesheetEntry
+
+try:
+    from typing import List, Optional
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import List, Optional
+
+
+# Increase when format of cache files is changed
+CACHE_VERSION = 2
+
+# Magic, version, size and modification time of timesheet file,
+# number of cached lines, their length, hash of their tail,
+# hash of all of them and number of cached timesheet lines
+HEADER = struct.Struct('<4sHqdqq20s20sq')
+MAGIC = b'TSPC'
+
+# Number of characters at the end of cached lines which hash is checked
+# to make sure cached lines weren't changed, if file isn't modified
+# since cache was saved
+TAIL_SIZE = 4096
+
+# Value of time_to in cache when it's not filled
+NO_TIME = -1
+
+
+def get_cache_file_path(cache_dir: str, path: str) -> str:
+    """Return path of cache file of timesheet file with given `path`."""
+    return os.path.join(
+        cache_dir,
+        hashlib.sha1(path.encode('utf-8')).hexdigest() + '.cache'
+    )
+
+
+def get_tail_hash(lines: List[str], line_count: int) -> bytes:
+    """
+    Return hash of last `TAIL_SIZE` characters of first `line_count`
+    lines (with newline characters).
+    """
+    tail_lines = []
+    tail_length = 0
+    row = line_count
+    while row > 0 and tail_length < TAIL_SIZE:
+        row -= 1
+        tail_lines.append(lines[row])
+        tail_length += len(lines[row]) + 1
+
+    tail = '\n'.join(reversed(tail_lines)) + '\n' if tail_lines else ''
+
+    return hashlib.sha1(tail[-TAIL_SIZE:].encode('utf-8')).digest()
+
+
+def get_hash(lines: List[str], line_count: int) -> bytes:
+    """Return hash of first `line_count` lines (with newline characters)."""
+    content_hash = hashlib.sha1()
+    for line in lines[:line_count]:
+        content_hash.update(line.encode('utf-8'))
+        content_hash.update(b'\n')
+    return content_hash.digest()
+
+
+def get_length(lines: List[str], line_count: int) -> int:
+    """Return length of first `line_count` lines with newline characters."""
+    return sum(map(len, lines[:line_count])) + line_count
+
+
+def save_parse_cache(
+    cache_file: str,
+    path: str,
+    lines: List[str],
+    entries: List[Optional[TimesheetEntry]]
+):
+    """
+    Save parsed `lines` of timesheet file with given `path`.
+    `entries` are parsed lines, None for lines that aren't timesheet lines.
+    Last line isn't saved: it could be not finished yet.
+    """
+    stat = os.stat(path)
+    line_count = len(lines) - 1
+
+    rows = array('i')
+    date_ordinals = array('i')
+    from_minutes = array('h')
+    to_minutes = array('h')
+    ticket_ids = array('i')
+    tickets = []
+    ticket_ids_by_ticket = {}
+    comments = []
+
+    for row in range(line_count):
+        entry = entries[row]
+        if not entry:
+            continue
+
+        ticket_id = ticket_ids_by_ticket.get(entry.ticket)
+        if ticket_id is None:
+            ticket_id = ticket_ids_by_ticket[entry.ticket] = len(tickets)
+            tickets.append(entry.ticket)
+
+        rows.append(row)
+        date_ordinals.append(entry.date_ordinal)
+        from_minutes.append(entry.from_minutes)
+        to_minutes.append(
+            NO_TIME if entry.to_minutes is None else entry.to_minutes
+        )
+        ticket_ids.append(ticket_id)
+        comments.append(entry.comment)
+
+    chunks = [
+        HEADER.pack(
+            MAGIC,
+            CACHE_VERSION,
+            stat.st_size,
+            stat.st_mtime,
+            line_count,
+            get_length(lines, line_count),
+            get_tail_hash(lines, line_count),
+            get_hash(lines, line_count),
+            len(rows)
+        ),
+    ]
+    for values in (rows, date_ordinals, from_minutes, to_minutes,
+                   ticket_ids):
+        chunks.append(values.tobytes())
+
+    # Tickets and comments are taken from single lines,
+    # so they don't contain newline characters
+    for strings in (tickets, comments):
+        encoded = '\n'.join(strings).encode('utf-8')
+        chunks.append(struct.pack('<q', len(encoded)))
+        chunks.append(encoded)
+
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+    # Write to temporary file and replace cache file with it,
+    # so other process never reads half-written cache
+    temp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    with open(temp_file, 'wb') as f:
+        f.write(b''.join(chunks))
+    os.replace(temp_file, cache_file)
+
+
+def load_parse_cache(
+    cache_file: str,
+    path: str,
+    lines: List[str],
+    check_all: bool=False
+) -> List[Optional[TimesheetEntry]]:
+    """
+    Return parsed first lines of timesheet file with given `path`
+    saved in cache, None for lines that aren't timesheet lines.
+    `lines` are current lines of file, cache is used only if it's
+    saved for the same lines, possibly with lines appended after that.
+    Empty list is returned if there's no valid cache.
+
+    If file isn't modified since cache was saved, only number, length
+    and tail of cached lines are checked. Otherwise, or if `check_all`
+    is True (e.g. `lines` are edited content not saved to file yet),
+    hash of all cached lines is checked, so lines changed in place
+    anywhere aren't taken from cache.
+    """
+    try:
+        stat = os.stat(path)
+        with open(cache_file, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+
+    if len(data) < HEADER.size:
+        return []
+
+    magic, version = struct.unpack_from('<4sH', data)
+    if magic != MAGIC or version != CACHE_VERSION:
+        return []
+
+    _, _, size, mtime, line_count, length, tail_hash, content_hash, count = \
+        HEADER.unpack_from(data)
+
+    # If file is changed since cache was saved, cache could be used
+    # only if lines were appended to it
+    is_modified = (stat.st_size, stat.st_mtime) != (size, mtime)
+    if is_modified and stat.st_size <= size:
+        return []
+
+    if line_count >= len(lines) or \
+            get_length(lines, line_count) != length or \
+            get_tail_hash(lines, line_count) != tail_hash:
+        return []
+
+    # Lines could be changed in place, before appended ones
+    if (is_modified or check_all) and \
+            get_hash(lines, line_count) != content_hash:
+        return []
+
+    try:
+        offset = HEADER.size
+        columns = []
+        for typecode in ('i', 'i', 'h', 'h', 'i'):
+            values = array(typecode)
+            end = offset + values.itemsize * count
+            values.frombytes(data[offset:end])
+            columns.append(values)
+            offset = end
+
+        strings = []
+        for _ in range(2):
+            encoded_length, = struct.unpack_from('<q', data, offset)
+            offset += 8
+            strings.append(
+                data[offset:offset + encoded_length].decode('utf-8')
+            )
+            offset += encoded_length
+    except (ValueError, struct.error, UnicodeDecodeError):
+        return []
+
+    if offset != len(data):
+        return []
+
+    rows, date_ordinals, from_minutes, to_minutes, ticket_ids = columns
+    tickets = strings[0].split('\n')
+    comments = strings[1].split('\n') if count else []
+
+    if len(comments) != count or len(rows) != count:
+        return []
+
+    entries = [None] * line_count
+    try:
+        for index in range(count):
+            entries[rows[index]] = TimesheetEntry(
+                date_ordinals[index],
+                from_minutes[index],
+                None if to_minutes[index] == NO_TIME else to_minutes[index],
+                tickets[ticket_ids[index]],
+                comments[index]
+            )
+    except IndexError:
+        return []
+
+    return entries
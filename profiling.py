@@ -0,0 +1,204 @@
+"""
+Opt-in measurement of commands and event handlers: number of calls,
+histogram of their wall time, and number of lines they scanned.
+Optionally all profiled calls are recorded by `cProfile` too.
+
+Measurement is disabled by default, then profiled function costs
+one extra function call and check of a flag.
+This module doesn't depend on Sublime Text API,
+it's enabled by `timesheet_performance_stats.py` according to settings.
+"""
+import cProfile
+import threading
+import time
+from functools import wraps
+
+try:
+    from typing import Callable, Dict, Optional
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Callable, Dict, Optional
+
+
+# Whether calls of profiled functions are measured
+enabled = False
+
+# Upper bounds of wall time of histogram buckets, in milliseconds,
+# the last bucket is for longer calls
+histogram_bounds = [1, 10, 100, 1000]
+
+# Profiler of all measured calls, if cProfile output is requested
+profiler = None  # type: Optional[cProfile.Profile]
+
+# Profiled calls currently running in every thread
+local = threading.local()
+
+
+class CallStats:
+    """Measurements of calls of single profiled function."""
+
+    __slots__ = ('calls', 'total_time', 'max_time', 'lines', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.lines = 0
+        self.histogram = [0] * (len(histogram_bounds) + 1)
+
+    def add_call(self, seconds: float, lines: int):
+        self.calls += 1
+        self.total_time += seconds
+        self.max_time = max(self.max_time, seconds)
+        self.lines += lines
+
+        milliseconds = seconds * 1000
+        bucket = 0
+        while bucket < len(histogram_bounds) and \
+                milliseconds >= histogram_bounds[bucket]:
+            bucket += 1
+        self.histogram[bucket] += 1
+
+
+# Measurements by qualified name of profiled function
+stats = {}  # type: Dict[str, CallStats]
+
+stats_lock = threading.Lock()
+
+
+def enable(with_cprofile: bool=False):
+    """Start measurement, with recording of calls by cProfile if asked."""
+    global enabled, profiler
+
+    if with_cprofile and profiler is None:
+        profiler = cProfile.Profile()
+    elif not with_cprofile:
+        profiler = None
+
+    enabled = True
+
+
+def disable():
+    """Stop measurement, keep measured stats."""
+    global enabled, profiler
+
+    enabled = False
+    profiler = None
+
+
+def reset():
+    """Drop measured stats and recorded cProfile output."""
+    global profiler
+
+    with stats_lock:
+        stats.clear()
+
+    if profiler is not None:
+        profiler = cProfile.Profile()
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Decorator of commands and event handlers
+    which measures their calls when measurement is enabled.
+    """
+    name = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+
+        # Lines scanned by nested profiled calls are counted by outer
+        # calls too
+        stack = getattr(local, 'stack', None)
+        if stack is None:
+            stack = local.stack = []
+        stack.append(0)
+
+        # cProfile records calls of thread where it's enabled,
+        # so only outermost profiled calls enable it
+        call_profiler = profiler if len(stack) == 1 else None
+
+        start = time.perf_counter()
+        if call_profiler:
+            call_profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if call_profiler:
+                call_profiler.disable()
+            seconds = time.perf_counter() - start
+
+            lines = stack.pop()
+            if stack:
+                stack[-1] += lines
+
+            with stats_lock:
+                if name not in stats:
+                    stats[name] = CallStats()
+                stats[name].add_call(seconds, lines)
+
+    return wrapper
+
+
+def count_lines(count: int):
+    """Add number of lines scanned by currently measured call."""
+    if not enabled:
+        return
+
+    stack = getattr(local, 'stack', None)
+    if stack:
+        stack[-1] += count
+
+
+def dump_cprofile(path: str) -> bool:
+    """
+    Save calls recorded by cProfile into file of `pstats` format,
+    return False if they aren't recorded.
+    """
+    if profiler is None:
+        return False
+
+    profiler.dump_stats(path)
+    return True
+
+
+def format_stats() -> str:
+    """Return table of measured stats, slowest functions first."""
+    with stats_lock:
+        rows = sorted(
+            stats.items(),
+            key=lambda item: item[1].total_time,
+            reverse=True
+        )
+
+    bucket_captions = ['<{}ms'.format(bound) for bound in histogram_bounds]
+    bucket_captions.append('>={}ms'.format(histogram_bounds[-1]))
+
+    table = [
+        ['Function', 'Calls', 'Total ms', 'Mean ms', 'Max ms', 'Lines'] +
+        bucket_captions
+    ]
+    for name, call_stats in rows:
+        table.append([
+            name,
+            str(call_stats.calls),
+            '{:.1f}'.format(call_stats.total_time * 1000),
+            '{:.1f}'.format(call_stats.total_time * 1000 / call_stats.calls),
+            '{:.1f}'.format(call_stats.max_time * 1000),
+            str(call_stats.lines),
+        ] + [str(count) for count in call_stats.histogram])
+
+    widths = [
+        max(len(row[column]) for row in table)
+        for column in range(len(table[0]))
+    ]
+
+    return '\n'.join(
+        '  '.join(
+            value.ljust(width) if column == 0 else value.rjust(width)
+            for column, (value, width) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in table
+    ) + '\n'
@@ -0,0 +1,266 @@
+"""
+Recurring timesheet lines, e.g. weekly meetings, and finding
+where occurrences missing in timesheet should be inserted.
+This module doesn't depend on Sublime Text API.
+"""
+from bisect import bisect_left
+from datetime import date, datetime
+
+from timesheets.core import TimesheetEntry, TimesheetLineParser
+
+try:
+    from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Dict, Iterable, Iterator, List
+    from timesheets.typing.typing import Optional, Tuple
+
+
+# Codes of weekdays as in iCalendar recurrence rules, from monday
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+class RecurrenceRule:
+    """
+    Timesheet line repeated on given weekdays of every `interval` weeks,
+    counted from week of `start_ordinal` date, which is also the first
+    date of occurrences.
+    """
+
+    __slots__ = ('ticket', 'comment', 'from_minutes', 'minutes', 'weekdays',
+                 'interval', 'start_ordinal')
+
+    def __init__(
+        self,
+        ticket: str,
+        comment: str,
+        from_minutes: int,
+        minutes: int,
+        weekdays: Iterable[int]=range(5),
+        interval: int=1,
+        start_ordinal: int=1
+    ):
+        self.ticket = ticket
+        self.comment = comment
+        self.from_minutes = from_minutes
+        self.minutes = minutes
+        self.weekdays = frozenset(weekdays)
+        self.interval = interval
+        self.start_ordinal = start_ordinal
+
+    @classmethod
+    def from_settings(cls, rule: dict) -> 'RecurrenceRule':
+        """
+        Return rule from item of "recurring_entries" setting, e.g.:
+        {"ticket": "PROJECT-1", "comment": "stand-up", "time_from": "10:00",
+         "minutes": 15, "days": ["MO", "TU", "WE", "TH", "FR"]}
+        Raise ValueError if rule is invalid.
+        """
+        try:
+            ticket = rule['ticket']
+            if not TimesheetLineParser.ticket_re.match(ticket):
+                raise ValueError('invalid ticket {!r}'.format(ticket))
+
+            comment = rule.get('comment', '')
+            if not isinstance(comment, str) or '\n' in comment:
+                raise ValueError('invalid comment {!r}'.format(comment))
+            if comment and not comment.startswith('"'):
+                comment = '"{}"'.format(comment)
+
+            from_dt = datetime.strptime(rule['time_from'], '%H:%M')
+            minutes = int(rule['minutes'])
+            weekdays = [
+                WEEKDAYS.index(day.upper())
+                for day in rule.get('days', WEEKDAYS[:5])
+            ]
+            interval = int(rule.get('interval', 1))
+            start_ordinal = datetime.strptime(
+                rule.get('start', '0001-01-01'),
+                '%Y-%m-%d'
+            ).toordinal()
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(
+                'invalid recurring entry {!r}: {}'.format(rule, e)
+            )
+
+        from_minutes = from_dt.hour * 60 + from_dt.minute
+        if minutes <= 0 or from_minutes + minutes > 24 * 60 or \
+                interval <= 0:
+            raise ValueError('invalid recurring entry {!r}'.format(rule))
+
+        return cls(
+            ticket,
+            comment,
+            from_minutes,
+            minutes,
+            weekdays,
+            interval,
+            start_ordinal
+        )
+
+    def iter_entries(
+        self,
+        start_ordinal: int,
+        end_ordinal: int
+    ) -> Iterator[TimesheetEntry]:
+        """
+        Yield occurrences in range of date ordinals,
+        end of range is not included.
+        """
+        # Monday of week of first occurrence
+        start_week_ordinal = self.start_ordinal - \
+            date.fromordinal(self.start_ordinal).weekday()
+
+        for date_ordinal in range(
+            max(start_ordinal, self.start_ordinal),
+            end_ordinal
+        ):
+            weeks = (date_ordinal - start_week_ordinal) // 7
+            if weeks % self.interval or \
+                    date.fromordinal(date_ordinal).weekday() \
+                    not in self.weekdays:
+                continue
+
+            yield TimesheetEntry(
+                date_ordinal,
+                self.from_minutes,
+                self.from_minutes + self.minutes,
+                self.ticket,
+                self.comment
+            )
+
+
+def get_missing_entries(
+    rules: Iterable[RecurrenceRule],
+    start_ordinal: int,
+    end_ordinal: int,
+    lines_by_date: Dict[int, List[Tuple[int, TimesheetEntry]]],
+    now: Optional[datetime]=None
+) -> List[TimesheetEntry]:
+    """
+    Return occurrences of `rules` in range of date ordinals
+    which aren't in timesheet yet, sorted by date and time.
+    Occurrence is in timesheet if there's line of the same date,
+    time_from and ticket in `lines_by_date`. Occurrences which start
+    after `now` (current time by default) aren't returned.
+    """
+    now = now or datetime.now()
+    now_key = now.toordinal(), now.hour * 60 + now.minute
+
+    missing_entries = []
+    for rule in rules:
+        for entry in rule.iter_entries(start_ordinal, end_ordinal):
+            if (entry.date_ordinal, entry.from_minutes) > now_key:
+                break
+
+            if any(
+                timesheet_entry.from_minutes == entry.from_minutes and
+                timesheet_entry.ticket == entry.ticket
+                for _, timesheet_entry in lines_by_date.get(
+                    entry.date_ordinal,
+                    ()
+                )
+            ):
+                continue
+
+            missing_entries.append(entry)
+
+    missing_entries.sort(
+        key=lambda entry: (entry.date_ordinal, entry.from_minutes)
+    )
+
+    # Several rules could give the same line
+    return [
+        entry
+        for index, entry in enumerate(missing_entries)
+        if not index or entry != missing_entries[index - 1]
+    ]
+
+
+def get_insert_blocks(
+    entries: List[TimesheetEntry],
+    lines_by_date: Dict[int, List[Tuple[int, TimesheetEntry]]]
+) -> List[Tuple[Optional[int], Optional[int], bool, List[TimesheetEntry]]]:
+    """
+    Return where given new `entries` (sorted by date and time)
+    should be inserted among existing timesheet lines, grouped
+    into blocks of consecutive lines: number and date ordinal of line
+    to insert block after (or before, if third item is False),
+    and entries of block. Line number and date are None
+    if there are no timesheet lines at all.
+    Lines of day go after lines of the same day that start earlier,
+    lines of new day go after lines of previous day.
+    """
+    dates = sorted(lines_by_date)
+
+    def first_row(date_ordinal: int) -> Tuple[int, int, bool]:
+        row = min(row for row, _ in lines_by_date[date_ordinal])
+        return row, date_ordinal, False
+
+    def last_row(
+        date_ordinal: int,
+        max_from_minutes: int=24 * 60
+    ) -> Optional[Tuple[int, int, bool]]:
+        rows = [
+            row
+            for row, entry in lines_by_date[date_ordinal]
+            if entry.from_minutes <= max_from_minutes
+        ]
+        if rows:
+            return max(rows), date_ordinal, True
+
+    blocks = []
+    for entry in entries:
+        if entry.date_ordinal in lines_by_date:
+            anchor = last_row(entry.date_ordinal, entry.from_minutes) or \
+                first_row(entry.date_ordinal)
+        else:
+            index = bisect_left(dates, entry.date_ordinal)
+            if index:
+                anchor = last_row(dates[index - 1])
+            elif dates:
+                anchor = first_row(dates[0])
+            else:
+                anchor = None, None, True
+
+        if blocks and blocks[-1][:3] == anchor:
+            blocks[-1][3].append(entry)
+        else:
+            blocks.append(anchor + ([entry],))
+
+    return blocks
+
+
+def format_block(
+    entries: List[TimesheetEntry],
+    anchor_date_ordinal: Optional[int],
+    after: bool
+) -> str:
+    """
+    Return content of block of new lines to insert after end
+    of anchor line of `anchor_date_ordinal` date (or before its beginning
+    if `after` is False). Lines of different days are divided
+    by empty line.
+    """
+    content = ''
+
+    if after:
+        previous_date_ordinal = anchor_date_ordinal
+        for entry in entries:
+            if entry.date_ordinal != previous_date_ordinal:
+                content += '\n'
+            content += '\n' + entry.to_line()
+            previous_date_ordinal = entry.date_ordinal
+        return content
+
+    previous_date_ordinal = entries[0].date_ordinal
+    for entry in entries:
+        if entry.date_ordinal != previous_date_ordinal:
+            content += '\n'
+        content += entry.to_line() + '\n'
+        previous_date_ordinal = entry.date_ordinal
+
+    if previous_date_ordinal != anchor_date_ordinal:
+        content += '\n'
+
+    return content
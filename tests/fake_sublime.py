@@ -0,0 +1,721 @@
+"""
+Pure Python stand-in of Sublime Text API, to run helpers, commands
+and benchmarks outside of Sublime Text, e.g. on timesheets
+of million lines in CI.
+
+Only part of API that's used by this package is implemented.
+Views keep their content in memory, every API call could be slowed
+down by `latency` seconds to simulate communication of plugin host
+with Sublime Text. Timeouts are queued and run only by `run_timeouts`.
+
+Event listeners of plugins get modification, activation and closing
+events of views (except output panels): handlers of async events
+(e.g. `on_modified_async`) are queued as timeouts, other handlers
+are called right away. New views are created without events.
+
+Call `install` before importing modules of this package,
+it registers this module as `sublime`, and stand-in of `sublime_plugin`.
+"""
+import json
+import os
+from functools import partial
+import re
+import sys
+import tempfile
+import time
+import types
+from bisect import bisect_right
+
+try:
+    from typing import Callable, Iterator, List, Optional, Tuple, Union
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Callable, Iterator, List, Optional
+    from timesheets.typing.typing import Tuple, Union
+
+
+DRAW_EMPTY = 1
+HIDE_ON_MINIMAP = 4
+DRAW_EMPTY_AS_OVERWRITE = 8
+PERSISTENT = 16
+DRAW_NO_FILL = 32
+HIDDEN = 128
+DRAW_NO_OUTLINE = 256
+DRAW_SOLID_UNDERLINE = 512
+DRAW_SQUIGGLY_UNDERLINE = 1024
+DRAW_STIPPLED_UNDERLINE = 2048
+
+HOVER_TEXT = 1
+HOVER_GUTTER = 2
+HOVER_MARGIN = 3
+
+HIDE_ON_MOUSE_MOVE_AWAY = 2
+
+# Default delay of every API call of new views, in seconds
+latency = 0.0
+
+# Functions scheduled by `set_timeout` and `set_timeout_async`,
+# with their delays
+timeouts = []
+
+# Loaded settings by name of settings file
+settings_files = {}
+
+# Instances of event listeners of plugins: global ones by class,
+# view ones by view id
+event_listeners = {}
+view_event_listeners = {}
+
+# Directory of this package
+package_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def simulate_latency(seconds: float):
+    """Wait given time, busy waiting is more precise than sleep."""
+    if seconds <= 0:
+        return
+
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def set_timeout(callback: Callable[[], None], delay: int=0):
+    timeouts.append((delay, callback))
+
+
+def set_timeout_async(callback: Callable[[], None], delay: int=0):
+    timeouts.append((delay, callback))
+
+
+def run_timeouts():
+    """Run scheduled functions in order of their delays."""
+    while timeouts:
+        timeouts.sort(key=lambda timeout: timeout[0])
+        _, callback = timeouts.pop(0)
+        callback()
+
+
+def version() -> str:
+    return '3211'
+
+
+def platform() -> str:
+    return sys.platform
+
+
+def cache_path() -> str:
+    path = os.path.join(tempfile.gettempdir(), 'fake_sublime_cache')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def status_message(message: str):
+    pass
+
+
+def error_message(message: str):
+    print(message, file=sys.stderr)
+
+
+def load_settings(name: str) -> 'Settings':
+    """Return settings loaded from file of this package."""
+    if name not in settings_files:
+        values = {}
+
+        path = os.path.join(package_path, 'settings', name)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                content = re.sub(r'^\s*//.*$', '', f.read(), flags=re.M)
+            values = json.loads(content)
+
+        settings_files[name] = Settings(values)
+
+    return settings_files[name]
+
+
+def save_settings(name: str):
+    pass
+
+
+class Region:
+    __slots__ = ('a', 'b', 'xpos')
+
+    def __init__(self, a: int, b: Optional[int]=None, xpos: int=-1):
+        self.a = a
+        self.b = a if b is None else b
+        self.xpos = xpos
+
+    def begin(self) -> int:
+        return min(self.a, self.b)
+
+    def end(self) -> int:
+        return max(self.a, self.b)
+
+    def size(self) -> int:
+        return abs(self.b - self.a)
+
+    def empty(self) -> bool:
+        return self.a == self.b
+
+    def contains(self, x: Union['Region', int]) -> bool:
+        if isinstance(x, Region):
+            return self.begin() <= x.begin() and x.end() <= self.end()
+        return self.begin() <= x <= self.end()
+
+    def cover(self, region: 'Region') -> 'Region':
+        return Region(
+            min(self.begin(), region.begin()),
+            max(self.end(), region.end())
+        )
+
+    def intersects(self, region: 'Region') -> bool:
+        return \
+            self.begin() < region.end() and region.begin() < self.end() or \
+            self.contains(region) or region.contains(self)
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def __eq__(self, other) -> bool:
+        return \
+            isinstance(other, Region) and \
+            (self.a, self.b) == (other.a, other.b)
+
+    def __hash__(self) -> int:
+        return hash((self.a, self.b))
+
+    def __repr__(self) -> str:
+        return '({}, {})'.format(self.a, self.b)
+
+
+class Selection:
+    def __init__(self, view: 'View'):
+        self.view = view
+        self.regions = [Region(0)]
+
+    def clear(self):
+        self.regions = []
+
+    def add(self, x: Union[Region, int]):
+        region = x if isinstance(x, Region) else Region(x)
+        self.regions = sorted(
+            [r for r in self.regions if r != region] + [region],
+            key=Region.begin
+        )
+
+    def add_all(self, regions):
+        for region in regions:
+            self.add(region)
+
+    def __getitem__(self, index: int) -> Region:
+        self.view.call_api()
+        return self.regions[index]
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def __iter__(self):
+        return iter(list(self.regions))
+
+
+class Settings:
+    def __init__(self, values: Optional[dict]=None):
+        self.values = dict(values or {})
+        self.callbacks = {}
+
+    def get(self, key: str, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key: str, value):
+        self.values[key] = value
+        for callback in list(self.callbacks.values()):
+            callback()
+
+    def erase(self, key: str):
+        self.values.pop(key, None)
+
+    def has(self, key: str) -> bool:
+        return key in self.values
+
+    def add_on_change(self, tag: str, callback: Callable[[], None]):
+        self.callbacks[tag] = callback
+
+    def clear_on_change(self, tag: str):
+        self.callbacks.pop(tag, None)
+
+
+class Edit:
+    pass
+
+
+class View:
+    """View which content is kept in memory."""
+
+    last_id = 0
+
+    def __init__(self, window: 'Window', content: str=''):
+        View.last_id += 1
+        self.view_id = View.last_id
+
+        self.parent_window = window
+        self.content = content
+        self.changes = 0
+        self.latency = latency
+
+        self.selection = Selection(self)
+        self.view_settings = Settings()
+        self.regions = {}
+        self.statuses = {}
+        self.valid = True
+        self.scratch = False
+        self.path = None
+        self.saved_changes = 0
+        # Events of output panels aren't dispatched to event listeners
+        self.is_panel = False
+
+        # Offsets of line starts, built on demand after modification
+        self.line_starts = None
+
+    def call_api(self):
+        """Simulate call of Sublime Text API."""
+        simulate_latency(self.latency)
+
+    def id(self) -> int:
+        return self.view_id
+
+    def buffer_id(self) -> int:
+        return self.view_id
+
+    def is_valid(self) -> bool:
+        return self.valid
+
+    def is_loading(self) -> bool:
+        return False
+
+    def is_dirty(self) -> bool:
+        return self.changes != self.saved_changes
+
+    def is_scratch(self) -> bool:
+        return self.scratch
+
+    def set_scratch(self, scratch: bool):
+        self.scratch = scratch
+
+    def file_name(self) -> Optional[str]:
+        return self.path
+
+    def window(self) -> Optional['Window']:
+        return self.parent_window if self.valid else None
+
+    def settings(self) -> Settings:
+        return self.view_settings
+
+    def change_count(self) -> int:
+        self.call_api()
+        return self.changes
+
+    def size(self) -> int:
+        self.call_api()
+        return len(self.content)
+
+    def sel(self) -> Selection:
+        return self.selection
+
+    def substr(self, x: Union[Region, int]) -> str:
+        self.call_api()
+        if isinstance(x, Region):
+            return self.content[x.begin():x.end()]
+        return self.content[x:x + 1]
+
+    def line(self, x: Union[Region, int]) -> Region:
+        self.call_api()
+        if isinstance(x, Region):
+            begin, end = x.begin(), x.end()
+        else:
+            begin = end = x
+
+        begin = max(0, min(begin, len(self.content)))
+        end = max(0, min(end, len(self.content)))
+
+        start = self.content.rfind('\n', 0, begin) + 1
+        stop = self.content.find('\n', end)
+        if stop == -1:
+            stop = len(self.content)
+
+        return Region(start, stop)
+
+    def full_line(self, x: Union[Region, int]) -> Region:
+        region = self.line(x)
+        return Region(region.a, min(region.b + 1, len(self.content)))
+
+    def lines(self, region: Region) -> List[Region]:
+        result = []
+        point = region.begin()
+        while True:
+            line_region = self.line(point)
+            result.append(line_region)
+            if line_region.end() >= region.end():
+                return result
+            point = line_region.end() + 1
+
+    def get_line_starts(self) -> List[int]:
+        if self.line_starts is None:
+            self.line_starts = [0] + [
+                match.end()
+                for match in re.finditer('\n', self.content)
+            ]
+        return self.line_starts
+
+    def rowcol(self, point: int) -> Tuple[int, int]:
+        self.call_api()
+        line_starts = self.get_line_starts()
+        row = bisect_right(line_starts, point) - 1
+        return row, point - line_starts[row]
+
+    def text_point(self, row: int, col: int) -> int:
+        self.call_api()
+        line_starts = self.get_line_starts()
+        row = max(0, min(row, len(line_starts) - 1))
+        return min(line_starts[row] + col, len(self.content))
+
+    def insert(self, edit: Edit, point: int, text: str) -> int:
+        self.modify(Region(point), text)
+        return len(text)
+
+    def replace(self, edit: Edit, region: Region, text: str):
+        self.modify(region, text)
+
+    def erase(self, edit: Edit, region: Region):
+        self.modify(region, '')
+
+    def modify(self, region: Region, text: str):
+        """Replace content of `region`, shift regions after it."""
+        self.call_api()
+
+        begin, end = region.begin(), region.end()
+        self.content = self.content[:begin] + text + self.content[end:]
+        self.changes += 1
+        self.line_starts = None
+
+        shift = len(text) - (end - begin)
+
+        def shift_point(point: int) -> int:
+            if point >= end:
+                return point + shift
+            if point > begin:
+                return begin + len(text)
+            return point
+
+        def shift_region(r: Region) -> Region:
+            return Region(shift_point(r.a), shift_point(r.b))
+
+        self.selection.regions = [
+            shift_region(r)
+            for r in self.selection.regions
+        ]
+        for key, (regions, scope, icon, flags) in self.regions.items():
+            self.regions[key] = \
+                [shift_region(r) for r in regions], scope, icon, flags
+
+        dispatch(self, 'on_modified')
+        dispatch(self, 'on_modified_async')
+
+    def run_command(self, name: str, args: Optional[dict]=None):
+        """Run built-in command or text command of plugins."""
+        args = args or {}
+        edit = Edit()
+
+        if name == 'insert':
+            for index in range(len(self.selection.regions)):
+                region = self.selection.regions[index]
+                self.replace(edit, region, args['characters'])
+                point = region.begin() + len(args['characters'])
+                self.selection.regions[index] = Region(point)
+            return
+
+        if name == 'append':
+            self.insert(edit, len(self.content), args['characters'])
+            return
+
+        if name == 'select_all':
+            self.selection.regions = [Region(0, len(self.content))]
+            return
+
+        command = find_command(name, TextCommand)
+        if command:
+            command(self).run(edit, **args)
+
+    def add_regions(
+        self,
+        key: str,
+        regions: List[Region],
+        scope: str='',
+        icon: str='',
+        flags: int=0
+    ):
+        self.call_api()
+        self.regions[key] = \
+            sorted(regions, key=Region.begin), scope, icon, flags
+
+    def get_regions(self, key: str) -> List[Region]:
+        self.call_api()
+        regions = self.regions.get(key)
+        return list(regions[0]) if regions else []
+
+    def erase_regions(self, key: str):
+        self.call_api()
+        self.regions.pop(key, None)
+
+    def set_status(self, key: str, value: str):
+        self.statuses[key] = value
+
+    def get_status(self, key: str) -> str:
+        return self.statuses.get(key, '')
+
+    def erase_status(self, key: str):
+        self.statuses.pop(key, None)
+
+    def show(self, x, *args, **kwargs):
+        pass
+
+    def show_at_center(self, x):
+        pass
+
+    def show_popup(self, content: str, flags: int=0, location: int=-1,
+                   *args, **kwargs):
+        pass
+
+    def set_name(self, name: str):
+        self.view_name = name
+
+    def set_read_only(self, read_only: bool):
+        pass
+
+    def assign_syntax(self, syntax: str):
+        self.view_settings.set('syntax', syntax)
+
+    def set_syntax_file(self, syntax: str):
+        self.view_settings.set('syntax', syntax)
+
+    def scope_name(self, point: int) -> str:
+        return ''
+
+    def match_selector(self, point: int, selector: str) -> bool:
+        return False
+
+
+class Window:
+    def __init__(self):
+        self.window_views = []
+        self.active = None
+        self.panels = {}
+        self.visible_panel = None
+
+    def id(self) -> int:
+        return 1
+
+    def new_file(self) -> View:
+        view = View(self)
+        self.window_views.append(view)
+        self.active = view
+        return view
+
+    def views(self) -> List[View]:
+        return list(self.window_views)
+
+    def active_view(self) -> Optional[View]:
+        return self.active
+
+    def focus_view(self, view: View):
+        if view is self.active:
+            return
+
+        self.active = view
+        dispatch(view, 'on_activated')
+        dispatch(view, 'on_activated_async')
+
+    def run_command(self, name: str, args: Optional[dict]=None):
+        """Run built-in command or window command of plugins."""
+        args = args or {}
+
+        if name == 'close_file':
+            view = self.active
+            if view:
+                dispatch(view, 'on_pre_close')
+                view.valid = False
+                self.window_views.remove(view)
+                self.active = None
+                dispatch(view, 'on_close')
+                view_event_listeners.pop(view.view_id, None)
+
+                if self.window_views:
+                    self.focus_view(self.window_views[-1])
+            return
+
+        if name == 'show_panel':
+            self.visible_panel = args.get('panel')
+            return
+
+        command = find_command(name, WindowCommand)
+        if command:
+            command(self).run(**args)
+
+    def status_message(self, message: str):
+        pass
+
+    def create_output_panel(self, name: str, unlisted: bool=False) -> View:
+        panel = self.panels[name] = View(self)
+        panel.is_panel = True
+        return panel
+
+    def find_output_panel(self, name: str) -> Optional[View]:
+        return self.panels.get(name)
+
+    def destroy_output_panel(self, name: str):
+        self.panels.pop(name, None)
+
+    def active_panel(self) -> Optional[str]:
+        return self.visible_panel
+
+    def show_quick_panel(self, items, on_select, *args, **kwargs):
+        pass
+
+    def show_input_panel(self, *args, **kwargs):
+        pass
+
+
+active = Window()
+
+
+def active_window() -> Window:
+    return active
+
+
+def windows() -> List[Window]:
+    return [active]
+
+
+# Stand-in of `sublime_plugin` module
+
+
+class EventListener:
+    pass
+
+
+class ViewEventListener:
+    @classmethod
+    def is_applicable(cls, settings: Settings) -> bool:
+        return True
+
+    def __init__(self, view: View):
+        self.view = view
+
+
+class TextCommand:
+    def __init__(self, view: View):
+        self.view = view
+
+
+class WindowCommand:
+    def __init__(self, window: Window):
+        self.window = window
+
+
+def get_command_name(command_class: type) -> str:
+    """Return name of command, e.g. "goto_ticket" of GotoTicketCommand."""
+    name = command_class.__name__
+    if name.endswith('Command'):
+        name = name[:-len('Command')]
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+
+
+def iter_subclasses(base_class: type) -> Iterator[type]:
+    """Iterate all subclasses of `base_class`, including indirect ones."""
+    classes = list(base_class.__subclasses__())
+    while classes:
+        subclass = classes.pop()
+        yield subclass
+        classes.extend(subclass.__subclasses__())
+
+
+def find_command(name: str, base_class: type) -> Optional[type]:
+    """Return subclass of `base_class` which is command with `name`."""
+    for command_class in iter_subclasses(base_class):
+        if get_command_name(command_class) == name:
+            return command_class
+
+
+def get_event_listeners(view: View) -> list:
+    """
+    Return event listeners that get events of given `view`,
+    create them if needed.
+    """
+    if view.view_id not in view_event_listeners:
+        view_event_listeners[view.view_id] = [
+            listener_class(view)
+            for listener_class in iter_subclasses(ViewEventListener)
+            if listener_class.is_applicable(view.settings())
+        ]
+
+    for listener_class in iter_subclasses(EventListener):
+        if listener_class not in event_listeners:
+            event_listeners[listener_class] = listener_class()
+
+    return view_event_listeners[view.view_id] + list(event_listeners.values())
+
+
+def dispatch(view: View, event: str):
+    """
+    Call handlers of `event` of event listeners of `view`,
+    handlers of async events are queued as timeouts.
+    """
+    if view.is_panel:
+        return
+
+    for listener in get_event_listeners(view):
+        handler = getattr(listener, event, None)
+        if handler is None:
+            continue
+
+        if not isinstance(listener, ViewEventListener):
+            handler = partial(handler, view)
+
+        if event.endswith('_async'):
+            set_timeout_async(handler)
+        else:
+            handler()
+
+
+def install(api_latency: float=0.0) -> bool:
+    """
+    Register this module as `sublime` and its part as `sublime_plugin`,
+    unless real Sublime Text API is available. Every API call of views
+    created after that takes `api_latency` seconds.
+    Return True if stand-in is installed.
+    """
+    global latency
+    latency = api_latency
+
+    try:
+        import sublime
+        import sublime_plugin
+        return sublime is sys.modules[__name__]
+    except ImportError:
+        pass
+
+    sys.modules['sublime'] = sys.modules[__name__]
+
+    sublime_plugin = types.ModuleType('sublime_plugin')
+    for name in ['EventListener', 'ViewEventListener', 'TextCommand',
+                 'WindowCommand']:
+        setattr(sublime_plugin, name, globals()[name])
+    sys.modules['sublime_plugin'] = sublime_plugin
+
+    # Bundled `typing` module supports only Python 3.3 of Sublime Text 3
+    if sys.version_info >= (3, 5) and \
+            'timesheets.typing.typing' not in sys.modules:
+        import typing
+        sys.modules['timesheets.typing.typing'] = typing
+
+    return True
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest import TestCase
+from unittest.mock import patch
+
+from timesheets.batch import aggregate_file, aggregate_files
+from timesheets.batch import iter_timesheet_files
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.path_1 = self.create_file(
+            'first.timesheet',
+            '2018-07-01,10:00,11:00,PROJECT-1,"comment"\n'
+            '# comment\n'
+            '\n'
+            'invalid line\n'
+            '2018-07-02,10:00,10:30,PROJECT-2,"comment"\n'
+            '2018-07-02,10:30,     ,PROJECT-2,"comment"\n'
+        )
+        self.path_2 = self.create_file(
+            os.path.join('team', 'second.timesheet'),
+            '2018-06-30,10:00,11:00,PROJECT-2,"comment"\n'
+            '2018-07-02,10:00,10:20,PROJECT-2,"comment"\n'
+        )
+        self.create_file('.hidden', 'hidden file')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def create_file(self, name: str, content: str) -> str:
+        """Create file in temporary directory, return its path."""
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_aggregate_file(self):
+        file_totals = aggregate_file(self.path_1)
+
+        self.assertEqual(
+            file_totals.minutes_by_ticket,
+            {'PROJECT-1': 60, 'PROJECT-2': 30}
+        )
+        self.assertEqual(file_totals.minutes_by_day, {
+            date(2018, 7, 1).toordinal(): 60,
+            date(2018, 7, 2).toordinal(): 30,
+        })
+        self.assertEqual(file_totals.invalid_lines, [4])
+        self.assertEqual(file_totals.unfinished_lines, [6])
+        self.assertIsNone(file_totals.error)
+
+    def test_aggregate_file_date_range(self):
+        file_totals = aggregate_file(
+            self.path_1,
+            date(2018, 7, 2).toordinal(),
+            date(2018, 7, 3).toordinal()
+        )
+
+        self.assertEqual(file_totals.minutes_by_ticket, {'PROJECT-2': 30})
+
+    def test_aggregate_file_error(self):
+        file_totals = aggregate_file(os.path.join(self.directory, 'missing'))
+
+        self.assertTrue(file_totals.error)
+        self.assertEqual(file_totals.minutes_by_ticket, {})
+
+    def test_iter_timesheet_files(self):
+        self.assertEqual(
+            list(iter_timesheet_files([self.directory, '/not/a/directory'])),
+            [self.path_1, self.path_2, '/not/a/directory']
+        )
+
+    @patch('timesheets.batch.ProcessPoolExecutor', ThreadPoolExecutor)
+    def test_aggregate_files(self):
+        """Results of files are merged, error in file doesn't stop others."""
+        missing_path = os.path.join(self.directory, 'missing')
+
+        batch_totals = aggregate_files(
+            [self.path_1, missing_path, self.path_2],
+            date(2018, 7, 1).toordinal()
+        )
+
+        self.assertEqual(
+            batch_totals.minutes_by_ticket,
+            {'PROJECT-1': 60, 'PROJECT-2': 30 + 20}
+        )
+        self.assertEqual(batch_totals.get_total_minutes(), 60 + 30 + 20)
+        self.assertEqual(
+            [file_totals.path for file_totals in batch_totals.files],
+            [self.path_1, missing_path, self.path_2]
+        )
+        self.assertTrue(batch_totals.files[1].error)
+
+    def test_aggregate_files_invalid_max_workers(self):
+        with self.assertRaises(ValueError):
+            aggregate_files([self.path_1], max_workers=0)
@@ -0,0 +1,122 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch
+
+from freezegun import freeze_time
+
+from timesheets.__main__ import main
+
+
+@freeze_time('2018-07-10 12:00')
+class TestCommandLine(TestCase):
+    def setUp(self):
+        self.files = []
+
+    def tearDown(self):
+        for path in self.files:
+            os.remove(path)
+
+    def create_file(self, content: str) -> str:
+        """Create temporary file with given content, return its path."""
+        fd, path = tempfile.mkstemp(suffix='.timesheet')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.files.append(path)
+        return path
+
+    def run_main(self, argv, stdin=''):
+        """Run command line entry-point, return exit code and output."""
+        with patch('sys.stdin', StringIO(stdin)), \
+                patch('sys.stdout', new_callable=StringIO) as stdout:
+            exit_code = main(argv)
+        return exit_code, stdout.getvalue()
+
+    def test_files(self):
+        paths = [
+            self.create_file(
+                '2018-07-01,10:00,11:00,PROJECT-1,"comment"\n'
+                '2018-07-09,10:00,11:00,PROJECT-1,"comment"\n'
+            ),
+            self.create_file(
+                '# comment\n'
+                '2018-07-10,10:00,10:30,PROJECT-2,"comment"\n'
+            ),
+        ]
+
+        self.assertEqual(self.run_main(paths), (0, (
+            'today  00:30\n'
+            'week   01:30\n'
+            'month  02:30\n'
+        )))
+
+    def test_stdin_periods_and_date(self):
+        self.assertEqual(
+            self.run_main(
+                ['--period', 'today', '-p', '10', '--date', '2018-07-09'],
+                stdin='2018-07-01,10:00,11:00,PROJECT-1,"comment"\n'
+                      '2018-07-09,10:00,11:00,PROJECT-1,"comment"\n'
+            ),
+            (0, (
+                'today  01:00\n'
+                '10     02:00\n'
+            ))
+        )
+
+    def test_unfinished_line_and_date(self):
+        """
+        Line in progress on given date is counted till the end of that day,
+        and till current time on today's date.
+        """
+        stdin = (
+            '2018-07-09,22:00,     ,PROJECT-1,"comment"\n'
+            '2018-07-10,10:00,     ,PROJECT-1,"comment"\n'
+        )
+
+        self.assertEqual(
+            self.run_main(['-p', 'today', '--date', '2018-07-09'], stdin),
+            (0, 'today  02:00\n')
+        )
+        self.assertEqual(
+            self.run_main(['-p', 'today', '--date', '2018-07-10'], stdin),
+            (0, 'today  02:00\n')
+        )
+
+    @patch('timesheets.batch.ProcessPoolExecutor', ThreadPoolExecutor)
+    def test_report_tickets(self):
+        paths = [
+            self.create_file(
+                '2018-07-01,10:00,11:00,PROJECT-1,"comment"\n'
+                '2018-07-09,10:00,10:10,PROJECT-2,"comment"\n'
+            ),
+            self.create_file(
+                '2018-07-10,10:00,10:30,PROJECT-2,"comment"\n'
+            ),
+        ]
+
+        self.assertEqual(
+            self.run_main(['--report', 'tickets', '--since', '2018-07-09'] +
+                          paths),
+            (0, (
+                'PROJECT-2  00:40\n'
+                'total      00:40\n'
+            ))
+        )
+
+    def test_missing_file(self):
+        with patch('sys.stderr', new_callable=StringIO):
+            exit_code, _ = self.run_main(['/not/existing/timesheet'])
+
+        self.assertEqual(exit_code, 1)
+
+    def test_invalid_jobs(self):
+        """Number of processes less than 1 is usage error."""
+        for jobs in ['0', '-1', 'x']:
+            with patch('sys.stderr', new_callable=StringIO) as stderr, \
+                    self.assertRaises(SystemExit) as context:
+                self.run_main(['--report', 'tickets', '-j', jobs, '.'])
+
+            self.assertEqual(context.exception.code, 2)
+            self.assertIn('expected positive number', stderr.getvalue())
@@ -0,0 +1,329 @@
+from datetime import date, datetime
+from unittest import TestCase
+from unittest.mock import patch
+
+from freezegun import freeze_time
+
+from timesheets.tests.base import BasePluginTestCase
+from timesheets.core import DateIndex, get_period_range, iter_timesheet_info
+from timesheets.core import check_day, lint_lines, sort_minutes, summarize
+from timesheets.core import summarize_reversed
+from timesheets.core import RoundingPolicy, timesheet_line_parser
+
+
+class TestGetPeriodRange(BasePluginTestCase):
+    def test_periods(self):
+        # Tuesday
+        today = date(2018, 12, 11)
+
+        for period, expected_range in [
+            ('today', (date(2018, 12, 11), date(2018, 12, 12))),
+            ('week', (date(2018, 12, 10), date(2018, 12, 17))),
+            ('month', (date(2018, 12, 1), date(2019, 1, 1))),
+            ('year', (date(2018, 1, 1), date(2019, 1, 1))),
+            (3, (date(2018, 12, 9), date(2018, 12, 12))),
+        ]:
+            self.assertEqual(
+                get_period_range(period, today),
+                tuple(d.toordinal() for d in expected_range),
+                period
+            )
+
+    def test_unknown_period(self):
+        for period in ['decade', 0, -1, '3']:
+            with self.assertRaises(ValueError):
+                get_period_range(period, date(2018, 12, 11))
+
+
+@freeze_time('2018-07-10 12:00')
+class TestSummarize(BasePluginTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # Lines are not in chronological order
+        self.lines = [
+            '2018-07-09,10:00,10:30,PROJECT-123,"comment"\n',
+            '2018-07-10,10:00,10:40,PROJECT-123,"comment"\n',
+            '# comment\n',
+            '2018-07-08,10:00,10:20,PROJECT-123,"comment"\r\n',
+            '2018-07-10,11:00,     ,PROJECT-123,"comment"\n',
+        ]
+
+    def test_iter_timesheet_info(self):
+        self.assertEqual(
+            [
+                timesheet_info.from_dt.day
+                for timesheet_info in iter_timesheet_info(self.lines)
+            ],
+            [9, 10, 8, 10]
+        )
+
+    def test_summarize(self):
+        """All lines are counted regardless of order."""
+        summary = summarize(
+            iter_timesheet_info(self.lines),
+            ['today', 'week', 'month'],
+            date(2018, 7, 10)
+        )
+
+        self.assertEqual(summary['today'], 40 + 60)
+        self.assertEqual(summary['week'], 30 + 40 + 60)
+        self.assertEqual(summary['month'], 30 + 40 + 20 + 60)
+
+    def test_summarize_billable(self):
+        """Billable time of every line is rounded up to 15 minutes."""
+        summary = summarize(
+            iter_timesheet_info(self.lines),
+            ['today', 'week'],
+            date(2018, 7, 10),
+            RoundingPolicy(15, 'ceil')
+        )
+
+        self.assertEqual(summary['today'], 40 + 60)
+        self.assertEqual(summary.get_billable_minutes('today'), 45 + 60)
+        self.assertEqual(summary.get_billable_minutes('week'), 30 + 45 + 60)
+
+    def test_summarize_reversed(self):
+        """Counting stops at first line out of period."""
+        summary = summarize_reversed(
+            reversed(list(iter_timesheet_info(self.lines))),
+            ['today', 'week'],
+            date(2018, 7, 10)
+        )
+
+        self.assertEqual(summary['today'], 60)
+        self.assertEqual(summary['week'], 60)
+
+    def test_date_index(self):
+        """Lines are found by date regardless of their order."""
+        self.lines.append('2018-07-09,09:00,09:10,PROJECT-7,"back-dated"')
+        date_index = DateIndex(iter_timesheet_info(self.lines))
+
+        self.assertEqual(
+            [
+                (entry.date, entry.ticket)
+                for entry in date_index.get_range(
+                    date(2018, 7, 9).toordinal(),
+                    date(2018, 7, 10).toordinal()
+                )
+            ],
+            [
+                (date(2018, 7, 9), 'PROJECT-123'),
+                (date(2018, 7, 9), 'PROJECT-7'),
+            ]
+        )
+
+        summary = date_index.summarize(['today', 'week'], date(2018, 7, 10))
+
+        self.assertEqual(summary['today'], 40 + 60)
+        self.assertEqual(summary['week'], 10 + 30 + 40 + 60)
+
+    def test_date_index_patched(self):
+        """Patched index has the same lines as index built again."""
+        entries = list(iter_timesheet_info(self.lines))
+        added = list(iter_timesheet_info([
+            '2018-07-09,09:00,09:10,PROJECT-7,"back-dated"',
+            '2018-07-11,09:00,09:10,PROJECT-8,"comment"',
+        ]))
+        removed = [entries[0], entries[3]]
+        expected = DateIndex(entries[1:3] + added).entries
+
+        date_index = DateIndex(entries)
+        for max_patch_size in [DateIndex.max_patch_size, 0]:
+            with patch.object(DateIndex, 'max_patch_size', max_patch_size):
+                patched_index = date_index.patched(removed, added)
+
+            self.assertEqual(patched_index.entries, expected)
+            self.assertEqual(
+                patched_index.date_ordinals,
+                [entry.date_ordinal for entry in expected]
+            )
+
+        # Original index isn't changed
+        self.assertEqual(date_index.entries, DateIndex(entries).entries)
+
+    def test_sort_minutes(self):
+        self.assertEqual(
+            sort_minutes({'PROJECT-1': 10, 'PROJECT-3': 20, 'PROJECT-2': 10}),
+            [('PROJECT-3', 20), ('PROJECT-1', 10), ('PROJECT-2', 10)]
+        )
+
+
+class TestRoundingPolicy(TestCase):
+    def test_round_minutes(self):
+        for mode, expected in [
+            ('floor', [0, 0, 0, 15, 15]),
+            ('ceil', [0, 15, 15, 15, 30]),
+            ('nearest', [0, 0, 15, 15, 15]),
+        ]:
+            policy = RoundingPolicy(15, mode)
+            self.assertEqual(
+                [policy.round_minutes(minutes) for minutes in
+                 [0, 1, 7.5, 15, 16]],
+                expected,
+                mode
+            )
+
+    def test_round_time(self):
+        policy = RoundingPolicy(15, 'nearest')
+        self.assertEqual(
+            policy.round_time(datetime(2018, 7, 4, 12, 7, 59)),
+            datetime(2018, 7, 4, 12, 0)
+        )
+        self.assertEqual(
+            policy.round_time(datetime(2018, 7, 4, 12, 8)),
+            datetime(2018, 7, 4, 12, 15)
+        )
+
+    def test_round_time_seconds(self):
+        """Seconds don't push time to the next increment."""
+        policy = RoundingPolicy(10, 'ceil')
+        self.assertEqual(
+            policy.round_time(datetime(2018, 7, 4, 12, 0, 30)),
+            datetime(2018, 7, 4, 12, 0)
+        )
+        self.assertEqual(
+            policy.round_time(datetime(2018, 7, 4, 12, 1, 30)),
+            datetime(2018, 7, 4, 12, 10)
+        )
+
+    def test_round_time_end_of_day(self):
+        """Time isn't rounded to the next day."""
+        for policy, dt in [
+            (RoundingPolicy(15, 'nearest'), datetime(2018, 7, 4, 23, 56)),
+            (RoundingPolicy(15, 'ceil'), datetime(2018, 7, 4, 23, 50)),
+            (RoundingPolicy(60, 'ceil'), datetime(2018, 7, 4, 23, 59, 59)),
+        ]:
+            self.assertEqual(
+                policy.round_time(dt),
+                datetime(2018, 7, 4, 23, 59),
+                policy.mode
+            )
+        self.assertEqual(
+            RoundingPolicy(15, 'nearest').round_time(
+                datetime(2018, 7, 4, 23, 52)
+            ),
+            datetime(2018, 7, 4, 23, 45)
+        )
+
+    def test_billable_minutes(self):
+        """Every line is billed at least minimum increment."""
+        policy = RoundingPolicy(10, 'floor', 30)
+        self.assertEqual(policy.billable_minutes(5), 30)
+        self.assertEqual(policy.billable_minutes(44), 40)
+        self.assertEqual(policy.billable_minutes(0), 0)
+        self.assertEqual(policy.billable_minutes(-10), -10)
+
+    def test_from_settings(self):
+        policy = RoundingPolicy.from_settings(None)
+        self.assertEqual(
+            (policy.granularity, policy.mode, policy.minimum),
+            (10, 'floor', 0)
+        )
+
+        policy = RoundingPolicy.from_settings(
+            {'granularity': 6, 'mode': 'ceil', 'minimum': 15}
+        )
+        self.assertEqual(
+            (policy.granularity, policy.mode, policy.minimum),
+            (6, 'ceil', 15)
+        )
+
+        for settings in [
+            {'granularity': 0},
+            {'granularity': 'ten'},
+            {'mode': 'up'},
+            {'minimum': -1},
+            'floor',
+        ]:
+            with self.assertRaises(ValueError):
+                RoundingPolicy.from_settings(settings)
+
+
+class TestCheckDay(BasePluginTestCase):
+    def check(self, lines, max_gap_minutes=0):
+        return check_day(
+            enumerate(iter_timesheet_info(lines)),
+            max_gap_minutes
+        )
+
+    def test_valid(self):
+        self.assertEqual(
+            self.check([
+                '2018-07-10,10:00,11:00,PROJECT-1,"comment"',
+                '2018-07-10,11:00,11:30,PROJECT-2,"comment"',
+                '2018-07-10,11:30,     ,PROJECT-3,"in progress"',
+            ]),
+            []
+        )
+
+    def test_negative(self):
+        self.assertEqual(
+            self.check(['2018-07-10,11:00,10:00,PROJECT-1,"comment"']),
+            [(0, 'time_to is before time_from')]
+        )
+
+    def test_overlap(self):
+        """Lines are checked in order of time, not in order of lines."""
+        self.assertEqual(
+            self.check([
+                '2018-07-10,12:00,12:30,PROJECT-1,"comment"',
+                '2018-07-10,10:00,13:00,PROJECT-2,"comment"',
+                '2018-07-10,13:00,14:00,PROJECT-3,"comment"',
+                '2018-07-10,13:30,13:40,PROJECT-4,"comment"',
+            ]),
+            [
+                (0, 'overlaps with other line till 13:00'),
+                (3, 'overlaps with other line till 14:00'),
+            ]
+        )
+
+    def test_gap(self):
+        lines = [
+            '2018-07-10,10:00,11:00,PROJECT-1,"comment"',
+            '2018-07-10,12:00,13:00,PROJECT-2,"comment"',
+            '2018-07-10,14:01,15:00,PROJECT-3,"comment"',
+        ]
+
+        self.assertEqual(self.check(lines), [])
+        self.assertEqual(
+            self.check(lines, 60),
+            [(2, 'gap of 01:01 before this line')]
+        )
+
+
+class TestLintLines(BasePluginTestCase):
+    def lint(self, lines, is_cancelled=None):
+        return lint_lines(
+            lines,
+            [timesheet_line_parser.parse(line) for line in lines],
+            is_cancelled
+        )
+
+    def test_problems(self):
+        self.assertEqual(
+            self.lint([
+                '2018-07-09,10:00,11:00,PROJECT-1,"comment"',
+                '# comment',
+                '',
+                'invalid line',
+                '2018-02-30,10:00,11:00,PROJECT-1,"comment"',
+                '2018-07-10,24:00,11:00,PROJECT-1,"comment"',
+                '2018-07-10,10:00,11:60,PROJECT-1,"comment"',
+                '2018-07-10,10:00,11:00,PROJECT-1,"comment"',
+                '2018-07-08,10:00,11:00,PROJECT-1,"back-dated"',
+                '2018-07-10,11:00,12:00,PROJECT-1,"comment"',
+            ]),
+            [
+                (3, 'invalid timesheet line'),
+                (4, 'date 2018-02-30 does not exist'),
+                (5, 'time_from 24:00 does not exist'),
+                (6, 'time_to 11:60 does not exist'),
+                (8, 'date is before 2018-07-10 of line above'),
+            ]
+        )
+
+    def test_cancelled(self):
+        self.assertIsNone(
+            self.lint(['invalid line'], is_cancelled=lambda: True)
+        )
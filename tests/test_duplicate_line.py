@@ -12,7 +12,8 @@ class TestDuplicateTimesheetLine(BasePluginTestCase):
 
         self.command = DuplicateTimesheetLineCommand(self.view)
 
-    def test_floor_time(self):
+    def test_round_time(self):
+        """By default time is rounded down to 10 minutes."""
         source_and_expected = []
         for minute in range(0, 9 + 1):
             source_and_expected.append((
@@ -21,18 +22,7 @@ class TestDuplicateTimesheetLine(BasePluginTestCase):
             ))
 
         for source, expected in source_and_expected:
-            self.assertEqual(self.command.floor_time(source), expected)
-
-    def test_ceil_time(self):
-        source_and_expected = []
-        for minute in range(0, 9 + 1):
-            source_and_expected.append((
-                datetime(2018, 7, 4, 12, minute),
-                datetime(2018, 7, 4, 12, 10)
-            ))
-
-        for source, expected in source_and_expected:
-            self.assertEqual(self.command.ceil_time(source), expected)
+            self.assertEqual(self.command.round_time(source), expected)
 
     def test_get_last_non_empty_line_region_no_content(self):
         self.assertIs(self.command.get_last_non_empty_line_region(), None)
@@ -88,10 +78,7 @@ class TestDuplicateTimesheetLineCommand(BasePluginTestCase):
         self.command = DuplicateTimesheetLineCommand(self.view)
 
         self.today_str = datetime.now().strftime('%Y-%m-%d')
-        self.floor_time_str = self.command.floor_time(
-            datetime.now()
-        ).strftime('%H:%M')
-        self.ceil_time_str = self.command.ceil_time(
+        self.floor_time_str = self.command.round_time(
             datetime.now()
         ).strftime('%H:%M')
 
@@ -278,6 +265,31 @@ class TestDuplicateTimesheetLineCommand(BasePluginTestCase):
             )
         )
 
+    def test_fill_short_time_to_before_comment(self):
+        """
+        Filled time_to could be longer than empty one,
+        new line is still inserted right after filled line.
+        """
+        self.append_text(
+            '{},10:00,,PROJECT-123,"comment"\n'
+            '# comment\n'.format(self.today_str)
+        )
+
+        self.move_cursor(0, 0)
+        self.view.run_command('duplicate_timesheet_line')
+
+        self.assertEqual(
+            self.get_text(),
+            '{},10:00,{},PROJECT-123,"comment"\n'
+            '{},{},     ,PROJECT-123,"comment"\n'
+            '# comment\n'.format(
+                self.today_str,
+                self.floor_time_str,
+                self.today_str,
+                self.floor_time_str,
+            )
+        )
+
     def test_old_jira_under_cursor_no_fill_time_to(self):
         """
         Duplicating old line with empty time_to doesn't fill it
@@ -320,3 +332,41 @@ class TestDuplicateTimesheetLineCommand(BasePluginTestCase):
                 self.today_str,
             )
         )
+
+    def test_multiple_cursors(self):
+        """
+        Lines under all cursors are duplicated together in order
+        of cursors, lines that aren't timesheet lines are skipped,
+        cursors are moved to new lines.
+        """
+        self.append_text(
+            '2018-07-01,10:00,11:00,PROJECT-1,"comment 1"\n'
+            '# comment\n'
+            '2018-07-01,11:00,12:10,PROJECT-2,"comment 2"\n'
+        )
+
+        self.view.sel().clear()
+        self.view.sel().add(self.view.text_point(0, 3))
+        self.view.sel().add(self.view.text_point(0, 5))
+        self.view.sel().add(self.view.text_point(1, 0))
+        self.view.sel().add(self.view.text_point(2, 5))
+        self.view.run_command('duplicate_timesheet_line')
+
+        self.assertEqual(
+            self.get_text(),
+            '2018-07-01,10:00,11:00,PROJECT-1,"comment 1"\n'
+            '# comment\n'
+            '2018-07-01,11:00,12:10,PROJECT-2,"comment 2"\n'
+            '\n'
+            '{},{},     ,PROJECT-1,"comment 1"\n'
+            '{},{},     ,PROJECT-2,"comment 2"\n'.format(
+                self.today_str,
+                self.floor_time_str,
+                self.today_str,
+                self.floor_time_str,
+            )
+        )
+        self.assertEqual(
+            [self.view.rowcol(region.begin()) for region in self.view.sel()],
+            [(4, 3), (5, 5)]
+        )
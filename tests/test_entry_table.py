@@ -0,0 +1,117 @@
+from datetime import date, datetime
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from timesheets import entry_table
+from timesheets.core import RoundingPolicy, get_period_range
+from timesheets.core import iter_timesheet_info
+from timesheets.entry_table import EntryTable
+
+
+class TestEntryTable(TestCase):
+    """Counting in pure Python."""
+
+    numpy = None
+
+    def setUp(self):
+        patcher = patch.object(entry_table, 'numpy', self.numpy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.table = EntryTable.from_entries(iter_timesheet_info([
+            '2018-07-01,10:00,11:00,PROJECT-1,"sunday"',
+            '2018-07-09,10:00,10:30,PROJECT-2,"monday"',
+            '2018-07-10,10:00,10:40,PROJECT-1,"comment"',
+            '2018-07-10,11:00,     ,PROJECT-3,"in progress"',
+        ]))
+        self.now = datetime(2018, 7, 10, 12, 30)
+
+    def test_columns(self):
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(
+            self.table.tickets,
+            ['PROJECT-1', 'PROJECT-2', 'PROJECT-3']
+        )
+        self.assertEqual(list(self.table.ticket_ids), [0, 1, 0, 2])
+        self.assertEqual(list(self.table.to_minutes), [660, 630, 640, -1])
+
+    def test_sum_minutes(self):
+        self.assertEqual(
+            self.table.sum_minutes(now=self.now),
+            60 + 30 + 40 + 90
+        )
+
+    def test_sum_minutes_period(self):
+        """Worked time of period is range of dates in table."""
+        self.assertEqual(
+            self.table.sum_minutes(
+                *get_period_range('today', date(2018, 7, 10)),
+                now=self.now
+            ),
+            40 + 90
+        )
+        self.assertEqual(
+            self.table.sum_minutes(
+                *get_period_range('week', date(2018, 7, 10)),
+                now=self.now
+            ),
+            30 + 40 + 90
+        )
+
+    def test_group_by_day(self):
+        self.assertEqual(
+            self.table.group_by_day(now=self.now),
+            {
+                date(2018, 7, 1).toordinal(): 60,
+                date(2018, 7, 9).toordinal(): 30,
+                date(2018, 7, 10).toordinal(): 40 + 90,
+            }
+        )
+
+    def test_group_by_week(self):
+        """Weeks start on monday."""
+        self.assertEqual(
+            self.table.group_by_week(now=self.now),
+            {
+                date(2018, 6, 25).toordinal(): 60,
+                date(2018, 7, 9).toordinal(): 30 + 40 + 90,
+            }
+        )
+
+    def test_group_by_ticket(self):
+        self.assertEqual(
+            self.table.group_by_ticket(
+                date(2018, 7, 9).toordinal(),
+                date(2018, 7, 11).toordinal(),
+                self.now
+            ),
+            {'PROJECT-1': 40, 'PROJECT-2': 30, 'PROJECT-3': 90}
+        )
+
+    def test_group_by_ticket_billable(self):
+        """Billable time is rounded for every line, not for sum."""
+        self.assertEqual(
+            self.table.group_by_ticket_billable(
+                RoundingPolicy(15, 'ceil', 30),
+                now=self.now
+            ),
+            {
+                'PROJECT-1': (60 + 40, 60 + 45),
+                'PROJECT-2': (30, 30),
+                'PROJECT-3': (90, 90),
+            }
+        )
+
+    def test_empty(self):
+        table = EntryTable()
+
+        self.assertEqual(table.sum_minutes(), 0)
+        self.assertEqual(table.group_by_day(), {})
+        self.assertEqual(table.group_by_ticket(), {})
+
+
+@skipUnless(entry_table.numpy, 'NumPy is not available')
+class TestEntryTableNumpy(TestEntryTable):
+    """Counting using NumPy."""
+
+    numpy = entry_table.numpy
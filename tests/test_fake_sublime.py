@@ -0,0 +1,144 @@
+import time
+from datetime import date
+from unittest import TestCase
+
+from timesheets.core import iter_timesheet_info
+from timesheets.tests import fake_sublime
+from timesheets.tests.fake_sublime import Edit, Region, ViewEventListener
+from timesheets.tests.fake_sublime import Window
+
+
+class TestFakeView(TestCase):
+    content = (
+        '2018-07-01,10:00,11:00,PROJECT-1,"comment"\n'
+        '\n'
+        '2018-07-02,10:00,     ,PROJECT-2,"in progress"'
+    )
+
+    def setUp(self):
+        self.view = Window().new_file()
+        self.view.run_command('append', {'characters': self.content})
+
+    def test_lines(self):
+        view = self.view
+        self.assertEqual(len(self.content), view.size())
+        self.assertEqual(Region(0, 42), view.line(10))
+        self.assertEqual(Region(43, 43), view.line(43))
+        self.assertEqual(Region(43, 44), view.full_line(43))
+        self.assertEqual(
+            [Region(0, 42), Region(43, 43), Region(44, view.size())],
+            view.lines(Region(5, view.size()))
+        )
+        self.assertEqual('PROJECT-1', view.substr(Region(23, 32)))
+
+    def test_rowcol_and_text_point(self):
+        view = self.view
+        self.assertEqual((0, 0), view.rowcol(0))
+        self.assertEqual((1, 0), view.rowcol(43))
+        self.assertEqual((2, 3), view.rowcol(47))
+        self.assertEqual(47, view.text_point(2, 3))
+        self.assertEqual(view.size(), view.text_point(2, 1000))
+
+    def test_edits_shift_selection_and_regions(self):
+        view = self.view
+        view.sel().clear()
+        view.sel().add(Region(view.size()))
+        view.add_regions('key', [Region(44, 54), Region(0, 10)])
+        change_count = view.change_count()
+
+        view.insert(Edit(), 0, '# first\n')
+        self.assertEqual([Region(view.size())], list(view.sel()))
+        self.assertEqual(
+            [Region(8, 18), Region(52, 62)],
+            view.get_regions('key')
+        )
+        self.assertEqual((3, 0), view.rowcol(52))
+
+        view.replace(Edit(), Region(0, 7), '#')
+        self.assertEqual('#\n2018', view.substr(Region(0, 6)))
+        view.erase(Edit(), view.full_line(0))
+        self.assertEqual(self.content, view.substr(Region(0, view.size())))
+        self.assertEqual(change_count + 3, view.change_count())
+
+        view.erase_regions('key')
+        self.assertEqual([], view.get_regions('key'))
+
+    def test_insert_command(self):
+        view = self.view
+        view.sel().clear()
+        view.sel().add(Region(0))
+        view.sel().add(Region(43))
+        view.run_command('insert', {'characters': '#'})
+        self.assertEqual([Region(1), Region(45)], list(view.sel()))
+        self.assertEqual(
+            ['#2018-07-01', '#'],
+            [view.substr(view.line(region))[:11] for region in view.sel()]
+        )
+
+    def test_parse_lines(self):
+        """Lines are read from stand-in as from real view."""
+        entries = list(iter_timesheet_info(
+            self.view.substr(line)
+            for line in self.view.lines(Region(0, self.view.size()))
+        ))
+        self.assertEqual(
+            [date(2018, 7, 1), date(2018, 7, 2)],
+            [entry.date for entry in entries]
+        )
+
+    def test_latency(self):
+        view = Window().new_file()
+        view.latency = 0.01
+        start = time.perf_counter()
+        view.size()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.01)
+
+    def test_close_file(self):
+        window = self.view.window()
+        window.run_command('close_file')
+        self.assertFalse(self.view.is_valid())
+        self.assertIsNone(window.active_view())
+
+    def test_load_settings(self):
+        settings = fake_sublime.load_settings('timesheets.sublime-settings')
+        self.assertIsNotNone(settings.get('max_gap_minutes'))
+
+    def test_events(self):
+        """Events are dispatched to listeners, async ones are queued."""
+        # Drop timeouts scheduled by other tests
+        del fake_sublime.timeouts[:]
+        events = []
+
+        class Listener(ViewEventListener):
+            @classmethod
+            def is_applicable(cls, settings):
+                return settings.get('test_events', False)
+
+            def on_activated(self):
+                events.append(('activated', self.view))
+
+            def on_modified_async(self):
+                events.append(('modified_async', self.view))
+
+            def on_close(self):
+                events.append(('close', self.view))
+
+        window = Window()
+        view = window.new_file()
+        view.settings().set('test_events', True)
+        other_view = window.new_file()
+
+        view.run_command('append', {'characters': 'text'})
+        self.assertEqual([], events)
+        fake_sublime.run_timeouts()
+        self.assertEqual([('modified_async', view)], events)
+
+        window.run_command('close_file')
+        self.assertFalse(other_view.is_valid())
+        self.assertEqual(
+            [('modified_async', view), ('activated', view)],
+            events
+        )
+
+        window.run_command('close_file')
+        self.assertEqual(('close', view), events[-1])
@@ -3,7 +3,8 @@ from unittest.mock import patch
 import sublime
 
 from timesheets.tests.base import BasePluginTestCase
-from timesheets.goto_ticket import GotoTicketCommand
+from timesheets.goto_ticket import GotoTicketCommand, forget_ticket_urls
+from timesheets.goto_ticket import plugin_loaded, plugin_unloaded
 
 
 class TestGotoTicket(BasePluginTestCase):
@@ -39,6 +40,46 @@ class TestGotoTicket(BasePluginTestCase):
 
             open_mock.assert_called_once_with(ticket_url)
 
+    def test_ticket_urls_by_prefix(self):
+        """Ticket URL templates are rebuilt when settings are changed."""
+        plugin_loaded()
+        self.addCleanup(plugin_unloaded)
+
+        timesheet_info = self.timesheet_helper.extract_timesheet_info(
+            '2018-07-01,10:00,11:10,OPS-12,"comment"'
+        )
+        self.assertEqual(
+            self.command.generate_ticket_url(timesheet_info),
+            self.settings.get('jira_ticket_url').format('OPS-12')
+        )
+
+        self.settings.set(
+            'ticket_urls',
+            {'OPS-*': 'https://ops.example.com/browse/{}'}
+        )
+        self.addCleanup(self.settings.erase, 'ticket_urls')
+        self.addCleanup(forget_ticket_urls)
+
+        self.assertEqual(
+            self.command.generate_ticket_url(timesheet_info),
+            'https://ops.example.com/browse/OPS-12'
+        )
+
+    def test_invalid_ticket_urls(self):
+        """Setting of wrong type is ignored."""
+        self.settings.set('ticket_urls', ['https://ops.example.com/{}'])
+        self.addCleanup(self.settings.erase, 'ticket_urls')
+        self.addCleanup(forget_ticket_urls)
+        forget_ticket_urls()
+
+        timesheet_info = self.timesheet_helper.extract_timesheet_info(
+            '2018-07-01,10:00,11:10,OPS-12,"comment"'
+        )
+        self.assertEqual(
+            self.command.generate_ticket_url(timesheet_info),
+            self.settings.get('jira_ticket_url').format('OPS-12')
+        )
+
 
 class TestIsVisibleAndCommand(BasePluginTestCase):
     def setUp(self):
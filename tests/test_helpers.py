@@ -1,7 +1,72 @@
+from datetime import date
+
 from timesheets.tests.base import BasePluginTestCase
 from timesheets.helpers import prettify_minutes
+from timesheets.helpers import TimesheetEntry, TimesheetLineParser
 
 
 class TestTimesheetHelper(BasePluginTestCase):
     def test_prettify_minutes(self):
         self.assertEqual('01:05', prettify_minutes(65))
+
+
+class TestTimesheetLineParser(BasePluginTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.parser = TimesheetLineParser()
+
+    def test_canonical(self):
+        self.assertEqual(
+            self.parser.parse('2018-07-01,10:00,12:10,PROJECT-123,comment'),
+            TimesheetEntry(
+                date(2018, 7, 1).toordinal(),
+                10 * 60,
+                12 * 60 + 10,
+                'PROJECT-123',
+                'comment'
+            )
+        )
+
+    def test_canonical_empty_time_to(self):
+        self.assertEqual(
+            self.parser.parse('2018-07-01,10:00,     ,PROJECT-123,comment'),
+            TimesheetEntry(
+                date(2018, 7, 1).toordinal(), 10 * 60, None, 'PROJECT-123',
+                'comment'
+            )
+        )
+
+    def test_invalid(self):
+        """Lines with invalid fields, dates or times aren't parsed."""
+        for line in [
+            '',
+            '# comment',
+            '2018-07-01,10:00,12:10,,comment',
+            '2018-07-01,10:00,12:10,PROJECT 123,comment',
+            '2018-07-01,10:00,12:10,PROJECT-123',
+            '2018-02-30,10:00,12:10,PROJECT-123,comment',
+            '2018-13-01,10:00,12:10,PROJECT-123,comment',
+            '2018-07-01,10:00,24:00,PROJECT-123,comment',
+            '2018-07-01,10:60,12:10,PROJECT-123,comment',
+            '2018-07-01,10:00,12 10,PROJECT-123,comment',
+            '2018-07-01,10:00,1a:10,PROJECT-123,comment',
+            '2018-07-01 10:00 12:10 PROJECT-123 comment',
+        ]:
+            self.assertIsNone(self.parser.parse(line), line)
+
+    def test_non_canonical(self):
+        """Lines with non-canonical time_to are parsed too."""
+        for line in [
+            '2018-07-01,10:00,,PROJECT-123,comment',
+            '2018-07-01,10:00,\t,PROJECT-123,comment',
+            '2018-07-01,10:00,        ,PROJECT-123,comment',
+        ]:
+            self.assertEqual(
+                self.parser.parse(line),
+                TimesheetEntry(
+                    date(2018, 7, 1).toordinal(), 10 * 60, None, 'PROJECT-123',
+                    'comment'
+                ),
+                line
+            )
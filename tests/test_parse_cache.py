@@ -0,0 +1,166 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from timesheets.core import timesheet_line_parser
+from timesheets.parse_cache import get_cache_file_path
+from timesheets.parse_cache import load_parse_cache, save_parse_cache
+
+
+class TestParseCache(TestCase):
+    content = (
+        '2018-07-01,10:00,11:00,PROJECT-1,"comment"\n'
+        '# comment\n'
+        '\n'
+        '2018-07-02,10:00,10:30,PROJECT-2,"комментарий"\n'
+        '2018-07-02,10:30,     ,PROJECT-1,"in progress"\n'
+    )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'timesheet.txt')
+        self.cache_file = get_cache_file_path(
+            os.path.join(self.directory, 'cache'),
+            self.path
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, content: str, mode: str='w'):
+        with open(self.path, mode, encoding='utf-8') as f:
+            f.write(content)
+
+    def parse(self, lines):
+        return [timesheet_line_parser.parse(line) for line in lines]
+
+    def save(self, content: str):
+        self.write(content)
+        lines = content.split('\n')
+        save_parse_cache(self.cache_file, self.path, lines, self.parse(lines))
+
+    def test_load(self):
+        """Cached lines are the same as parsed lines."""
+        self.save(self.content)
+
+        lines = self.content.split('\n')
+        entries = load_parse_cache(self.cache_file, self.path, lines)
+
+        self.assertEqual(entries, self.parse(lines[:-1]))
+        self.assertIsNone(entries[1])
+        self.assertIsNone(entries[4].to_minutes)
+
+    def test_load_appended(self):
+        """Cache is used if lines are appended to file."""
+        self.save(self.content)
+
+        appended = '2018-07-03,10:00,11:00,PROJECT-3,"comment"\n'
+        self.write(appended, 'a')
+
+        lines = (self.content + appended).split('\n')
+        entries = load_parse_cache(self.cache_file, self.path, lines)
+
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(entries, self.parse(lines[:5]))
+
+    def test_last_line_not_cached(self):
+        """Last line without newline character could change, so isn't saved."""
+        content = self.content + '2018-07-03,10:00,11'
+        self.save(content)
+
+        entries = load_parse_cache(
+            self.cache_file,
+            self.path,
+            content.split('\n')
+        )
+
+        self.assertEqual(len(entries), 5)
+
+    def test_changed(self):
+        """Cache isn't used if cached lines are changed."""
+        self.save(self.content)
+
+        content = self.content.replace('10:00,11:00', '10:00,12:00') + '\n'
+        self.write(content)
+
+        self.assertEqual(
+            load_parse_cache(self.cache_file, self.path, content.split('\n')),
+            []
+        )
+
+    def test_changed_far_from_end(self):
+        """
+        Cache isn't used if lines far from the end are changed in place
+        and lines are appended.
+        """
+        content = self.content * 100
+        self.save(content)
+
+        content = content.replace('10:00,11:00', '10:00,12:00', 1) + \
+            '2018-07-03,10:00,11:00,PROJECT-3,"comment"\n'
+        self.write(content)
+
+        self.assertEqual(
+            load_parse_cache(self.cache_file, self.path, content.split('\n')),
+            []
+        )
+
+    def test_changed_in_place(self):
+        """
+        Cached lines changed without change of their length are found
+        only if all lines are checked, e.g. for unsaved content.
+        """
+        content = self.content * 100
+        self.save(content)
+
+        lines = content.replace('10:00,11:00', '11:00,11:00', 1).split('\n')
+
+        self.assertEqual(
+            load_parse_cache(self.cache_file, self.path, lines, True),
+            []
+        )
+        self.assertEqual(
+            len(load_parse_cache(self.cache_file, self.path, lines)),
+            len(lines) - 1
+        )
+
+    def test_truncated(self):
+        """Cache isn't used if file becomes shorter."""
+        self.save(self.content)
+
+        content = self.content.split('\n', 1)[1]
+        self.write(content)
+
+        self.assertEqual(
+            load_parse_cache(self.cache_file, self.path, content.split('\n')),
+            []
+        )
+
+    def test_no_cache(self):
+        self.write(self.content)
+
+        self.assertEqual(
+            load_parse_cache(
+                self.cache_file,
+                self.path,
+                self.content.split('\n')
+            ),
+            []
+        )
+
+    def test_broken_cache(self):
+        """Broken cache file is ignored."""
+        self.save(self.content)
+
+        with open(self.cache_file, 'r+b') as f:
+            f.truncate(os.path.getsize(self.cache_file) - 10)
+
+        self.assertEqual(
+            load_parse_cache(
+                self.cache_file,
+                self.path,
+                self.content.split('\n')
+            ),
+            []
+        )
@@ -0,0 +1,104 @@
+import os
+import pstats
+import shutil
+import tempfile
+from unittest import TestCase
+
+from timesheets import profiling
+from timesheets.profiling import count_lines, profiled
+
+
+@profiled
+def scan(lines: int):
+    count_lines(lines)
+    return lines
+
+
+@profiled
+def scan_twice(lines: int):
+    scan(lines)
+    scan(lines)
+    count_lines(1)
+
+
+class TestProfiling(TestCase):
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled(self):
+        """Nothing is measured while measurement is disabled."""
+        self.assertEqual(3, scan(3))
+        self.assertEqual({}, profiling.stats)
+
+    def test_calls_and_lines(self):
+        """Lines of nested calls are counted by outer calls too."""
+        profiling.enable()
+        scan_twice(10)
+
+        inner = profiling.stats[scan.__qualname__]
+        outer = profiling.stats[scan_twice.__qualname__]
+
+        self.assertEqual(2, inner.calls)
+        self.assertEqual(20, inner.lines)
+        self.assertEqual(1, outer.calls)
+        self.assertEqual(21, outer.lines)
+        self.assertEqual(2, sum(inner.histogram))
+        self.assertGreaterEqual(outer.total_time, inner.max_time)
+
+    def test_histogram(self):
+        call_stats = profiling.CallStats()
+        for seconds in [0.0005, 0.005, 0.002, 0.5, 2]:
+            call_stats.add_call(seconds, 0)
+
+        self.assertEqual([1, 2, 0, 1, 1], call_stats.histogram)
+        self.assertEqual(5, call_stats.calls)
+        self.assertEqual(2, call_stats.max_time)
+
+    def test_exception(self):
+        """Failed calls are measured too."""
+        @profiled
+        def fail():
+            count_lines(1)
+            raise ValueError
+
+        profiling.enable()
+        with self.assertRaises(ValueError):
+            fail()
+        scan(1)
+
+        self.assertEqual(1, profiling.stats[fail.__qualname__].calls)
+        self.assertEqual(1, profiling.stats[scan.__qualname__].lines)
+
+    def test_format_stats(self):
+        profiling.enable()
+        scan(5)
+
+        lines = profiling.format_stats().splitlines()
+
+        self.assertEqual(
+            ['Function', 'Calls', 'Total', 'ms', 'Mean', 'ms', 'Max', 'ms',
+             'Lines', '<1ms', '<10ms', '<100ms', '<1000ms', '>=1000ms'],
+            lines[0].split()
+        )
+        self.assertEqual(['scan', '1'], lines[1].split()[:2])
+        self.assertEqual('5', lines[1].split()[5])
+
+    def test_dump_cprofile(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'profile.pstats')
+
+        profiling.enable()
+        scan(1)
+        self.assertFalse(profiling.dump_cprofile(path))
+
+        profiling.enable(with_cprofile=True)
+        scan(1)
+        self.assertTrue(profiling.dump_cprofile(path))
+
+        functions = [
+            function_name
+            for _, _, function_name in pstats.Stats(path).stats
+        ]
+        self.assertIn('scan', functions)
@@ -0,0 +1,180 @@
+from datetime import date, datetime
+from unittest import TestCase
+
+from timesheets.core import TimesheetEntry, group_by_date
+from timesheets.core import timesheet_line_parser
+from timesheets.recurrence import RecurrenceRule, format_block
+from timesheets.recurrence import get_insert_blocks, get_missing_entries
+
+
+def ordinal(day: str) -> int:
+    return datetime.strptime(day, '%Y-%m-%d').toordinal()
+
+
+def lines_by_date(lines):
+    return group_by_date(
+        (row, entry)
+        for row, entry in enumerate(map(timesheet_line_parser.parse, lines))
+        if entry
+    )
+
+
+class TestRecurrenceRule(TestCase):
+    def test_from_settings(self):
+        rule = RecurrenceRule.from_settings({
+            'ticket': 'PROJECT-1',
+            'comment': 'stand-up',
+            'time_from': '10:00',
+            'minutes': 15,
+            'days': ['mo', 'TH'],
+        })
+
+        # 2018-07-02 is monday
+        self.assertEqual(
+            [entry.to_line() for entry in rule.iter_entries(
+                ordinal('2018-07-01'),
+                ordinal('2018-07-10')
+            )],
+            [
+                '2018-07-02,10:00,10:15,PROJECT-1,"stand-up"',
+                '2018-07-05,10:00,10:15,PROJECT-1,"stand-up"',
+                '2018-07-09,10:00,10:15,PROJECT-1,"stand-up"',
+            ]
+        )
+
+    def test_interval(self):
+        """Every second week, counted from week of start date."""
+        rule = RecurrenceRule.from_settings({
+            'ticket': 'PROJECT-1',
+            'time_from': '16:00',
+            'minutes': 60,
+            'days': ['FR'],
+            'interval': 2,
+            'start': '2018-07-04',
+        })
+
+        self.assertEqual(
+            [entry.date for entry in rule.iter_entries(
+                ordinal('2018-06-01'),
+                ordinal('2018-08-01')
+            )],
+            [date(2018, 7, 6), date(2018, 7, 20)]
+        )
+
+    def test_invalid(self):
+        valid_rule = {
+            'ticket': 'PROJECT-1',
+            'time_from': '10:00',
+            'minutes': 15,
+        }
+        for changes in [
+            {'time_from': None},
+            {'minutes': None},
+            {'time_from': '25:00'},
+            {'minutes': 0},
+            {'time_from': '23:50'},
+            {'days': ['XX']},
+            {'interval': 0},
+            {'ticket': None},
+            {'ticket': ''},
+            {'ticket': 'PROJECT 1'},
+            {'ticket': 1},
+            {'comment': 1},
+            {'comment': 'two\nlines'},
+        ]:
+            rule = dict(valid_rule, **changes)
+            for key, value in changes.items():
+                if value is None:
+                    del rule[key]
+
+            with self.assertRaises(ValueError):
+                RecurrenceRule.from_settings(rule)
+
+        RecurrenceRule.from_settings(valid_rule)
+
+
+class TestBackfill(TestCase):
+    rules = [
+        RecurrenceRule('PROJECT-1', '"stand-up"', 10 * 60, 15),
+        RecurrenceRule('PROJECT-2', '"retro"', 15 * 60, 60, [2]),
+    ]
+
+    def test_missing_entries(self):
+        """
+        Existing occurrences and occurrences after now are skipped.
+        """
+        entries = get_missing_entries(
+            self.rules,
+            ordinal('2018-07-02'),
+            ordinal('2018-07-09'),
+            lines_by_date([
+                '2018-07-02,10:00,10:30,PROJECT-1,"longer stand-up"',
+                '2018-07-03,10:00,10:15,PROJECT-3,"other"',
+            ]),
+            datetime(2018, 7, 4, 14, 0)
+        )
+
+        self.assertEqual([entry.to_line() for entry in entries], [
+            '2018-07-03,10:00,10:15,PROJECT-1,"stand-up"',
+            '2018-07-04,10:00,10:15,PROJECT-1,"stand-up"',
+        ])
+
+    def test_insert_blocks(self):
+        timesheet_lines = [
+            '2018-07-02,09:00,10:00,PROJECT-3,"comment"',
+            '2018-07-02,10:15,11:00,PROJECT-3,"comment"',
+            '',
+            '2018-07-04,11:00,12:00,PROJECT-3,"comment"',
+        ]
+        entries = [
+            TimesheetEntry(ordinal(day), 600, 615, 'PROJECT-1', '')
+            for day in ['2018-07-01', '2018-07-02', '2018-07-03',
+                        '2018-07-04', '2018-07-05']
+        ]
+
+        blocks = get_insert_blocks(entries, lines_by_date(timesheet_lines))
+
+        self.assertEqual(
+            [
+                (row, date_ordinal, after, len(block_entries))
+                for row, date_ordinal, after, block_entries in blocks
+            ],
+            [
+                (0, ordinal('2018-07-02'), False, 1),
+                (0, ordinal('2018-07-02'), True, 1),
+                (1, ordinal('2018-07-02'), True, 1),
+                (3, ordinal('2018-07-04'), False, 1),
+                (3, ordinal('2018-07-04'), True, 1),
+            ]
+        )
+
+    def test_insert_blocks_empty(self):
+        entries = [TimesheetEntry(1, 600, 615, 'PROJECT-1', '')]
+        self.assertEqual(
+            get_insert_blocks(entries, {}),
+            [(None, None, True, entries)]
+        )
+
+    def test_format_block(self):
+        entries = [
+            TimesheetEntry(ordinal('2018-07-02'), 600, 615, 'PROJECT-1', ''),
+            TimesheetEntry(ordinal('2018-07-03'), 600, 615, 'PROJECT-1', ''),
+        ]
+
+        self.assertEqual(
+            format_block(entries, ordinal('2018-07-02'), True),
+            '\n2018-07-02,10:00,10:15,PROJECT-1,'
+            '\n'
+            '\n2018-07-03,10:00,10:15,PROJECT-1,'
+        )
+        self.assertEqual(
+            format_block(entries, ordinal('2018-07-03'), False),
+            '2018-07-02,10:00,10:15,PROJECT-1,\n'
+            '\n'
+            '2018-07-03,10:00,10:15,PROJECT-1,\n'
+        )
+        self.assertEqual(
+            format_block(entries[:1], ordinal('2018-07-03'), False),
+            '2018-07-02,10:00,10:15,PROJECT-1,\n'
+            '\n'
+        )
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import sublime
 
 from timesheets.tests.base import BasePluginTestCase
@@ -43,3 +45,85 @@ class TestSublimeHelper(BasePluginTestCase):
             self.sublime_helper.get_current_line_content(),
             'current line'
         )
+
+    def test_iter_lines_not_bulk(self):
+        lines = ['line 1', '', 'line 2', ' ']
+        self.append_text('\n'.join(lines))
+
+        self.assertEqual(
+            list(self.sublime_helper.iter_lines(bulk=False)),
+            lines
+        )
+        self.assertEqual(
+            list(self.sublime_helper.iter_lines_reversed(bulk=False)),
+            list(reversed(lines))
+        )
+        self.assertEqual(
+            list(self.sublime_helper.iter_lines_regions_reversed(bulk=False)),
+            list(self.sublime_helper.iter_lines_regions_reversed())
+        )
+
+    def test_iter_lines_bulk_same_as_not_bulk(self):
+        """Bulk mode gives same lines as line by line mode."""
+        for text in ['', '\n', 'line 1', 'line 1\n', 'line 1\n\n', '\nline 2']:
+            self.view.run_command('select_all')
+            self.append_text(text)
+
+            for method in [
+                self.sublime_helper.iter_lines,
+                self.sublime_helper.iter_lines_reversed,
+                self.sublime_helper.iter_lines_regions_reversed,
+            ]:
+                self.assertEqual(
+                    list(method()),
+                    list(method(bulk=False)),
+                    (method, text)
+                )
+
+    def test_iter_lines_with_offsets_chunks(self):
+        """Lines split between chunks are joined."""
+        lines = ['line 1', '', 'line 22', 'line 333', '']
+        self.append_text('\n'.join(lines))
+
+        expected = []
+        offset = 0
+        for line in lines[:-1]:
+            expected.append((offset, line))
+            offset += len(line) + 1
+
+        for chunk_size in range(1, 12):
+            self.sublime_helper.chunk_size = chunk_size
+            self.assertEqual(
+                list(self.sublime_helper.iter_lines_with_offsets()),
+                expected
+            )
+
+    def test_iter_lines_with_regions_reversed_chunks(self):
+        """Lines split between chunks are joined."""
+        lines = ['', 'line 1', '', 'line 22', 'line 333', '']
+        self.append_text('\n'.join(lines))
+
+        expected = list(zip(
+            self.sublime_helper.iter_lines_regions_reversed(bulk=False),
+            reversed(lines)
+        ))
+
+        for chunk_size in range(1, 12):
+            self.sublime_helper.chunk_size = chunk_size
+            self.assertEqual(
+                list(self.sublime_helper.iter_lines_with_regions_reversed()),
+                expected
+            )
+
+    def test_iter_lines_reversed_reads_only_consumed_chunks(self):
+        self.append_text('\n'.join(['line'] * 1000))
+        self.sublime_helper.chunk_size = 100
+
+        with patch.object(self.view, 'substr', wraps=self.view.substr) as \
+                substr_mock:
+            for line in self.sublime_helper.iter_lines_reversed():
+                break
+
+        substr_mock.assert_called_once_with(
+            sublime.Region(self.view.size() - 100, self.view.size())
+        )
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from timesheets.ticket_urls import TicketUrls
+
+
+class TestTicketUrls(TestCase):
+    def setUp(self):
+        self.ticket_urls = TicketUrls(
+            {
+                'OPS-*': 'https://ops.example.com/browse/{}',
+                'OPS-SECURITY-*': 'https://security.example.com/{}',
+                'PROJECT-1': 'https://old.example.com/browse/{}',
+                'BROKEN-*': 'https://broken.example.com/browse/',
+            },
+            'https://jira.example.com/browse/{}'
+        )
+
+    def test_get_url(self):
+        """Template of the most specific pattern is used."""
+        for ticket, url in [
+            ('OPS-1', 'https://ops.example.com/browse/OPS-1'),
+            ('OPS-SECURITY-2', 'https://security.example.com/OPS-SECURITY-2'),
+            ('PROJECT-1', 'https://old.example.com/browse/PROJECT-1'),
+            ('PROJECT-12', 'https://jira.example.com/browse/PROJECT-12'),
+            ('XOPS-1', 'https://jira.example.com/browse/XOPS-1'),
+        ]:
+            self.assertEqual(self.ticket_urls.get_url(ticket), url)
+
+    def test_invalid_template(self):
+        """Error names option which template is invalid."""
+        with self.assertRaisesRegex(ValueError, 'ticket_urls: BROKEN-\\*'):
+            self.ticket_urls.get_url('BROKEN-1')
+
+        for template in [
+            None, '', 'https://example.com/', '{0} {1}', '{0.x}', '{:d}', 42
+        ]:
+            with self.assertRaisesRegex(ValueError, 'jira_ticket_url'):
+                TicketUrls({}, template).get_url('PROJECT-1')
+
+    def test_many_patterns(self):
+        ticket_urls = TicketUrls({
+            'P{}-*'.format(number): 'https://{}.example.com/{{}}'.format(
+                number
+            )
+            for number in range(1000)
+        })
+
+        self.assertEqual(
+            ticket_urls.get_url('P123-4'),
+            'https://123.example.com/P123-4'
+        )
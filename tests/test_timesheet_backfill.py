@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+from freezegun import freeze_time
+
+from timesheets.recurrence import RecurrenceRule
+from timesheets.tests.base import BasePluginTestCase
+from timesheets.timesheet_backfill import TimesheetBackfillCommand
+from timesheets.timesheet_index import TimesheetIndex
+
+
+# 2018-07-04 is wednesday
+@freeze_time('2018-07-04 12:00')
+class TestTimesheetBackfill(BasePluginTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.command = TimesheetBackfillCommand(self.view)
+
+        rules = [
+            RecurrenceRule.from_settings({
+                'ticket': 'PROJECT-1',
+                'comment': 'stand-up',
+                'time_from': '10:00',
+                'minutes': 15,
+            }),
+        ]
+        patcher = patch.object(
+            TimesheetBackfillCommand,
+            'get_rules',
+            return_value=rules
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        TimesheetIndex.forget(self.view)
+
+        super().tearDown()
+
+    def test_backfill(self):
+        """
+        Missing occurrences of this week till now are inserted
+        in chronological places, existing ones are skipped.
+        """
+        self.append_text(
+            '2018-07-02,09:00,10:00,PROJECT-2,"comment"\n'
+            '2018-07-02,10:15,11:00,PROJECT-2,"comment"\n'
+            '\n'
+            '2018-07-03,10:00,10:15,PROJECT-1,"stand-up"\n'
+            '\n'
+            '2018-07-04,11:00,     ,PROJECT-2,"comment"\n'
+        )
+
+        self.view.run_command('timesheet_backfill')
+
+        self.assertEqual(
+            self.get_text(),
+            '2018-07-02,09:00,10:00,PROJECT-2,"comment"\n'
+            '2018-07-02,10:00,10:15,PROJECT-1,"stand-up"\n'
+            '2018-07-02,10:15,11:00,PROJECT-2,"comment"\n'
+            '\n'
+            '2018-07-03,10:00,10:15,PROJECT-1,"stand-up"\n'
+            '\n'
+            '2018-07-04,10:00,10:15,PROJECT-1,"stand-up"\n'
+            '2018-07-04,11:00,     ,PROJECT-2,"comment"\n'
+        )
+
+        # Nothing is missing anymore
+        self.view.run_command('timesheet_backfill')
+        self.assertEqual(self.get_text().count('stand-up'), 3)
+
+    def test_backfill_empty(self):
+        self.view.run_command('timesheet_backfill')
+
+        self.assertEqual(
+            self.get_text(),
+            '2018-07-02,10:00,10:15,PROJECT-1,"stand-up"\n'
+            '\n'
+            '2018-07-03,10:00,10:15,PROJECT-1,"stand-up"\n'
+            '\n'
+            '2018-07-04,10:00,10:15,PROJECT-1,"stand-up"'
+        )
@@ -0,0 +1,141 @@
+from datetime import date
+from unittest.mock import patch
+
+import sublime
+
+from timesheets.core import check_day
+from timesheets.tests.base import BasePluginTestCase
+from timesheets.timesheet_checker import TimesheetChecker
+from timesheets.timesheet_index import TimesheetIndex
+
+
+class TestTimesheetChecker(BasePluginTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.append_text(
+            '2018-07-09,10:00,11:00,PROJECT-1,"comment"\n'
+            '2018-07-09,10:30,11:30,PROJECT-2,"overlap"\n'
+            '2018-07-10,10:00,11:00,PROJECT-1,"comment"\n'
+            '2018-07-10,11:00,11:30,PROJECT-2,"comment"\n'
+        )
+
+        self.checker = TimesheetChecker(self.view)
+
+    def tearDown(self):
+        TimesheetIndex.forget(self.view)
+
+        super().tearDown()
+
+    def get_regions(self, day: date):
+        return self.view.get_regions(
+            self.checker.get_region_key(day.toordinal())
+        )
+
+    def test_check(self):
+        self.checker.check()
+
+        self.assertEqual(
+            self.get_regions(date(2018, 7, 9)),
+            [self.view.line(self.view.text_point(1, 0))]
+        )
+        self.assertEqual(self.get_regions(date(2018, 7, 10)), [])
+
+    def test_check_changed_days(self):
+        """Only days with changed lines are checked again."""
+        self.checker.check()
+
+        # Make second line of 2018-07-10 overlap
+        self.view.run_command('select_all')
+        self.append_text(
+            '2018-07-09,10:00,11:00,PROJECT-1,"comment"\n'
+            '2018-07-09,10:30,11:30,PROJECT-2,"overlap"\n'
+            '2018-07-10,10:00,11:00,PROJECT-1,"comment"\n'
+            '2018-07-10,10:50,11:30,PROJECT-2,"comment"\n'
+        )
+
+        with patch(
+            'timesheets.timesheet_checker.check_day',
+            side_effect=check_day
+        ) as check_day_mock:
+            self.checker.check()
+
+        self.assertEqual(check_day_mock.call_count, 1)
+        self.assertEqual(
+            self.get_regions(date(2018, 7, 10)),
+            [self.view.line(self.view.text_point(3, 0))]
+        )
+        self.assertEqual(len(self.get_regions(date(2018, 7, 9))), 1)
+
+    def test_problems_of_line(self):
+        self.assertEqual(
+            self.checker.get_problems(1),
+            ['overlaps with other line till 11:00']
+        )
+        self.assertEqual(self.checker.get_problems(2), [])
+
+    def test_check_scheduled(self):
+        """Only latest check scheduled after modifications is done."""
+        with patch('timesheets.timesheet_checker.sublime.set_timeout_async') \
+                as set_timeout_mock:
+            self.checker.on_modified_async()
+            self.checker.on_modified_async()
+
+        (first_check, _), (second_check, _) = [
+            call_args
+            for call_args, _ in set_timeout_mock.call_args_list
+        ]
+
+        first_check()
+        self.assertEqual(self.get_regions(date(2018, 7, 9)), [])
+
+        second_check()
+        self.assertEqual(len(self.get_regions(date(2018, 7, 9))), 1)
+
+    def test_max_gap_minutes(self):
+        """Invalid setting is reported, gaps aren't checked then."""
+        for value, expected in [
+            (None, 0),
+            (30, 30),
+            ('45', 45),
+            (-10, 0),
+            ('hour', 0),
+            ([60], 0),
+        ]:
+            settings = {} if value is None else {'max_gap_minutes': value}
+            with patch(
+                'timesheets.timesheet_checker.sublime.load_settings',
+                return_value=settings
+            ), patch('builtins.print') as print_mock:
+                self.assertEqual(
+                    self.checker.get_max_gap_minutes(),
+                    expected,
+                    value
+                )
+
+            self.assertEqual(
+                print_mock.called,
+                value is not None and expected == 0,
+                value
+            )
+
+    def test_hover(self):
+        """
+        Problems are shown over underlined line,
+        view that isn't timesheet isn't parsed.
+        """
+        point = self.view.text_point(1, 0)
+
+        with patch.object(self.view, 'show_popup') as show_popup_mock:
+            self.checker.on_hover(point, sublime.HOVER_TEXT)
+
+        self.assertIn('overlaps', show_popup_mock.call_args[0][0])
+
+        with patch.object(
+            self.checker.timesheet_helper,
+            'detect_is_timesheet',
+            return_value=False
+        ), patch.object(self.checker.index, 'update') as update_mock:
+            self.checker.on_hover(point, sublime.HOVER_TEXT)
+
+        update_mock.assert_not_called()
@@ -1,8 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from freezegun import freeze_time
 
 from timesheets.tests.base import BasePluginTestCase
+from timesheets.helpers import TimesheetEntry, TimesheetHelper
+from timesheets.timesheet_index import TimesheetIndex
 
 
 class TestTimesheetHelper(BasePluginTestCase):
@@ -64,48 +66,70 @@ class TestExtractTimesheetInfo(BasePluginTestCase):
         self.assertEqual(
             self.timesheet_helper.extract_timesheet_info(
                 '2018-07-01,10:00,12:10,PROJECT-123,"comment"'
-            ), {
-                'from_dt': datetime(2018, 7, 1, 10, 0),
-                'to_dt': datetime(2018, 7, 1, 12, 10),
-                'issue': ('jira', 'PROJECT-123'),
-                'comment': '"comment"',
-            }
+            ),
+            TimesheetEntry(
+                date(2018, 7, 1).toordinal(),
+                10 * 60,
+                12 * 60 + 10,
+                'PROJECT-123',
+                '"comment"'
+            )
         )
 
     def test_jira_no_quotes(self):
         self.assertEqual(
             self.timesheet_helper.extract_timesheet_info(
                 '2018-07-01,10:00,12:10,PROJECT-123,comment'
-            ), {
-                'from_dt': datetime(2018, 7, 1, 10, 0),
-                'to_dt': datetime(2018, 7, 1, 12, 10),
-                'issue': ('jira', 'PROJECT-123'),
-                'comment': 'comment',
-            }
+            ),
+            TimesheetEntry(
+                date(2018, 7, 1).toordinal(),
+                10 * 60,
+                12 * 60 + 10,
+                'PROJECT-123',
+                'comment'
+            )
         )
 
     def test_jira_empty_time_to(self):
         self.assertEqual(
             self.timesheet_helper.extract_timesheet_info(
                 '2018-07-01,10:00,,PROJECT-123,"comment"'
-            ), {
-                'from_dt': datetime(2018, 7, 1, 10, 0),
-                'to_dt': None,
-                'issue': ('jira', 'PROJECT-123'),
-                'comment': '"comment"',
-            }
+            ),
+            TimesheetEntry(
+                date(2018, 7, 1).toordinal(),
+                10 * 60,
+                None,
+                'PROJECT-123',
+                '"comment"'
+            )
         )
 
         self.assertEqual(
             self.timesheet_helper.extract_timesheet_info(
                 '2018-07-01,10:00,     ,PROJECT-123,"comment"'
-            ), {
-                'from_dt': datetime(2018, 7, 1, 10, 0),
-                'to_dt': None,
-                'issue': ('jira', 'PROJECT-123'),
-                'comment': '"comment"',
-            }
+            ),
+            TimesheetEntry(
+                date(2018, 7, 1).toordinal(),
+                10 * 60,
+                None,
+                'PROJECT-123',
+                '"comment"'
+            )
+        )
+
+    def test_datetime_properties(self):
+        timesheet_info = self.timesheet_helper.extract_timesheet_info(
+            '2018-07-01,10:00,12:10,PROJECT-123,"comment"'
+        )
+        self.assertEqual(timesheet_info.date, date(2018, 7, 1))
+        self.assertEqual(timesheet_info.from_dt, datetime(2018, 7, 1, 10, 0))
+        self.assertEqual(timesheet_info.to_dt, datetime(2018, 7, 1, 12, 10))
+        self.assertEqual(timesheet_info.issue, ('jira', 'PROJECT-123'))
+
+        timesheet_info = self.timesheet_helper.extract_timesheet_info(
+            '2018-07-01,10:00,     ,PROJECT-123,"comment"'
         )
+        self.assertIsNone(timesheet_info.to_dt)
 
 
 class TestIsTimesheet(BasePluginTestCase):
@@ -154,6 +178,64 @@ class TestIsTimesheet(BasePluginTestCase):
         self.assertTrue(self.timesheet_helper.is_timesheet())
 
 
+class TestDetectIsTimesheet(BasePluginTestCase):
+    def test_cached(self):
+        self.append_text('# comment\n')
+        self.assertFalse(self.timesheet_helper.detect_is_timesheet())
+
+        # Small modification doesn't trigger detection
+        self.append_text(self.get_valid_line())
+        self.assertFalse(self.timesheet_helper.detect_is_timesheet())
+
+    def test_detected_again_after_big_modification(self):
+        self.append_text('# comment\n')
+        self.assertFalse(self.timesheet_helper.detect_is_timesheet())
+
+        self.append_text('\n'.join([self.get_valid_line()] * 10))
+        self.assertTrue(self.timesheet_helper.detect_is_timesheet())
+
+    def test_detected_again_after_syntax_change(self):
+        self.append_text('# comment\n')
+        self.assertFalse(self.timesheet_helper.detect_is_timesheet())
+
+        self.append_text(self.get_valid_line())
+        self.view.settings().set(
+            'syntax',
+            'Packages/timesheets/syntax/timesheet.sublime-syntax'
+        )
+        self.assertTrue(self.timesheet_helper.detect_is_timesheet())
+
+
+class TestTimesheetInfoUnderCursor(BasePluginTestCase):
+    def test_cached(self):
+        self.append_text('{}\n{}'.format(
+            self.get_valid_line(),
+            self.get_invalid_line()
+        ))
+
+        self.move_cursor(0, 0)
+        timesheet_info = \
+            self.timesheet_helper.get_timesheet_info_under_cursor()
+        self.assertTrue(timesheet_info)
+        self.assertIs(
+            self.timesheet_helper.get_timesheet_info_under_cursor(),
+            timesheet_info
+        )
+
+        # Cursor is moved
+        self.move_cursor(1, 0)
+        self.assertIsNone(
+            self.timesheet_helper.get_timesheet_info_under_cursor()
+        )
+
+        # View is modified
+        self.move_cursor(0, 0)
+        self.append_text('# ')
+        self.assertIsNone(
+            self.timesheet_helper.get_timesheet_info_under_cursor()
+        )
+
+
 @freeze_time('2018-07-01 12:00')
 class TestWorkedToday(BasePluginTestCase):
     def test_single_line(self):
@@ -193,3 +275,103 @@ class TestWorkedThisWeek(BasePluginTestCase):
             '2018-07-10,10:00,11:10,PROJECT-123,"comment"\n'
         )
         self.assertEqual(self.timesheet_helper.worked_week_minutes(), 70 + 70)
+
+    def test_back_dated_line(self):
+        """
+        If index of view is loaded, lines are counted regardless
+        of their order. Otherwise lines are read from the end of view
+        until first line of week before.
+        """
+        self.append_text(
+            '2018-07-10,10:00,11:10,PROJECT-123,"comment"\n'
+            '2018-07-08,10:00,11:10,PROJECT-123,"comment"\n'
+            '2018-07-09,10:00,11:10,PROJECT-123,"back-dated"\n'
+        )
+        index = TimesheetIndex.for_view(self.view)
+        self.addCleanup(TimesheetIndex.forget, self.view)
+        timesheet_helper = TimesheetHelper(self.sublime_helper, index)
+
+        self.assertEqual(timesheet_helper.worked_week_minutes(), 70)
+
+        index.update()
+        self.assertEqual(timesheet_helper.worked_week_minutes(), 70 + 70)
+
+        # Date index is patched by modifications
+        self.append_text('2018-07-09,12:00,12:10,PROJECT-123,"comment"\n')
+        self.assertEqual(
+            timesheet_helper.worked_week_minutes(),
+            70 + 70 + 10
+        )
+
+
+@freeze_time('2018-07-01 12:00')
+class TestTimesheetsInfoToMinutes(BasePluginTestCase):
+    def test_finished_and_unfinished_lines(self):
+        timesheets_info = [
+            self.timesheet_helper.extract_timesheet_info(line)
+            for line in [
+                '2018-06-30,10:00,10:30,PROJECT-123,"comment"',
+                '2018-07-01,10:00,10:10,PROJECT-123,"comment"',
+                '2018-07-01,11:30,     ,PROJECT-123,"comment"',
+            ]
+        ]
+        self.assertEqual(
+            self.timesheet_helper.timesheets_info_to_minutes(timesheets_info),
+            30 + 10 + 30
+        )
+
+
+@freeze_time('2018-07-10 12:00')
+class TestWorkedSummary(BasePluginTestCase):
+    """Today (2018-07-10) is set to tuesday."""
+
+    def setUp(self):
+        super().setUp()
+
+        self.append_text(
+            '2017-12-31,10:00,11:00,PROJECT-123,"comment"\n'
+            '2018-06-30,10:00,11:00,PROJECT-123,"comment"\n'
+            '2018-07-01,10:00,10:10,PROJECT-123,"comment"\n'
+            '# comment\n'
+            '\n'
+            '2018-07-08,10:00,10:20,PROJECT-123,"comment"\n'
+            '2018-07-09,10:00,10:30,PROJECT-123,"comment"\n'
+            '2018-07-10,10:00,10:40,PROJECT-123,"comment"\n'
+            '2018-07-10,11:00,     ,PROJECT-123,"comment"\n'
+        )
+
+    def test_periods(self):
+        summary = self.timesheet_helper.worked_summary(
+            ['today', 'week', 'month', 'year', 3]
+        )
+
+        self.assertEqual(summary['today'], 40 + 60)
+        self.assertEqual(summary['week'], 30 + 40 + 60)
+        self.assertEqual(summary['month'], 10 + 20 + 30 + 40 + 60)
+        self.assertEqual(summary['year'], 60 + 10 + 20 + 30 + 40 + 60)
+        self.assertEqual(summary[3], 20 + 30 + 40 + 60)
+
+    def test_unfinished_till_given_time(self):
+        summary = self.timesheet_helper.worked_summary()
+
+        self.assertTrue(summary.has_unfinished())
+        self.assertEqual(
+            summary.get_minutes('today', datetime(2018, 7, 10, 13, 0)),
+            40 + 120
+        )
+
+    def test_same_as_separate_methods(self):
+        summary = self.timesheet_helper.worked_summary()
+
+        self.assertEqual(
+            summary['today'],
+            self.timesheet_helper.worked_today_minutes()
+        )
+        self.assertEqual(
+            summary['week'],
+            self.timesheet_helper.worked_week_minutes()
+        )
+
+    def test_unknown_period(self):
+        with self.assertRaises(ValueError):
+            self.timesheet_helper.worked_summary(['decade'])
@@ -0,0 +1,343 @@
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest.mock import patch
+
+import sublime
+
+from timesheets.core import group_by_date, timesheet_line_parser
+from timesheets.parse_cache import save_parse_cache
+from timesheets.tests.base import BasePluginTestCase
+from timesheets.timesheet_index import TimesheetIndex
+
+
+class TestTimesheetIndex(BasePluginTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.index = TimesheetIndex.for_view(self.view)
+
+    def tearDown(self):
+        TimesheetIndex.forget(self.view)
+
+        super().tearDown()
+
+    def get_timesheet_lines(self):
+        _, _, entries = self.index.get_lines()
+        return [
+            (
+                self.view.substr(self.index.get_line_region(row)),
+                entries[row].ticket
+            )
+            for row in self.index.timesheet_rows
+        ]
+
+    def test_for_view(self):
+        self.assertIs(TimesheetIndex.for_view(self.view), self.index)
+
+    def test_empty(self):
+        self.assertEqual(self.get_timesheet_lines(), [])
+        self.assertIsNone(self.index.last_timesheet_line())
+        self.assertIsNone(self.index.last_non_empty_line_region())
+
+    def test_timesheet_lines(self):
+        self.append_text(
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '# comment\n'
+            '\n'
+            '2018-07-02,10:00,12:10,PROJECT-2,"comment"\n'
+        )
+
+        self.assertEqual(self.get_timesheet_lines(), [
+            ('2018-07-01,10:00,12:10,PROJECT-1,"comment"', 'PROJECT-1'),
+            ('2018-07-02,10:00,12:10,PROJECT-2,"comment"', 'PROJECT-2'),
+        ])
+
+    def test_last_lines(self):
+        self.append_text(
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '# comment\n'
+            ' \n'
+        )
+
+        line_region, entry = self.index.last_timesheet_line()
+        self.assertEqual(line_region, sublime.Region(0, 42))
+        self.assertEqual(entry.ticket, 'PROJECT-1')
+
+        self.assertEqual(
+            self.index.last_non_empty_line_region(),
+            sublime.Region(43, 52)
+        )
+
+    def test_get_last_lines_cached(self):
+        """Last lines are found once until view is changed."""
+        self.append_text(
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '# comment'
+        )
+
+        last_lines = self.index.get_last_lines()
+        self.assertEqual(last_lines[:2], (
+            sublime.Region(43, 52),
+            sublime.Region(0, 42),
+        ))
+        self.assertEqual(last_lines[2].ticket, 'PROJECT-1')
+        self.assertIs(self.index.get_last_lines(), last_lines)
+
+        self.append_text('\n2018-07-02,10:00,12:10,PROJECT-2,"comment"')
+
+        self.assertEqual(self.index.get_last_lines()[:2], (
+            sublime.Region(53, 95),
+            sublime.Region(53, 95),
+        ))
+
+    def test_patch_changed_lines(self):
+        """After modification only changed lines are parsed again."""
+        self.append_text(
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '2018-07-02,10:00,12:10,PROJECT-2,"comment"\n'
+            '2018-07-03,10:00,12:10,PROJECT-3,"comment"'
+        )
+        self.index.update()
+        entries = list(self.index.entries)
+
+        # Replace middle line with two lines
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(43, 85))
+        self.append_text(
+            '# comment\n'
+            '2018-07-04,10:00,12:10,PROJECT-4,"comment"'
+        )
+
+        self.assertEqual(self.get_timesheet_lines(), [
+            ('2018-07-01,10:00,12:10,PROJECT-1,"comment"', 'PROJECT-1'),
+            ('2018-07-04,10:00,12:10,PROJECT-4,"comment"', 'PROJECT-4'),
+            ('2018-07-03,10:00,12:10,PROJECT-3,"comment"', 'PROJECT-3'),
+        ])
+
+        # Unchanged lines weren't parsed again
+        self.assertIs(self.index.entries[0], entries[0])
+        self.assertIs(self.index.entries[3], entries[2])
+
+        self.assertEqual(self.index.timesheet_rows, [0, 2, 3])
+        self.assertEqual(self.index.non_empty_rows, [0, 1, 2, 3])
+
+    def test_patch_line_ends(self):
+        """
+        Offsets of lines, parsed lines, lines sorted and grouped by date
+        are the same as after parsing of whole view, wherever view
+        is changed.
+        """
+        self.index.compare_block_size = 4
+        self.append_text('\n'.join(
+            '2018-07-{:02},10:00,12:10,PROJECT-{},"comment"'.format(day, day)
+            for day in range(1, 21)
+        ))
+        self.index.update()
+
+        for begin, end, text in [
+            (0, 0, '# first\n'),
+            (200, 300, ''),
+            (400, 401, '\n\n# comment\n'),
+            (self.view.size() - 5, self.view.size(), 'moved"\n'),
+            (0, self.view.size(), ''),
+        ]:
+            self.view.sel().clear()
+            self.view.sel().add(sublime.Region(begin, end))
+            self.append_text(text)
+
+            lines, line_ends, entries = self.index.get_lines()
+            content = self.get_text()
+
+            self.assertEqual(lines, content.split('\n'))
+            self.assertEqual(
+                line_ends,
+                [
+                    self.view.line(self.view.text_point(row, 0)).end()
+                    for row in range(len(lines))
+                ]
+            )
+            self.assertEqual(
+                entries,
+                [timesheet_line_parser.parse(line) for line in lines]
+            )
+            self.assertEqual(
+                sorted(
+                    (entry.date_ordinal, entry.ticket)
+                    for entry in self.index.get_date_index().entries
+                ),
+                sorted(
+                    (entry.date_ordinal, entry.ticket)
+                    for entry in entries
+                    if entry
+                )
+            )
+            self.assertEqual(
+                self.index.get_lines_by_date(),
+                group_by_date(
+                    (row, entry)
+                    for row, entry in enumerate(entries)
+                    if entry
+                )
+            )
+
+    def test_patch_lines_by_date(self):
+        """Only lines of changed dates and of shifted lines are grouped."""
+        self.append_text(
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '2018-07-02,10:00,12:10,PROJECT-2,"comment"\n'
+            '2018-07-03,10:00,12:10,PROJECT-3,"comment"'
+        )
+        lines_by_date = self.index.get_lines_by_date()
+        first, second, third = [
+            date(2018, 7, day).toordinal()
+            for day in [1, 2, 3]
+        ]
+
+        # Change of second line without change of line numbers
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(74, 75))
+        self.append_text('4')
+
+        new_lines_by_date = self.index.get_lines_by_date()
+        self.assertIs(new_lines_by_date[first], lines_by_date[first])
+        self.assertIs(new_lines_by_date[third], lines_by_date[third])
+        self.assertEqual(
+            [(row, entry.ticket) for row, entry in new_lines_by_date[second]],
+            [(1, 'PROJECT-4')]
+        )
+
+        # Line is inserted, lines after it are shifted
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(43))
+        self.append_text('2018-07-03,08:00,09:00,PROJECT-5,"comment"\n')
+
+        lines_by_date = self.index.get_lines_by_date()
+        self.assertIs(lines_by_date[first], new_lines_by_date[first])
+        self.assertEqual(
+            {
+                date_ordinal: [(row, entry.ticket) for row, entry in lines]
+                for date_ordinal, lines in lines_by_date.items()
+            },
+            {
+                first: [(0, 'PROJECT-1')],
+                second: [(2, 'PROJECT-4')],
+                third: [(1, 'PROJECT-5'), (3, 'PROJECT-3')],
+            }
+        )
+
+        # Lines of date are removed
+        self.view.sel().clear()
+        self.view.sel().add(sublime.Region(0, 43))
+        self.append_text('')
+
+        self.assertNotIn(first, self.index.get_lines_by_date())
+
+    def test_patch_removed_lines(self):
+        self.append_text(
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '2018-07-02,10:00,12:10,PROJECT-2,"comment"\n'
+        )
+        self.assertEqual(len(self.get_timesheet_lines()), 2)
+
+        self.view.run_command('select_all')
+        self.append_text('# comment')
+
+        self.assertEqual(self.get_timesheet_lines(), [])
+        self.assertEqual(
+            self.index.last_non_empty_line_region(),
+            sublime.Region(0, 9)
+        )
+
+    def test_load_cache(self):
+        """
+        When view is parsed first time, lines saved in cache aren't parsed,
+        only lines appended after that.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        path = os.path.join(directory, 'timesheet.txt')
+        cache_file = os.path.join(directory, 'timesheet.cache')
+
+        content = (
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '# comment\n'
+        )
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        lines = content.split('\n')
+        save_parse_cache(
+            cache_file,
+            path,
+            lines,
+            [timesheet_line_parser.parse(line) for line in lines]
+        )
+
+        appended = '2018-07-02,10:00,12:10,PROJECT-2,"comment"\n'
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(appended)
+        self.append_text(content + appended)
+
+        with patch.object(self.view, 'file_name', return_value=path), \
+                patch.object(self.index, 'get_cache_file',
+                             return_value=cache_file), \
+                patch('timesheets.timesheet_index.timesheet_line_parser') as \
+                parser_mock:
+            parser_mock.parse.side_effect = timesheet_line_parser.parse
+
+            self.assertEqual(
+                self.get_timesheet_lines(),
+                [
+                    (
+                        '2018-07-01,10:00,12:10,PROJECT-1,"comment"',
+                        'PROJECT-1'
+                    ),
+                    (
+                        '2018-07-02,10:00,12:10,PROJECT-2,"comment"',
+                        'PROJECT-2'
+                    ),
+                ]
+            )
+
+        # Only appended line and empty last line are parsed
+        self.assertEqual(parser_mock.parse.call_count, 2)
+
+    def test_load_cache_changed_in_place(self):
+        """
+        Lines of unsaved view changed without change of their length
+        aren't taken from cache.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        path = os.path.join(directory, 'timesheet.txt')
+        cache_file = os.path.join(directory, 'timesheet.cache')
+
+        # Changed line is far from the end
+        content = (
+            '2018-07-01,10:00,12:10,PROJECT-1,"comment"\n'
+            '2018-07-02,10:00,12:10,PROJECT-2,"comment"\n'
+        ) * 100
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        lines = content.split('\n')
+        save_parse_cache(
+            cache_file,
+            path,
+            lines,
+            [timesheet_line_parser.parse(line) for line in lines]
+        )
+
+        self.append_text(content.replace('10:00,12:10', '11:00,12:10', 1))
+        self.assertTrue(self.view.is_dirty())
+
+        with patch.object(self.view, 'file_name', return_value=path), \
+                patch.object(self.index, 'get_cache_file',
+                             return_value=cache_file):
+            _, _, entries = self.index.get_lines()
+
+        self.assertEqual(entries[0].from_minutes, 11 * 60)
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+from timesheets.tests.base import BasePluginTestCase
+from timesheets.timesheet_index import TimesheetIndex
+from timesheets.timesheet_linter import TimesheetLinter
+
+
+class TestTimesheetLinter(BasePluginTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.append_text(
+            '2018-07-09,10:00,11:00,PROJECT-1,"comment"\n'
+            '2018-02-30,10:00,11:00,PROJECT-1,"comment"\n'
+            '2018-07-10,10:00,11:00,PROJECT-1,"comment"\n'
+        )
+
+        self.linter = TimesheetLinter(self.view)
+
+    def tearDown(self):
+        TimesheetIndex.forget(self.view)
+
+        super().tearDown()
+
+    def run_lint(self):
+        """
+        Schedule check and run it, return function that shows results
+        in UI thread.
+        """
+        with patch('timesheets.timesheet_linter.sublime.set_timeout_async') \
+                as set_timeout_async_mock:
+            self.linter.schedule_lint(0)
+
+        (lint, _), _ = set_timeout_async_mock.call_args
+
+        with patch('timesheets.timesheet_linter.sublime.set_timeout') as \
+                set_timeout_mock:
+            lint()
+
+        (show_problems,), _ = set_timeout_mock.call_args
+        return show_problems
+
+    def test_lint(self):
+        self.run_lint()()
+
+        self.assertEqual(
+            self.view.get_regions(self.linter.region_key),
+            [self.view.line(self.view.text_point(1, 0))]
+        )
+        self.assertEqual(
+            self.linter.get_problems(1),
+            ['date 2018-02-30 does not exist']
+        )
+        self.assertIsNone(self.linter.get_problems(0))
+
+    def test_cancel(self):
+        """Results of check aren't shown if newer check is scheduled."""
+        show_problems = self.run_lint()
+
+        with patch('timesheets.timesheet_linter.sublime.set_timeout_async'):
+            self.linter.schedule_lint(self.linter.lint_delay)
+
+        show_problems()
+
+        self.assertEqual(self.view.get_regions(self.linter.region_key), [])
+
+    def test_cancel_running(self):
+        """Check is stopped when newer check is scheduled."""
+        with patch('timesheets.timesheet_linter.sublime.set_timeout_async'):
+            self.linter.schedule_lint(0)
+            generation = self.linter.lint_generation
+            self.linter.schedule_lint(0)
+
+        with patch('timesheets.timesheet_linter.sublime.set_timeout') as \
+                set_timeout_mock:
+            self.linter.lint(generation)
+
+        set_timeout_mock.assert_not_called()
+
+    def test_activated(self):
+        """View is checked on activation only if it's changed since check."""
+        patcher = patch.object(
+            self.linter.timesheet_helper,
+            'detect_is_timesheet',
+            return_value=True
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with patch('timesheets.timesheet_linter.sublime.set_timeout_async') \
+                as set_timeout_async_mock:
+            self.linter.on_activated_async()
+        self.assertEqual(set_timeout_async_mock.call_count, 1)
+
+        self.run_lint()()
+
+        with patch('timesheets.timesheet_linter.sublime.set_timeout_async') \
+                as set_timeout_async_mock:
+            self.linter.on_activated_async()
+        set_timeout_async_mock.assert_not_called()
+
+        self.append_text('2018-07-10,11:00,12:00,PROJECT-1,"comment"\n')
+
+        with patch('timesheets.timesheet_linter.sublime.set_timeout_async') \
+                as set_timeout_async_mock:
+            self.linter.on_activated_async()
+        self.assertEqual(set_timeout_async_mock.call_count, 1)
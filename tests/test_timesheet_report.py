@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+import sublime
+
+from freezegun import freeze_time
+
+from timesheets.core import RoundingPolicy
+from timesheets.tests.base import BasePluginTestCase
+from timesheets.timesheet_report import TimesheetReportCommand
+
+
+@freeze_time('2018-07-11 12:00')
+class TestTimesheetReport(BasePluginTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.window = self.view.window()
+        self.command = TimesheetReportCommand(self.window)
+
+    def get_report(self) -> str:
+        panel = self.window.find_output_panel(self.command.panel_name)
+        return panel.substr(sublime.Region(0, panel.size()))
+
+    def test_report_by_ticket(self):
+        """
+        Worked time is summed by ticket in given period,
+        tickets with most time go first, total goes last.
+        Work in progress is counted until now.
+        """
+        self.append_text(
+            '2018-07-01,10:00,18:00,PROJECT-1,"previous week"\n'
+            '2018-07-09,10:00,11:00,PROJECT-1,"comment"\n'
+            '# comment\n'
+            '2018-07-10,10:00,12:30,PROJECT-22,"comment"\n'
+            '2018-07-11,10:00,10:30,PROJECT-1,"comment"\n'
+            '2018-07-11,10:30,,PROJECT-3,"in progress"'
+        )
+
+        self.command.run('week')
+
+        self.assertEqual(
+            self.get_report(),
+            'Worked time by ticket: This week (2018-07-09 - 2018-07-15)\n'
+            '\n'
+            'PROJECT-22  02:30\n'
+            'PROJECT-1   01:30\n'
+            'PROJECT-3   01:30\n'
+            'Total       05:30\n'
+        )
+        self.assertEqual(
+            self.window.active_panel(),
+            'output.timesheet_report'
+        )
+
+    def test_unknown_period(self):
+        """Error is shown instead of report if period is unknown."""
+        self.append_text('2018-07-10,10:00,12:30,PROJECT-22,"comment"')
+
+        with patch('timesheets.timesheet_report.sublime.error_message') as \
+                error_message_mock:
+            self.command.run('decade')
+
+        error_message_mock.assert_called_once_with(
+            "Timesheets plugin: Unknown period 'decade'"
+        )
+
+    def test_report_days(self):
+        """Period could be given as number of days."""
+        self.append_text(
+            '2018-07-01,10:00,18:00,PROJECT-1,"comment"\n'
+            '2018-07-10,10:00,12:30,PROJECT-22,"comment"'
+        )
+
+        self.command.run(3)
+
+        self.assertEqual(
+            self.get_report(),
+            'Worked time by ticket: Last 3 days (2018-07-09 - 2018-07-11)\n'
+            '\n'
+            'PROJECT-22  02:30\n'
+            'Total       02:30\n'
+        )
+
+    def test_report_billable(self):
+        """Billable time of every line is rounded by policy."""
+        self.append_text(
+            '2018-07-10,10:00,10:20,PROJECT-1,"comment"\n'
+            '2018-07-10,10:20,10:25,PROJECT-1,"comment"\n'
+            '2018-07-10,10:25,11:25,PROJECT-22,"comment"'
+        )
+
+        with patch(
+            'timesheets.timesheet_report.is_billable_time_shown',
+            return_value=True
+        ), patch(
+            'timesheets.timesheet_report.load_rounding_policy',
+            return_value=RoundingPolicy(15, 'ceil')
+        ):
+            self.command.run('week')
+
+        self.assertEqual(
+            self.get_report(),
+            'Worked time by ticket: This week (2018-07-09 - 2018-07-15)\n'
+            '\n'
+            'PROJECT-22  01:00  (billable 01:00)\n'
+            'PROJECT-1   00:25  (billable 00:45)\n'
+            'Total       01:25  (billable 01:45)\n'
+        )
+
+    def test_report_empty(self):
+        """Report of period without timesheet lines contains only total."""
+        self.append_text('2018-07-01,10:00,18:00,PROJECT-1,"comment"')
+
+        self.command.run('today')
+
+        self.assertEqual(
+            self.get_report(),
+            'Worked time by ticket: Today (2018-07-11 - 2018-07-11)\n'
+            '\n'
+            'Total  00:00\n'
+        )
+
+    def test_is_enabled(self):
+        """Command is available for timesheets."""
+        self.append_text('2018-07-01,10:00,18:00,PROJECT-1,"comment"')
+        self.assertTrue(self.command.is_enabled())
+
+    def test_is_disabled(self):
+        """Command isn't available for other files."""
+        self.append_text('Not a timesheet')
+        self.assertFalse(self.command.is_enabled())
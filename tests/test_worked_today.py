@@ -1,8 +1,13 @@
+from unittest.mock import patch
+
 import sublime
 
 from freezegun import freeze_time
 
+from timesheets.core import RoundingPolicy
 from timesheets.tests.base import BasePluginTestCase
+from timesheets.time_worked import TimeWorked
+from timesheets.timesheet_index import TimesheetIndex
 
 
 @freeze_time('2018-07-10 12:00')
@@ -24,6 +29,25 @@ class TestTimeWorkedStatusBar(BasePluginTestCase):
             self.view.get_status('timesheet')
         )
 
+    def test_billable(self):
+        """Billable time is shown next to worked time if it's enabled."""
+        self.append_text('2018-07-10,10:00,12:10,PROJECT-123,"comment"')
+
+        with patch(
+            'timesheets.time_worked.is_billable_time_shown',
+            return_value=True
+        ), patch(
+            'timesheets.time_worked.load_rounding_policy',
+            return_value=RoundingPolicy(30, 'ceil')
+        ):
+            self.simulate_on_activated()
+
+        self.assertEqual(
+            'Worked today 02:10 (billable 02:30), '
+            'week 02:10 (billable 02:30)',
+            self.view.get_status('timesheet')
+        )
+
     def test_update_worked_on_activate_not_today(self):
         """
         Worked today status message is updated when timesheet tab is activated.
@@ -41,6 +65,134 @@ class TestTimeWorkedStatusBar(BasePluginTestCase):
             self.view.get_status('timesheet')
         )
 
+    def test_load_index_on_activate(self):
+        """
+        Before index of view is loaded, worked time is counted from lines
+        at the end of view, exact time is shown after index is loaded
+        in background.
+        """
+        self.append_text(
+            '2018-07-10,10:00,11:00,PROJECT-123,"comment"\n'
+            '2018-07-08,10:00,11:00,PROJECT-123,"comment"\n'
+            '2018-07-09,10:00,10:30,PROJECT-123,"back-dated"\n'
+        )
+
+        listener = TimeWorked(self.view)
+        self.addCleanup(TimesheetIndex.forget, self.view)
+
+        with patch('timesheets.time_worked.sublime.set_timeout_async') as \
+                set_timeout_mock:
+            listener.on_activated()
+
+        self.assertEqual(
+            'Worked today 00:00, week 00:30',
+            self.view.get_status('timesheet')
+        )
+        set_timeout_mock.assert_called_once_with(listener.load_index)
+
+        listener.load_index()
+        self.assertEqual(
+            'Worked today 01:00, week 01:30',
+            self.view.get_status('timesheet')
+        )
+
+        # Index is loaded already
+        with patch('timesheets.time_worked.sublime.set_timeout_async') as \
+                set_timeout_mock:
+            listener.on_activated()
+
+        set_timeout_mock.assert_not_called()
+
+    def test_update_worked_on_modified(self):
+        """
+        Worked today status message is updated after modification,
+        only latest scheduled update is applied.
+        """
+        self.append_text(
+            '2018-07-10,10:00,11:00,PROJECT-123,"comment"\n'
+            '2018-07-10,11:00,11:30,PROJECT-123,"comment"'
+        )
+
+        listener = TimeWorked(self.view)
+
+        # Simulate two modifications
+        with patch('timesheets.time_worked.sublime.set_timeout_async') as \
+                set_timeout_mock:
+            listener.on_modified_async()
+            listener.on_modified_async()
+
+        self.assertEqual(set_timeout_mock.call_count, 2)
+        (first_update, _), (second_update, _) = [
+            call_args
+            for call_args, _ in set_timeout_mock.call_args_list
+        ]
+
+        # Outdated update does nothing
+        first_update()
+        self.assertFalse(self.view.get_status('timesheet'))
+
+        second_update()
+        self.assertEqual(
+            'Worked today 01:30, week 01:30',
+            self.view.get_status('timesheet')
+        )
+
+    def test_tick_unfinished(self):
+        """
+        Worked time of line in progress is increased every minute
+        until line is finished.
+        """
+        self.append_text('2018-07-10,11:00,     ,PROJECT-123,"comment"')
+
+        listener = TimeWorked(self.view)
+
+        with patch('timesheets.time_worked.sublime.set_timeout_async') as \
+                set_timeout_mock:
+            listener.update_worked_message()
+
+            self.assertEqual(
+                'Worked today 01:00, week 01:00',
+                self.view.get_status('timesheet')
+            )
+            set_timeout_mock.assert_called_once_with(
+                listener.tick,
+                listener.tick_interval
+            )
+
+            # Time goes, lines aren't parsed again
+            with freeze_time('2018-07-10 12:30'), \
+                    patch.object(listener.timesheet_helper, 'worked_summary') \
+                    as worked_summary_mock:
+                listener.tick()
+
+            worked_summary_mock.assert_not_called()
+            self.assertEqual(
+                'Worked today 01:30, week 01:30',
+                self.view.get_status('timesheet')
+            )
+            self.assertEqual(self.count_ticks(set_timeout_mock, listener), 2)
+
+            # Line is finished, ticking stops
+            self.view.run_command('select_all')
+            self.append_text('2018-07-10,11:00,11:10,PROJECT-123,"comment"')
+            listener.update_worked_message()
+            listener.tick()
+
+            self.assertEqual(self.count_ticks(set_timeout_mock, listener), 2)
+            self.assertFalse(listener.ticking)
+            self.assertEqual(
+                'Worked today 00:10, week 00:10',
+                self.view.get_status('timesheet')
+            )
+
+    def count_ticks(self, set_timeout_mock, listener):
+        """Return how many times ticks of given `listener` were scheduled."""
+        return len([
+            call_args
+            for call_args, _ in set_timeout_mock.call_args_list
+            if call_args[0] == listener.tick
+        ])
+
     def simulate_on_activated(self):
         """
         Simulate activating tab by switching to new file and back to timesheet.
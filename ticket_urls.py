@@ -0,0 +1,98 @@
+"""
+Templates of ticket URLs of several bug trackers,
+chosen by ticket prefix patterns.
+This module doesn't depend on Sublime Text API.
+"""
+import re
+
+try:
+    from typing import Dict, Optional, Tuple
+except ImportError:
+    # Python 3.3 of Sublime Text 3 doesn't have `typing` module
+    from timesheets.typing.typing import Dict, Optional, Tuple
+
+
+class TicketUrls:
+    """
+    Templates of ticket URLs ("{}" is replaced with ticket),
+    by ticket patterns like "OPS-*" (tickets starting with "OPS-")
+    or "OPS-1" (single ticket). Template of the most specific pattern
+    is used, i.e. of exact ticket or of longest prefix,
+    `default_template` if no pattern matches.
+
+    Prefixes are matched by single regexp which is compiled once,
+    so lookup is one regexp match instead of loop over patterns
+    in Python (alternatives of regexp are still tried one by one).
+    Templates are validated once too.
+    """
+
+    def __init__(
+        self,
+        templates_by_pattern: Dict[str, str],
+        default_template: Optional[str]=None,
+        default_option: str='jira_ticket_url'
+    ):
+        # Valid templates of single tickets and of prefixes,
+        # with names of options they come from. Template is None
+        # if it's invalid
+        self.templates_by_ticket = {}
+        self.templates_by_prefix = {}
+
+        for pattern, template in templates_by_pattern.items():
+            option = 'ticket_urls: {}'.format(pattern)
+            if pattern.endswith('*'):
+                self.templates_by_prefix[pattern[:-1]] = \
+                    self.validate(template), option
+            else:
+                self.templates_by_ticket[pattern] = \
+                    self.validate(template), option
+
+        self.default = self.validate(default_template), default_option
+
+        # Longer prefixes go first, so the most specific one is matched
+        self.prefix_regexp = re.compile('|'.join(
+            re.escape(prefix)
+            for prefix in sorted(self.templates_by_prefix, key=len,
+                                 reverse=True)
+        )) if self.templates_by_prefix else None
+
+    def validate(self, template: Optional[str]) -> Optional[str]:
+        """Return given URL template, None if it isn't valid."""
+        if not isinstance(template, str):
+            return
+
+        try:
+            # If formatted template and raw template are the same,
+            # looks like template missing placeholder ("{}")
+            if template.format('') == template:
+                return
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return
+
+        return template
+
+    def get_template(self, ticket: str) -> Tuple[Optional[str], str]:
+        """
+        Return URL template of given `ticket` (None if it isn't valid)
+        and name of option it comes from.
+        """
+        if ticket in self.templates_by_ticket:
+            return self.templates_by_ticket[ticket]
+
+        if self.prefix_regexp:
+            match = self.prefix_regexp.match(ticket)
+            if match:
+                return self.templates_by_prefix[match.group()]
+
+        return self.default
+
+    def get_url(self, ticket: str) -> str:
+        """
+        Return URL of given `ticket`.
+        Raise ValueError with name of option if its template isn't valid.
+        """
+        template, option = self.get_template(ticket)
+        if not template:
+            raise ValueError(option)
+
+        return template.format(ticket)
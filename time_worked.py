@@ -1,7 +1,14 @@
+from datetime import datetime
+
+import sublime
 import sublime_plugin
 
+from timesheets.typing.typing import Optional
+from timesheets.profiling import profiled
 from timesheets.helpers import prettify_minutes
 from timesheets.helpers import SublimeHelper, TimesheetHelper
+from timesheets.helpers import is_billable_time_shown, load_rounding_policy
+from timesheets.timesheet_index import TimesheetIndex
 
 
 class TimeWorked(sublime_plugin.ViewEventListener):
@@ -9,16 +16,34 @@ class TimeWorked(sublime_plugin.ViewEventListener):
     Display today and week worked time in status bar for opened timesheet file.
     """
 
+    # Delay between last modification and status update, in milliseconds
+    update_delay = 500
+
+    # Interval of status updates while some work is in progress
+    # (timesheet line has empty time_to), in milliseconds
+    tick_interval = 60 * 1000
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.sublime_helper = SublimeHelper(self.view)
-        self.timesheet_helper = TimesheetHelper(self.sublime_helper)
+        self.index = TimesheetIndex.for_view(self.view)
+        self.timesheet_helper = TimesheetHelper(
+            self.sublime_helper,
+            self.index
+        )
+
+        # Number of status updates scheduled after modifications.
+        # Scheduled update is dropped if newer one was scheduled after it.
+        self.update_generation = 0
+
+        # Latest calculated worked time
+        self.worked_summary = None
 
-        # Remember if current view contains timesheet file.
-        # This needed to save resources and don't process non-timesheet files.
-        self.is_timesheet = None
+        # Whether status is updated every minute
+        self.ticking = False
 
+    @profiled
     def on_activated(self):
         """
         Called when file is opened, tab is activated by clicking,
@@ -28,32 +53,127 @@ class TimeWorked(sublime_plugin.ViewEventListener):
             return
 
         self.update_worked_message()
+        self.schedule_index_load()
 
+    @profiled
     def on_post_save(self):
         if not self.detect_is_timesheet():
             return
 
         self.update_worked_message()
+        self.schedule_index_load()
+
+    def on_modified_async(self):
+        """
+        Called on every modification, e.g. every typed character.
+        Schedule status update after short delay, so it's done once
+        after user stops typing.
+        """
+        if not self.detect_is_timesheet():
+            return
+
+        self.update_generation += 1
+        generation = self.update_generation
+
+        sublime.set_timeout_async(
+            lambda: self.update_worked_message(generation),
+            self.update_delay
+        )
+
+    def schedule_index_load(self):
+        """
+        If index of view isn't loaded yet, worked time is counted
+        only from lines at the end of view, so that status bar
+        is shown without parsing whole view on UI thread.
+        Load index in background then, and count exact worked time.
+        """
+        if self.index.is_loaded():
+            return
+
+        sublime.set_timeout_async(self.load_index)
+
+    def load_index(self):
+        """
+        Parse lines of view and update worked time in status bar,
+        unless view was modified meanwhile and newer update is scheduled.
+        """
+        generation = self.update_generation
+        self.index.update()
+        self.update_worked_message(generation)
 
     def detect_is_timesheet(self) -> bool:
         """
-        If it's unknown whether content of current view is timesheet or not,
-        detect it. Otherwise use saved value.
-        In both cases return whether content of current view
-        looks like timesheet.
+        Return whether content of current view looks like timesheet.
+        Detection result is cached, this needed to save resources
+        and don't process non-timesheet files.
+        """
+        return self.timesheet_helper.detect_is_timesheet()
+
+    def update_worked_message(self, generation: Optional[int]=None):
+        """
+        Calculate and update worked today time in status bar.
+        If `generation` of scheduled update is given, and newer update
+        was scheduled before or during calculation, do nothing.
         """
-        if self.is_timesheet is None:
-            self.is_timesheet = self.timesheet_helper.is_timesheet()
-        return self.is_timesheet
+        if generation is not None and generation != self.update_generation:
+            return
+
+        worked_summary = self.timesheet_helper.worked_summary(
+            ['today', 'week'],
+            load_rounding_policy() if is_billable_time_shown() else None
+        )
+
+        if generation is not None and generation != self.update_generation:
+            return
+
+        self.worked_summary = worked_summary
+        self.show_worked_message()
+
+        # If some work is in progress, keep worked time in status bar
+        # increasing
+        if worked_summary.has_unfinished() and not self.ticking:
+            self.ticking = True
+            sublime.set_timeout_async(self.tick, self.tick_interval)
+
+    def tick(self):
+        """
+        Update worked time in status bar using latest calculated time,
+        without parsing lines again. Stop when view is closed
+        or there is no work in progress anymore.
+        """
+        if not self.view.is_valid() or \
+                not self.worked_summary.has_unfinished():
+            self.ticking = False
+            return
+
+        self.show_worked_message()
+
+        sublime.set_timeout_async(self.tick, self.tick_interval)
+
+    def show_worked_message(self):
+        """
+        Show latest calculated worked time in status bar,
+        and billable time if it's calculated.
+        """
+        now = datetime.now()
+
+        def format_minutes(period: str) -> str:
+            minutes = prettify_minutes(
+                self.worked_summary.get_minutes(period, now)
+            )
+            if not self.worked_summary.rounding:
+                return minutes
 
-    def update_worked_message(self):
-        """Calculate and update worked today time in status bar."""
-        worked_today_minutes = self.timesheet_helper.worked_today_minutes()
-        worked_week_minutes = self.timesheet_helper.worked_week_minutes()
+            return '{} (billable {})'.format(
+                minutes,
+                prettify_minutes(
+                    self.worked_summary.get_billable_minutes(period, now)
+                )
+            )
 
         message = 'Worked today {}, week {}'.format(
-            prettify_minutes(worked_today_minutes),
-            prettify_minutes(worked_week_minutes),
+            format_minutes('today'),
+            format_minutes('week'),
         )
 
         self.view.set_status('timesheet', message)
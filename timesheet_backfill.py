@@ -0,0 +1,101 @@
+from datetime import date
+
+import sublime
+import sublime_plugin
+
+from timesheets.typing.typing import List, Union
+from timesheets.core import get_period_range
+from timesheets.helpers import SublimeHelper, TimesheetHelper
+from timesheets.profiling import profiled
+from timesheets.recurrence import RecurrenceRule, format_block
+from timesheets.recurrence import get_insert_blocks, get_missing_entries
+from timesheets.timesheet_index import TimesheetIndex
+
+
+class TimesheetBackfillCommand(sublime_plugin.TextCommand):
+    """
+    Add lines of recurring work (e.g. meetings) from "recurring_entries"
+    setting that are missing in timesheet in given period till now,
+    every line is inserted in chronological place.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.index = TimesheetIndex.for_view(self.view)
+        self.timesheet_helper = TimesheetHelper(
+            SublimeHelper(self.view),
+            self.index
+        )
+
+    @profiled
+    def run(self, edit: sublime.Edit, period: Union[str, int]='week'):
+        """
+        Entry-point, called when command is executed.
+        See `core.get_period_range` for possible values of `period`.
+        """
+        try:
+            rules = self.get_rules()
+        except ValueError as e:
+            sublime.error_message('Timesheets plugin: {}'.format(e))
+            return
+
+        start_ordinal, end_ordinal = get_period_range(period, date.today())
+
+        # Lines of dates are kept by index, so occurrences are checked
+        # without scanning view
+        lines_by_date = self.index.get_lines_by_date()
+
+        entries = get_missing_entries(
+            rules,
+            start_ordinal,
+            min(end_ordinal, date.today().toordinal() + 1),
+            lines_by_date
+        )
+
+        if not entries:
+            self.view.window().status_message(
+                'No recurring timesheet lines are missing'
+            )
+            return
+
+        # Find insert points first, then insert blocks from the end of view,
+        # so insert points of earlier blocks stay valid
+        inserts = []
+        for row, date_ordinal, after, block_entries in get_insert_blocks(
+            entries,
+            lines_by_date
+        ):
+            if row is None:
+                last_line_region = self.index.last_non_empty_line_region()
+                point = last_line_region.end() if last_line_region else 0
+            else:
+                line_region = self.index.get_line_region(row)
+                point = line_region.end() if after else line_region.begin()
+
+            content = format_block(block_entries, date_ordinal, after)
+            if not point:
+                content = content.lstrip('\n')
+
+            inserts.append((point, content))
+
+        for point, content in sorted(inserts, reverse=True):
+            self.view.insert(edit, point, content)
+
+        self.view.window().status_message(
+            'Added {} recurring timesheet lines'.format(len(entries))
+        )
+
+    def is_enabled(self, *args, **kwargs) -> bool:
+        """Command is available only if view is timesheet or empty."""
+        return \
+            self.view.size() == 0 or \
+            self.timesheet_helper.detect_is_timesheet()
+
+    def get_rules(self) -> List[RecurrenceRule]:
+        """Return rules of recurring lines, raise ValueError if invalid."""
+        settings = sublime.load_settings('timesheets.sublime-settings')
+        return [
+            RecurrenceRule.from_settings(rule)
+            for rule in settings.get('recurring_entries', [])
+        ]
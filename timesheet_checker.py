@@ -0,0 +1,159 @@
+import html
+
+import sublime
+import sublime_plugin
+
+from timesheets.typing.typing import List, Optional
+from timesheets.core import check_day
+from timesheets.helpers import SublimeHelper, TimesheetHelper
+from timesheets.timesheet_index import TimesheetIndex
+
+
+class TimesheetChecker(sublime_plugin.ViewEventListener):
+    """
+    Underline timesheet lines that overlap with other lines,
+    have time_to before time_from or have too long gap before them.
+    Problems are shown in popup when mouse is over underlined line.
+
+    Lines are checked by days, after modification only days
+    with changed lines are checked again.
+    """
+
+    # Delay between last modification and check, in milliseconds
+    check_delay = 500
+
+    # Regions of every day are stored under separate key,
+    # so regions of days that aren't checked again stay as they are
+    region_key_prefix = 'timesheet_problems_'
+    region_flags = \
+        sublime.DRAW_NO_FILL | \
+        sublime.DRAW_NO_OUTLINE | \
+        sublime.DRAW_SQUIGGLY_UNDERLINE
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.index = TimesheetIndex.for_view(self.view)
+        self.timesheet_helper = TimesheetHelper(
+            SublimeHelper(self.view),
+            self.index
+        )
+
+        # Number of checks scheduled after modifications.
+        # Scheduled check is dropped if newer one was scheduled after it.
+        self.check_generation = 0
+
+    def on_activated_async(self):
+        if not self.timesheet_helper.detect_is_timesheet():
+            return
+
+        self.check()
+
+    def on_modified_async(self):
+        """Schedule check after short delay, when user stops typing."""
+        if not self.timesheet_helper.detect_is_timesheet():
+            return
+
+        self.check_generation += 1
+        generation = self.check_generation
+
+        sublime.set_timeout_async(
+            lambda: self.check(generation),
+            self.check_delay
+        )
+
+    def on_hover(self, point: int, hover_zone: int):
+        """Show problems of underlined line under mouse."""
+        if hover_zone != sublime.HOVER_TEXT:
+            return
+
+        if not self.timesheet_helper.detect_is_timesheet():
+            return
+
+        messages = self.get_problems(self.view.rowcol(point)[0])
+        if messages:
+            self.view.show_popup(
+                '<br>'.join(html.escape(message) for message in messages),
+                sublime.HIDE_ON_MOUSE_MOVE_AWAY,
+                point
+            )
+
+    def check(self, generation: Optional[int]=None):
+        """
+        Check days with lines changed since last check
+        and update underlined lines of these days.
+        If `generation` of scheduled check is given, and newer check
+        was scheduled after it, do nothing.
+        """
+        if generation is not None and generation != self.check_generation:
+            return
+
+        changed_dates = self.index.pop_changed_dates()
+        if not changed_dates:
+            return
+
+        lines_by_date = self.index.get_lines_by_date()
+        max_gap_minutes = self.get_max_gap_minutes()
+
+        for date_ordinal in changed_dates:
+            problems = check_day(
+                lines_by_date.get(date_ordinal, []),
+                max_gap_minutes
+            )
+            key = self.get_region_key(date_ordinal)
+
+            if not problems:
+                self.view.erase_regions(key)
+                continue
+
+            self.view.add_regions(
+                key,
+                [self.index.get_line_region(row) for row, _ in problems],
+                'invalid',
+                '',
+                self.region_flags
+            )
+
+    def get_problems(self, row: int) -> List[str]:
+        """Return messages about problems of line with given number."""
+        timesheet_info = self.timesheet_helper.extract_timesheet_info(
+            self.view.substr(self.view.line(self.view.text_point(row, 0)))
+        )
+        if not timesheet_info:
+            return []
+
+        lines_by_date = self.index.get_lines_by_date()
+
+        return [
+            message
+            for problem_row, message in check_day(
+                lines_by_date.get(timesheet_info.date_ordinal, []),
+                self.get_max_gap_minutes()
+            )
+            if problem_row == row
+        ]
+
+    def get_max_gap_minutes(self) -> int:
+        """
+        Return max gap between lines from settings,
+        0 (gaps aren't checked) if setting is invalid.
+        """
+        settings = sublime.load_settings('timesheets.sublime-settings')
+        value = settings.get('max_gap_minutes', 0)
+        try:
+            max_gap_minutes = int(value)
+        except (TypeError, ValueError):
+            max_gap_minutes = -1
+
+        if max_gap_minutes < 0:
+            print(
+                'Timesheets: invalid "max_gap_minutes" setting: {!r}'.format(
+                    value
+                )
+            )
+            return 0
+
+        return max_gap_minutes
+
+    def get_region_key(self, date_ordinal: int) -> str:
+        return '{}{}'.format(self.region_key_prefix, date_ordinal)
@@ -0,0 +1,587 @@
+import os
+from bisect import bisect_left
+from itertools import accumulate
+from threading import Lock
+
+import sublime
+import sublime_plugin
+
+from timesheets.typing.typing import Any, Callable, Iterable
+from timesheets.typing.typing import Dict, List, Optional, Set, Tuple
+from timesheets.core import DateIndex, group_by_date
+from timesheets.helpers import TimesheetEntry, timesheet_line_parser
+from timesheets.helpers import ViewCache
+from timesheets.entry_table import EntryTable
+from timesheets.parse_cache import get_cache_file_path
+from timesheets.parse_cache import load_parse_cache, save_parse_cache
+from timesheets.profiling import count_lines, profiled
+
+
+class TimesheetIndex:
+    """
+    Parsed lines of given `view`.
+
+    Whole view content is parsed once, after that on every modification
+    only changed lines are parsed again: new content is compared with
+    previous one, and lines between common head and common tail
+    are replaced. Sublime Text 3 doesn't tell which part of view
+    is changed, so content is read with single API call and compared
+    by blocks of lines.
+
+    Parsed lines of saved file are kept in cache on disk,
+    so when file is opened again only lines appended to it are parsed.
+    """
+
+    # Indexes of views, by view id
+    instances = {}
+
+    # Number of lines compared at once when unchanged lines are searched
+    compare_block_size = 256
+
+    def __init__(self, view: sublime.View):
+        self.view = view
+
+        # Change count of view when index was updated last time
+        self.change_count = None
+
+        self.update_lock = Lock()
+
+        # Content of lines, without trailing newline character
+        self.lines = []
+        # Offsets of line ends (not including newline character)
+        self.line_ends = []
+        # Parsed line for every line, None if line isn't timesheet line
+        self.entries = []
+        # Sorted numbers of timesheet lines
+        self.timesheet_rows = []
+        # Sorted numbers of non-empty lines (including comments)
+        self.non_empty_rows = []
+        # Timesheet lines sorted by date
+        self.date_index = DateIndex()
+        # Numbers and parsed lines of timesheet lines by date ordinal,
+        # lines of every date are sorted by number. It's built when it's
+        # requested first time, and patched on every update after that
+        self.lines_by_date = None
+
+        # Dates of timesheet lines that were changed, added or removed
+        # since `pop_changed_dates` was called last time
+        self.changed_dates = set()
+
+        # Structures built from index state on demand, by name,
+        # and change count of view when they were built
+        self.derived = {}
+        self.derived_change_count = None
+
+    @classmethod
+    def for_view(cls, view: sublime.View) -> 'TimesheetIndex':
+        """Return index of given `view`, create it if needed."""
+        index = cls.instances.get(view.id())
+        if index is None:
+            index = cls.instances[view.id()] = cls(view)
+        return index
+
+    @classmethod
+    def forget(cls, view: sublime.View):
+        """Drop index of given `view`, e.g. when view is closed."""
+        cls.instances.pop(view.id(), None)
+
+    def is_loaded(self) -> bool:
+        """Return True if view content was parsed at least once."""
+        return self.change_count is not None
+
+    def update(self):
+        """Parse lines changed since last update, if there are any."""
+        with self.update_lock:
+            change_count = self.view.change_count()
+            if change_count == self.change_count:
+                return
+
+            content = self.view.substr(sublime.Region(0, self.view.size()))
+            lines = content.split('\n')
+
+            was_loaded = self.is_loaded()
+            cached_line_count = 0 if was_loaded else self.load_cache(lines)
+
+            self.patch(lines)
+            self.change_count = change_count
+
+        # When view is parsed first time, save cache
+        # if some complete lines weren't found in it
+        if not was_loaded and cached_line_count < len(lines) - 1:
+            sublime.set_timeout_async(self.save_cache)
+
+    def get_cache_file(self) -> Optional[str]:
+        """Return path of cache file of view, None if view isn't saved."""
+        file_name = self.view.file_name()
+        if not file_name:
+            return
+
+        return get_cache_file_path(
+            os.path.join(sublime.cache_path(), 'Timesheets'),
+            file_name
+        )
+
+    def load_cache(self, lines: List[str]) -> int:
+        """
+        Fill index with first of given `lines` parsed before and saved
+        in cache, return number of these lines.
+        """
+        cache_file = self.get_cache_file()
+        if not cache_file:
+            return 0
+
+        # Content of unsaved view could be changed in place
+        # without change of its length, so all cached lines are checked
+        entries = load_parse_cache(
+            cache_file,
+            self.view.file_name(),
+            lines,
+            check_all=self.view.is_dirty()
+        )
+        cached_lines = lines[:len(entries)]
+
+        self.lines = cached_lines
+        # Line end is offset of all previous content plus newline characters
+        self.line_ends = [
+            offset + row
+            for row, offset in enumerate(accumulate(map(len, cached_lines)))
+        ]
+        self.entries = entries
+        self.timesheet_rows = [
+            row
+            for row, entry in enumerate(entries)
+            if entry
+        ]
+        self.non_empty_rows = [
+            row
+            for row, line in enumerate(cached_lines)
+            if line.strip()
+        ]
+        self.date_index = DateIndex(entry for entry in entries if entry)
+        self.changed_dates.update(
+            entry.date_ordinal
+            for entry in entries
+            if entry
+        )
+
+        return len(entries)
+
+    def save_cache(self):
+        """
+        Save parsed lines to cache, if view content is the same
+        as content of its file.
+        """
+        cache_file = self.get_cache_file()
+        if not cache_file or self.view.is_dirty():
+            return
+
+        with self.update_lock:
+            lines, entries = self.lines, self.entries
+
+        try:
+            save_parse_cache(cache_file, self.view.file_name(), lines, entries)
+        except OSError as e:
+            print('Timesheets: could not save cache: {}'.format(e))
+
+    def patch(self, lines: List[str]):
+        """Replace indexed lines with given `lines`, parse only changed."""
+        old_lines = self.lines
+
+        # Find number of unchanged lines at the beginning and at the end,
+        # lines are compared by blocks first, then one by one
+        common_length = min(len(old_lines), len(lines))
+        block_size = self.compare_block_size
+
+        head = 0
+        while head + block_size <= common_length and \
+                old_lines[head:head + block_size] == \
+                lines[head:head + block_size]:
+            head += block_size
+        while head < common_length and old_lines[head] == lines[head]:
+            head += 1
+
+        tail = 0
+        while tail + block_size <= common_length - head and \
+                old_lines[len(old_lines) - tail - block_size:
+                          len(old_lines) - tail] == \
+                lines[len(lines) - tail - block_size:len(lines) - tail]:
+            tail += block_size
+        while tail < common_length - head and \
+                old_lines[-1 - tail] == lines[-1 - tail]:
+            tail += 1
+
+        old_end = len(old_lines) - tail
+        new_end = len(lines) - tail
+        shift = new_end - old_end
+
+        changed_entries = [
+            timesheet_line_parser.parse(line)
+            for line in lines[head:new_end]
+        ]
+        count_lines(len(changed_entries))
+
+        removed_entries = [
+            entry
+            for entry in self.entries[head:old_end]
+            if entry
+        ]
+        added_entries = [entry for entry in changed_entries if entry]
+
+        changed_dates = set(
+            entry.date_ordinal
+            for entry in removed_entries + added_entries
+        )
+        self.changed_dates.update(changed_dates)
+
+        # Build new lists and then replace attributes,
+        # so readers from other threads always see consistent state
+        if removed_entries or added_entries:
+            self.date_index = self.date_index.patched(
+                removed_entries,
+                added_entries
+            )
+
+        if self.lines_by_date is not None:
+            self.lines_by_date = self._patch_lines_by_date(
+                head,
+                old_end,
+                shift,
+                changed_entries,
+                changed_dates
+            )
+
+        self.entries = \
+            self.entries[:head] + changed_entries + self.entries[old_end:]
+
+        self.timesheet_rows = self._patch_rows(
+            self.timesheet_rows,
+            head,
+            old_end,
+            shift,
+            [
+                head + offset
+                for offset, entry in enumerate(changed_entries)
+                if entry
+            ]
+        )
+
+        self.non_empty_rows = self._patch_rows(
+            self.non_empty_rows,
+            head,
+            old_end,
+            shift,
+            [
+                row
+                for row in range(head, new_end)
+                if lines[row].strip()
+            ]
+        )
+
+        # Ends of lines before changed ones stay the same, ends of lines
+        # after them are shifted by change of length of changed lines
+        line_ends = self.line_ends
+        line_end = line_ends[head - 1] if head else -1
+        changed_line_ends = []
+        for line in lines[head:new_end]:
+            line_end += len(line) + 1
+            changed_line_ends.append(line_end)
+
+        size_shift = line_end - (line_ends[old_end - 1] if old_end else -1)
+        if size_shift:
+            line_ends_after = [
+                old_line_end + size_shift
+                for old_line_end in line_ends[old_end:]
+            ]
+        else:
+            line_ends_after = line_ends[old_end:]
+
+        self.line_ends = \
+            line_ends[:head] + changed_line_ends + line_ends_after
+
+        self.lines = lines
+
+    def _patch_rows(
+        self,
+        rows: List[int],
+        start: int,
+        end: int,
+        shift: int,
+        changed_rows: List[int]
+    ) -> List[int]:
+        """
+        Replace sorted `rows` in range [`start`, `end`) with `changed_rows`,
+        shift rows after that range by `shift`.
+        """
+        start_index = bisect_left(rows, start)
+        end_index = bisect_left(rows, end, start_index)
+
+        if shift:
+            rows_after = [row + shift for row in rows[end_index:]]
+        else:
+            rows_after = rows[end_index:]
+
+        return rows[:start_index] + changed_rows + rows_after
+
+    def _patch_lines_by_date(
+        self,
+        start: int,
+        end: int,
+        shift: int,
+        changed_entries: List[Optional[TimesheetEntry]],
+        changed_dates: Set[int]
+    ) -> Dict[int, List[Tuple[int, TimesheetEntry]]]:
+        """
+        Return timesheet lines by date with lines in range [`start`, `end`)
+        replaced by `changed_entries`, lines after that range are shifted
+        by `shift`. Only lines of `changed_dates` and of dates of shifted
+        lines are grouped again, other dates share lists with current
+        index. Should be called before entries and rows are replaced.
+        """
+        dates = set(changed_dates)
+        if shift:
+            rows = self.timesheet_rows
+            dates.update(
+                self.entries[row].date_ordinal
+                for row in rows[bisect_left(rows, end):]
+            )
+
+        if not dates:
+            return self.lines_by_date
+
+        added_lines_by_date = group_by_date(
+            (start + offset, entry)
+            for offset, entry in enumerate(changed_entries)
+            if entry
+        )
+
+        lines_by_date = dict(self.lines_by_date)
+        for date_ordinal in dates:
+            date_lines = lines_by_date.get(date_ordinal, [])
+            date_lines = \
+                [line for line in date_lines if line[0] < start] + \
+                added_lines_by_date.get(date_ordinal, []) + \
+                [
+                    (row + shift, entry)
+                    for row, entry in date_lines
+                    if row >= end
+                ]
+
+            if date_lines:
+                lines_by_date[date_ordinal] = date_lines
+            else:
+                lines_by_date.pop(date_ordinal, None)
+
+        return lines_by_date
+
+    def _get_state(
+        self
+    ) -> Tuple[List[str], List[int], List[Optional[TimesheetEntry]],
+               List[int], List[int]]:
+        """
+        Return lines, offsets of their ends, parsed lines, numbers
+        of timesheet lines and of non-empty lines.
+        Should be called with `update_lock` held, so state is consistent.
+        """
+        return \
+            self.lines, \
+            self.line_ends, \
+            self.entries, \
+            self.timesheet_rows, \
+            self.non_empty_rows
+
+    def _updated_state(
+        self
+    ) -> Tuple[List[str], List[int], List[Optional[TimesheetEntry]],
+               List[int], List[int]]:
+        """
+        Update index and return its consistent state,
+        it could be replaced by update from other thread later.
+        """
+        self.update()
+
+        with self.update_lock:
+            return self._get_state()
+
+    def get_lines(
+        self
+    ) -> Tuple[List[str], List[int], List[Optional[TimesheetEntry]]]:
+        """
+        Update index and return content of lines, offsets of their ends
+        and parsed lines (None for lines that aren't timesheet lines).
+        """
+        lines, line_ends, entries, _, _ = self._updated_state()
+        return lines, line_ends, entries
+
+    def _get_cached(self, name: str, build: Callable[..., Any]) -> Any:
+        """
+        Update index and return value with given `name` built by `build`
+        function from index state (see `_get_state`), it's built again
+        only if view is changed.
+        State is taken together with values built from it, so value
+        built from state of one change isn't stored for another change.
+        """
+        self.update()
+
+        with self.update_lock:
+            if self.derived_change_count != self.change_count:
+                self.derived = {}
+                self.derived_change_count = self.change_count
+
+            derived = self.derived
+            state = self._get_state()
+
+        if name not in derived:
+            derived[name] = build(*state)
+
+        return derived[name]
+
+    def _get_derived(
+        self,
+        name: str,
+        build: Callable[[Iterable[Tuple[int, TimesheetEntry]]], Any]
+    ) -> Any:
+        """
+        Return structure with given `name` built by `build` function
+        from line numbers and parsed lines of timesheet lines,
+        it's built again only if view is changed.
+        """
+        def build_from_state(lines, line_ends, entries, timesheet_rows, _):
+            return build(
+                (row, entries[row])
+                for row in timesheet_rows
+            )
+
+        return self._get_cached(name, build_from_state)
+
+    def get_entry_table(self) -> EntryTable:
+        """Return timesheet lines by columns in order of lines."""
+        return self._get_derived(
+            'entry_table',
+            lambda timesheet_lines: EntryTable.from_entries(
+                entry for _, entry in timesheet_lines
+            )
+        )
+
+    def get_date_index(self) -> DateIndex:
+        """
+        Update index and return timesheet lines sorted by date,
+        it's patched with changed lines on every update.
+        """
+        self.update()
+
+        with self.update_lock:
+            return self.date_index
+
+    def get_lines_by_date(
+        self
+    ) -> Dict[int, List[Tuple[int, TimesheetEntry]]]:
+        """
+        Update index and return line numbers and parsed lines
+        of timesheet lines by date ordinal, lines of changed dates
+        are grouped again on every update.
+        """
+        self.update()
+
+        with self.update_lock:
+            if self.lines_by_date is None:
+                self.lines_by_date = group_by_date(
+                    (row, self.entries[row])
+                    for row in self.timesheet_rows
+                )
+
+            return self.lines_by_date
+
+    def pop_changed_dates(self) -> Set[int]:
+        """
+        Update index and return dates of timesheet lines that were changed
+        since this method was called last time.
+        """
+        self.update()
+
+        with self.update_lock:
+            changed_dates = self.changed_dates
+            self.changed_dates = set()
+
+        return changed_dates
+
+    def get_line_region(self, row: int) -> sublime.Region:
+        """Return region of line with given number."""
+        lines, line_ends, _, _, _ = self._updated_state()
+        return sublime.Region(line_ends[row] - len(lines[row]), line_ends[row])
+
+    def get_last_lines(
+        self
+    ) -> Tuple[Optional[sublime.Region], Optional[sublime.Region],
+               Optional[TimesheetEntry]]:
+        """
+        Return region of latest non-empty line (including comments),
+        region and parsed line of latest timesheet line, found together
+        and kept until view is changed. Missing lines are None.
+        """
+        return self._get_cached('last_lines', self._find_last_lines)
+
+    def _find_last_lines(
+        self,
+        lines: List[str],
+        line_ends: List[int],
+        entries: List[Optional[TimesheetEntry]],
+        timesheet_rows: List[int],
+        non_empty_rows: List[int]
+    ) -> Tuple[Optional[sublime.Region], Optional[sublime.Region],
+               Optional[TimesheetEntry]]:
+        def get_region(row: int) -> sublime.Region:
+            return sublime.Region(
+                line_ends[row] - len(lines[row]),
+                line_ends[row]
+            )
+
+        if not non_empty_rows:
+            return None, None, None
+
+        last_non_empty_line_region = get_region(non_empty_rows[-1])
+
+        if not timesheet_rows:
+            return last_non_empty_line_region, None, None
+
+        row = timesheet_rows[-1]
+        return last_non_empty_line_region, get_region(row), entries[row]
+
+    def last_timesheet_line(
+        self
+    ) -> Optional[Tuple[sublime.Region, TimesheetEntry]]:
+        """Return region and parsed line of latest timesheet line."""
+        _, line_region, entry = self.get_last_lines()
+        if line_region:
+            return line_region, entry
+
+    def last_non_empty_line_region(self) -> Optional[sublime.Region]:
+        """
+        Return line region of latest non-empty line (including comments).
+        """
+        return self.get_last_lines()[0]
+
+
+class TimesheetIndexListener(sublime_plugin.EventListener):
+    """
+    Keep indexes of views up to date, save their cache when views are saved,
+    drop indexes and caches of views when they are closed.
+    """
+
+    def on_modified_async(self, view: sublime.View):
+        index = TimesheetIndex.instances.get(view.id())
+
+        # Update only indexes that are in use already
+        if index and index.is_loaded():
+            index.update()
+
+    @profiled
+    def on_post_save_async(self, view: sublime.View):
+        index = TimesheetIndex.instances.get(view.id())
+
+        if index and index.is_loaded():
+            index.update()
+            index.save_cache()
+
+    def on_close(self, view: sublime.View):
+        TimesheetIndex.forget(view)
+        ViewCache.forget(view)
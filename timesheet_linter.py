@@ -0,0 +1,164 @@
+import html
+
+import sublime
+import sublime_plugin
+
+from timesheets.typing.typing import List, Optional, Tuple
+from timesheets.core import lint_lines
+from timesheets.helpers import SublimeHelper, TimesheetHelper
+from timesheets.timesheet_index import TimesheetIndex
+
+
+class TimesheetLinter(sublime_plugin.ViewEventListener):
+    """
+    Check all lines of timesheet in background when it's opened
+    or activated and after modifications: underline lines that aren't
+    valid timesheet lines (including dates and times that don't exist)
+    and lines with date before dates of lines above.
+    Problems are shown in popup when mouse is over underlined line.
+    """
+
+    # Delay between last modification and check, in milliseconds
+    lint_delay = 500
+
+    region_key = 'timesheet_lint'
+    region_flags = \
+        sublime.DRAW_NO_FILL | \
+        sublime.DRAW_NO_OUTLINE | \
+        sublime.DRAW_SQUIGGLY_UNDERLINE
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.index = TimesheetIndex.for_view(self.view)
+        self.timesheet_helper = TimesheetHelper(
+            SublimeHelper(self.view),
+            self.index
+        )
+
+        # Number of scheduled checks. Check that is scheduled or running
+        # is cancelled when newer one is scheduled.
+        self.lint_generation = 0
+
+        # Messages of latest check, by line number
+        self.problems = {}
+
+        # Change count of view when latest shown check was done
+        self.lint_change_count = None
+
+    def on_load_async(self):
+        if not self.timesheet_helper.detect_is_timesheet():
+            return
+
+        self.schedule_lint(0)
+
+    def on_activated_async(self):
+        """
+        Check views that weren't checked since last modification,
+        e.g. views opened before plugin is loaded.
+        """
+        if not self.timesheet_helper.detect_is_timesheet():
+            return
+
+        if self.view.change_count() != self.lint_change_count:
+            self.schedule_lint(0)
+
+    def on_modified_async(self):
+        """Schedule check after short delay, when user stops typing."""
+        if not self.timesheet_helper.detect_is_timesheet():
+            return
+
+        self.schedule_lint(self.lint_delay)
+
+    def on_hover(self, point: int, hover_zone: int):
+        """Show problems of underlined line under mouse."""
+        if hover_zone != sublime.HOVER_TEXT:
+            return
+
+        messages = self.get_problems(self.view.rowcol(point)[0])
+        if messages:
+            self.view.show_popup(
+                '<br>'.join(html.escape(message) for message in messages),
+                sublime.HIDE_ON_MOUSE_MOVE_AWAY,
+                point
+            )
+
+    def schedule_lint(self, delay: int):
+        """Cancel running check and schedule new one after `delay` ms."""
+        self.lint_generation += 1
+        generation = self.lint_generation
+
+        sublime.set_timeout_async(lambda: self.lint(generation), delay)
+
+    def is_cancelled(self, generation: int) -> bool:
+        """Return True if newer check was scheduled after given one."""
+        return generation != self.lint_generation
+
+    def lint(self, generation: int):
+        """
+        Check all lines in background and show problems in UI thread,
+        unless check is cancelled.
+        """
+        if self.is_cancelled(generation):
+            return
+
+        change_count = self.view.change_count()
+        lines, line_ends, entries = self.index.get_lines()
+
+        problems = lint_lines(
+            lines,
+            entries,
+            lambda: self.is_cancelled(generation)
+        )
+        if problems is None:
+            return
+
+        regions = [
+            sublime.Region(line_ends[row] - len(lines[row]), line_ends[row])
+            for row, _ in problems
+        ]
+
+        sublime.set_timeout(
+            lambda: self.show_problems(
+                generation,
+                problems,
+                regions,
+                change_count
+            )
+        )
+
+    def show_problems(
+        self,
+        generation: int,
+        problems: List[Tuple[int, str]],
+        regions: List[sublime.Region],
+        change_count: Optional[int]=None
+    ):
+        """
+        Underline lines with problems found by check
+        of view with given `change_count`.
+        """
+        if self.is_cancelled(generation):
+            return
+
+        self.lint_change_count = change_count
+
+        problems_by_row = {}
+        for row, message in problems:
+            problems_by_row.setdefault(row, []).append(message)
+        self.problems = problems_by_row
+
+        if regions:
+            self.view.add_regions(
+                self.region_key,
+                regions,
+                'invalid',
+                '',
+                self.region_flags
+            )
+        else:
+            self.view.erase_regions(self.region_key)
+
+    def get_problems(self, row: int) -> Optional[List[str]]:
+        """Return messages about problems of line with given number."""
+        return self.problems.get(row)
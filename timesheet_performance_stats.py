@@ -0,0 +1,76 @@
+import os
+
+import sublime
+import sublime_plugin
+
+from timesheets import profiling
+
+
+def plugin_loaded():
+    """Enable measurement according to settings, follow their changes."""
+    settings = sublime.load_settings('timesheets.sublime-settings')
+    settings.add_on_change('timesheets_profiling', apply_settings)
+    apply_settings()
+
+
+def plugin_unloaded():
+    settings = sublime.load_settings('timesheets.sublime-settings')
+    settings.clear_on_change('timesheets_profiling')
+
+
+def apply_settings():
+    settings = sublime.load_settings('timesheets.sublime-settings')
+
+    if settings.get('profiling', False):
+        profiling.enable(settings.get('profiling_cprofile', False))
+    else:
+        profiling.disable()
+
+
+class TimesheetPerformanceStatsCommand(sublime_plugin.WindowCommand):
+    """
+    Show measured calls of commands and event handlers in output panel,
+    save calls recorded by cProfile next to cache of timesheets.
+    """
+
+    panel_name = 'timesheet_performance_stats'
+
+    def run(self, reset: bool=False):
+        """
+        Entry-point, called when command is executed.
+        If `reset` is True, drop measured stats instead of showing them.
+        """
+        if reset:
+            profiling.reset()
+            self.window.status_message('Performance stats are dropped')
+            return
+
+        report = profiling.format_stats()
+
+        cprofile_path = self.get_cprofile_path()
+        if profiling.dump_cprofile(cprofile_path):
+            report += '\ncProfile output is saved to {}\n'.format(
+                cprofile_path
+            )
+        elif not profiling.enabled:
+            report += (
+                '\nMeasurement is disabled, enable it by "profiling" '
+                'setting\n'
+            )
+
+        self.show_report(report)
+
+    def get_cprofile_path(self) -> str:
+        directory = os.path.join(sublime.cache_path(), 'Timesheets')
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, 'profile.pstats')
+
+    def show_report(self, report: str):
+        """Show given `report` text in output panel."""
+        panel = self.window.create_output_panel(self.panel_name)
+        panel.run_command('append', {'characters': report})
+
+        self.window.run_command(
+            'show_panel',
+            {'panel': 'output.{}'.format(self.panel_name)}
+        )
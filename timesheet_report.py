@@ -0,0 +1,157 @@
+from datetime import date
+
+import sublime
+import sublime_plugin
+
+from timesheets.typing.typing import Dict, Optional, Union
+from timesheets.core import get_period_range, prettify_minutes
+from timesheets.core import sort_minutes
+from timesheets.helpers import SublimeHelper, TimesheetHelper
+from timesheets.helpers import is_billable_time_shown, load_rounding_policy
+from timesheets.timesheet_index import TimesheetIndex
+
+
+class TimesheetReportCommand(sublime_plugin.WindowCommand):
+    """
+    Show how much time is worked on every ticket in chosen period
+    in output panel, tickets with most time first.
+    """
+
+    # Periods user could choose from, with their captions
+    periods = [
+        ('today', 'Today'),
+        ('week', 'This week'),
+        ('month', 'This month'),
+        ('year', 'This year'),
+        (30, 'Last 30 days'),
+    ]
+
+    panel_name = 'timesheet_report'
+
+    def run(self, period: Optional[Union[str, int]]=None):
+        """
+        Entry-point, called when command is executed.
+        If `period` isn't given, ask user to choose it.
+        """
+        if period is None:
+            self.window.show_quick_panel(
+                [caption for _, caption in self.periods],
+                self.on_period_chosen
+            )
+            return
+
+        view = self.window.active_view()
+
+        try:
+            start_ordinal, end_ordinal = get_period_range(
+                period,
+                date.today()
+            )
+        except ValueError as e:
+            sublime.error_message('Timesheets plugin: {}'.format(e))
+            return
+
+        entry_table = TimesheetIndex.for_view(view).get_entry_table()
+
+        # Billable time is counted in the same pass as worked time
+        if is_billable_time_shown():
+            minutes_by_ticket = {}
+            billable_minutes_by_ticket = {}
+            minutes_and_billable_by_ticket = \
+                entry_table.group_by_ticket_billable(
+                    load_rounding_policy(),
+                    start_ordinal,
+                    end_ordinal
+                )
+            for ticket, (minutes, billable_minutes) in \
+                    minutes_and_billable_by_ticket.items():
+                minutes_by_ticket[ticket] = minutes
+                billable_minutes_by_ticket[ticket] = billable_minutes
+        else:
+            minutes_by_ticket = entry_table.group_by_ticket(
+                start_ordinal,
+                end_ordinal
+            )
+            billable_minutes_by_ticket = None
+
+        self.show_report(
+            self.format_report(
+                period,
+                start_ordinal,
+                end_ordinal,
+                minutes_by_ticket,
+                billable_minutes_by_ticket
+            )
+        )
+
+    def is_enabled(self, *args, **kwargs) -> bool:
+        """Command is available only if active view is timesheet."""
+        view = self.window.active_view()
+        return bool(view) and TimesheetHelper(
+            SublimeHelper(view)
+        ).detect_is_timesheet()
+
+    def on_period_chosen(self, period_index: int):
+        """Called when user chooses period, or cancels choice (-1)."""
+        if period_index == -1:
+            return
+
+        period, _ = self.periods[period_index]
+        self.run(period)
+
+    def format_report(
+        self,
+        period: Union[str, int],
+        start_ordinal: int,
+        end_ordinal: int,
+        minutes_by_ticket: Dict[str, float],
+        billable_minutes_by_ticket: Optional[Dict[str, float]]=None
+    ) -> str:
+        """
+        Return text of report, with billable time of tickets
+        if it's given.
+        """
+        caption = dict(self.periods).get(period) or \
+            'Last {} days'.format(period)
+
+        rows = sort_minutes(minutes_by_ticket)
+        rows.append(('Total', sum(minutes_by_ticket.values())))
+
+        width = max(len(ticket) for ticket, _ in rows)
+
+        lines = [
+            'Worked time by ticket: {} ({} - {})'.format(
+                caption,
+                date.fromordinal(start_ordinal).isoformat(),
+                date.fromordinal(end_ordinal - 1).isoformat()
+            ),
+            '',
+        ]
+        lines.extend(
+            '{:<{}}  {}'.format(ticket, width, prettify_minutes(minutes))
+            for ticket, minutes in rows
+        )
+
+        if billable_minutes_by_ticket is not None:
+            billable_minutes = [
+                billable_minutes_by_ticket[ticket]
+                for ticket, _ in rows[:-1]
+            ]
+            billable_minutes.append(sum(billable_minutes))
+
+            lines[-len(rows):] = [
+                '{}  (billable {})'.format(line, prettify_minutes(minutes))
+                for line, minutes in zip(lines[-len(rows):], billable_minutes)
+            ]
+
+        return '\n'.join(lines) + '\n'
+
+    def show_report(self, report: str):
+        """Show given `report` text in output panel."""
+        panel = self.window.create_output_panel(self.panel_name)
+        panel.run_command('append', {'characters': report})
+
+        self.window.run_command(
+            'show_panel',
+            {'panel': 'output.{}'.format(self.panel_name)}
+        )